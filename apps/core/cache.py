@@ -0,0 +1,262 @@
+"""
+Two-tier cache for read-heavy endpoints.
+
+Values live in the shared Django cache (Redis) with a bounded LRU copy in
+each process. Keys carry the current number of every generation they
+depend on, so bumping a generation (from model signals) retires all of
+its keys at once without touching them. Each entry records how long it
+took to compute; readers may refresh it a little before it expires, more
+likely the closer and the costlier it is (XFetch), and only the reader
+holding the key's lock recomputes while the others keep serving the old
+value or wait for the new one.
+"""
+import hashlib
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+from .routers import replica_reads
+
+GENERATION_KEY = 'response-cache:generation:{}'
+VALUE_KEY = 'response-cache:value:{}:{}'
+LOCK_KEY = 'response-cache:lock:{}'
+
+# How often a reader waiting on another's recompute checks for the result
+WAIT_INTERVAL = 0.02
+
+
+class Entry:
+    __slots__ = ('value', 'expires_at', 'delta')
+
+    def __init__(self, value, expires_at, delta):
+        self.value = value
+        self.expires_at = expires_at
+        self.delta = delta
+
+    def __getstate__(self):
+        return (self.value, self.expires_at, self.delta)
+
+    def __setstate__(self, state):
+        self.value, self.expires_at, self.delta = state
+
+    def needs_refresh(self, now, beta):
+        """
+        True once expired, and with rising probability before that:
+        delta * beta * -ln(U) is how far ahead of expiry this reader looks
+        """
+        gap = -math.log(1.0 - random.random())
+        return now + self.delta * beta * gap >= self.expires_at
+
+
+class LocalCache:
+    """Bounded, thread-safe LRU for this process"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LocalCache(settings.RESPONSE_CACHE_LOCAL_ENTRIES)
+
+# name -> (generation, when it was read); trusted for
+# RESPONSE_CACHE_GENERATION_SECONDS before asking the shared cache again
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def _new_generation():
+    # Never equal to a generation a process saw before the key went missing
+    return time.time_ns()
+
+
+def current_generations(names):
+    """The current generation of each name, in order"""
+    now = time.monotonic()
+    max_age = settings.RESPONSE_CACHE_GENERATION_SECONDS
+    with _generations_lock:
+        known = {
+            name: _generations[name][0] for name in names
+            if name in _generations and now - _generations[name][1] < max_age
+        }
+
+    missing = [name for name in names if name not in known]
+    if missing:
+        keys = {GENERATION_KEY.format(name): name for name in missing}
+        fetched = cache.get_many(list(keys))
+        for key, name in keys.items():
+            generation = fetched.get(key)
+            if generation is None:
+                cache.add(key, _new_generation(), timeout=None)
+                generation = cache.get(key)
+            known[name] = generation
+        with _generations_lock:
+            for name in missing:
+                _generations[name] = (known[name], now)
+    return [known[name] for name in names]
+
+
+def bump_generation(*names):
+    """
+    Retire every key depending on these generations. Bumped once now, so
+    the rest of this transaction misses, and again after commit, so values
+    computed from the old rows in between don't survive.
+    """
+    _bump(names)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(names))
+
+
+def _bump(names):
+    now = time.monotonic()
+    for name in names:
+        key = GENERATION_KEY.format(name)
+        try:
+            generation = cache.incr(key)
+        except ValueError:
+            # Not set yet or evicted
+            generation = _new_generation()
+            cache.set(key, generation, timeout=None)
+        with _generations_lock:
+            _generations[name] = (generation, now)
+
+
+def _store(key, value, delta, timeout):
+    entry = Entry(value, time.time() + timeout, delta)
+    # Kept past expiry so there is something to serve while one reader
+    # recomputes
+    cache.set(key, entry, timeout * 2)
+    local_cache.set(key, entry)
+    return entry
+
+
+def get_or_compute(key, compute, timeout=None, generations=()):
+    """
+    The cached value of key, calling compute() on a miss. Only the caller
+    holding the key's lock recomputes; the rest serve the previous value
+    or, with none, wait up to RESPONSE_CACHE_LOCK_SECONDS for the result
+    before computing it themselves.
+    """
+    timeout = timeout or settings.RESPONSE_CACHE_TIMEOUT
+    beta = settings.RESPONSE_CACHE_BETA
+    versions = '.'.join(str(generation) for generation in current_generations(list(generations)))
+    key = VALUE_KEY.format(versions, key)
+
+    now = time.time()
+    entry = local_cache.get(key)
+    if entry is not None and not entry.needs_refresh(now, beta):
+        return entry.value
+
+    shared = cache.get(key)
+    if shared is not None:
+        if entry is None or shared.expires_at > entry.expires_at:
+            local_cache.set(key, shared)
+            entry = shared
+            if not entry.needs_refresh(now, beta):
+                return entry.value
+
+    lock_key = LOCK_KEY.format(key)
+    lock_seconds = settings.RESPONSE_CACHE_LOCK_SECONDS
+    if cache.add(lock_key, 1, timeout=lock_seconds):
+        try:
+            started = time.perf_counter()
+            value = compute()
+            return _store(key, value, time.perf_counter() - started, timeout).value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry.value
+
+    deadline = time.monotonic() + lock_seconds
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        shared = cache.get(key)
+        if shared is not None:
+            local_cache.set(key, shared)
+            return shared.value
+
+    # The lock holder is stuck or gone
+    started = time.perf_counter()
+    value = compute()
+    return _store(key, value, time.perf_counter() - started, timeout).value
+
+
+class _Uncacheable(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def cached_action(*generations, timeout=None):
+    """
+    Cache a viewset action's successful GET responses, keyed by the full
+    URL and invalidated by the given generations:
+
+        @cached_action('products', timeout=600)
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+
+    Only response.data is kept; errors and other methods pass through.
+    Misses are computed on the primary: a generation bumped after commit
+    must not label rows a lagging replica hasn't received yet.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED or request.method != 'GET':
+                return method(self, request, *args, **kwargs)
+
+            url = request.build_absolute_uri().encode()
+            key = f'{type(self).__name__}.{method.__name__}:{hashlib.sha1(url).hexdigest()}'
+
+            def compute():
+                with replica_reads(False):
+                    response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise _Uncacheable(response)
+                # Copied so the local tier doesn't keep the serializer (and
+                # the instances it holds) alive
+                return pickle.loads(pickle.dumps(response.data, pickle.HIGHEST_PROTOCOL))
+
+            try:
+                data = get_or_compute(key, compute, timeout, generations)
+            except _Uncacheable as uncacheable:
+                return uncacheable.response
+            return Response(data)
+        return wrapper
+    return decorator
+
+
+def clear_local():
+    """Forget this process's values and generations"""
+    local_cache.clear()
+    with _generations_lock:
+        _generations.clear()
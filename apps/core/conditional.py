@@ -0,0 +1,66 @@
+"""
+Conditional GET for viewset actions. Validators are worked out before the
+view runs, from cache generations or one aggregate query, so a client
+whose If-None-Match or If-Modified-Since still holds gets 304 Not
+Modified without any rows being fetched or serialized.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from functools import wraps
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .cache import current_generations
+
+
+def make_etag(request, *parts):
+    """Strong ETag over the full URL, the Accept header and parts"""
+    digest = hashlib.sha1()
+    for part in (request.build_absolute_uri(), request.META.get('HTTP_ACCEPT', ''), *parts):
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest())
+
+
+def generation_validators(*generations):
+    """Validators from response cache generations; no database access"""
+    def validators(view, request, *args, **kwargs):
+        return make_etag(request, *current_generations(list(generations))), None
+    return validators
+
+
+def conditional_action(validators):
+    """
+    Answer conditional GETs to a viewset action. validators(view, request,
+    *args, **kwargs) returns (etag, last_modified datetime or None), or None
+    to skip the check (e.g. the object doesn't exist). 200 and 304
+    responses carry the ETag and Last-Modified headers.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.CONDITIONAL_GET_ENABLED or request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            result = validators(self, request, *args, **kwargs)
+            if result is None:
+                return method(self, request, *args, **kwargs)
+
+            etag, last_modified = result
+            timestamp = None
+            if last_modified is not None:
+                if timezone.is_naive(last_modified):
+                    last_modified = timezone.make_aware(last_modified, dt_timezone.utc)
+                timestamp = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.setdefault('Last-Modified', http_date(timestamp))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,58 @@
+import time
+from django.conf import settings
+from apps.monitoring.middleware import view_label
+from .routers import _state
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe requests to REPLICA_VIEWS to the replicas.
+
+    A successful unsafe request sets REPLICA_STICKY_COOKIE to the time
+    until which that client reads from the primary, so it sees its own
+    writes (an order it just placed) despite replication lag. Place it
+    before ProfilingMiddleware, which calls the view itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.allowed = False
+
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            sticky_until = time.time() + settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                f'{sticky_until:.3f}',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.allowed = (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and view_label(request) in settings.REPLICA_VIEWS
+            and not self.is_sticky(request)
+        )
+
+    @staticmethod
+    def is_sticky(request):
+        """True while the client's last write is inside the sticky window"""
+        try:
+            sticky_until = float(request.COOKIES.get(settings.REPLICA_STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return sticky_until > time.time()
@@ -0,0 +1,60 @@
+"""
+Read replica routing. Reads go to a replica only while replica_reads() is
+active, which ReplicaRoutingMiddleware arranges for safe requests to
+REPLICA_VIEWS; everything else, writes and select_for_update() (routed as
+writes by Django) stay on the primary.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+@contextmanager
+def replica_reads(allowed=True):
+    """Let (or stop) reads in this thread going to replicas"""
+    previous = getattr(_state, 'allowed', False)
+    _state.allowed = allowed
+    try:
+        yield
+    finally:
+        _state.allowed = previous
+
+
+def replica_reads_allowed():
+    return getattr(_state, 'allowed', False)
+
+
+class ReplicaRouter:
+    """Spreads allowed reads over DATABASE_REPLICAS"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not replica_reads_allowed():
+            return None
+
+        # Related lookups follow the instance they start from
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        # A transaction on the primary reads its own writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
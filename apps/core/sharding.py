@@ -0,0 +1,374 @@
+"""
+Store sharding. With DATABASE_SHARDS configured, every store's inventory,
+orders and the rows written alongside them live on the shard
+shard_for_store() picks, and the catalog (categories, products, stores)
+is written to the default database and copied to every shard, so shard
+queries can join it locally.
+
+Code touching store data runs inside use_shard(alias); ShardRouter sends
+the sharded models there, and transactions are opened with
+transaction.atomic(using=current_shard()). Without shards everything
+resolves to the default database and the router stays out of the way.
+"""
+import heapq
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_delete
+from django.http import Http404
+
+# Store data; a store's rows of all of these live on one shard
+SHARDED_MODELS = {
+    'stores.inventory',
+    'stores.inventorytombstone',
+    'stores.inventorymovement',
+    'stores.inventoryslot',
+    'stores.storestats',
+    'orders.order',
+    'orders.orderitem',
+    'orders.orderevent',
+    'orders.reservation',
+    'orders.reservationitem',
+}
+
+# Catalog, written to the default database and copied to every shard
+REPLICATED_MODELS = {
+    'products.category',
+    'products.product',
+    'stores.store',
+}
+
+_state = threading.local()
+
+
+def sharding_enabled():
+    return bool(settings.DATABASE_SHARDS)
+
+
+def all_shards():
+    """Every database holding store data"""
+    return list(settings.DATABASE_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def shard_for_store(store_id):
+    """The alias holding a store's data"""
+    shards = settings.DATABASE_SHARDS
+    if not shards:
+        return DEFAULT_DB_ALIAS
+    return shards[int(store_id) % len(shards)]
+
+
+def current_shard():
+    """The shard of the current use_shard() block, else the default database"""
+    return getattr(_state, 'shard', None) or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_shard(alias):
+    """Route store data (and catalog reads) in this thread to alias"""
+    previous = getattr(_state, 'shard', None)
+    _state.shard = alias
+    try:
+        yield alias
+    finally:
+        _state.shard = previous
+
+
+def for_each_shard(func, *args, **kwargs):
+    """Call func inside every shard in turn; returns the results"""
+    results = []
+    for alias in all_shards():
+        with use_shard(alias):
+            results.append(func(*args, **kwargs))
+    return results
+
+
+def fan_out(queryset):
+    """Evaluate queryset on every shard; one list of rows per shard"""
+    if not sharding_enabled():
+        return [list(queryset)]
+    return [list(queryset.using(alias)) for alias in all_shards()]
+
+
+def merge_sorted(results, key, limit=None):
+    """Merge per-shard lists already sorted by key, keeping the first limit"""
+    return list(islice(heapq.merge(*results, key=key), limit))
+
+
+def group_by_shard(entries, store_field):
+    """Split dicts by the shard of their store_field, keeping their order"""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(shard_for_store(entry[store_field]), []).append(entry)
+    return groups.items()
+
+
+def find_shard(queryset):
+    """The first shard where queryset matches a row, or None"""
+    for alias in all_shards():
+        if queryset.using(alias).exists():
+            return alias
+    return None
+
+
+def by_store(method):
+    """
+    Run a detail viewset action on the shard of the store in its pk.
+    Streaming bodies are produced after the view returns, so they are
+    routed too.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        try:
+            alias = shard_for_store(kwargs.get('pk'))
+        except (TypeError, ValueError):
+            # Not a store ID; the view answers 404
+            alias = None
+
+        with use_shard(alias):
+            response = method(self, request, *args, **kwargs)
+        if alias and getattr(response, 'streaming', False):
+            response.streaming_content = _on_shard(alias, response.streaming_content)
+        return response
+    return wrapper
+
+
+def _on_shard(alias, chunks):
+    chunks = iter(chunks)
+    while True:
+        with use_shard(alias):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ShardedObjectMixin:
+    """Viewset mixin looking detail objects up on every shard"""
+
+    def get_object(self):
+        if not sharding_enabled():
+            return super().get_object()
+        for alias in all_shards():
+            with use_shard(alias):
+                try:
+                    return super().get_object()
+                except Http404:
+                    continue
+        raise Http404
+
+
+class MergedQuerySet:
+    """
+    The same ordered queryset read from every shard, merged. Supports what
+    Paginator needs (count() and slicing): a page is read as the first
+    `stop` rows of each shard, merged and cut.
+    """
+    ordered = True
+
+    def __init__(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        self.reverse = ordering[0].startswith('-')
+        if any(field.startswith('-') != self.reverse for field in ordering):
+            raise ValueError('MergedQuerySet needs every ordering field in the same direction.')
+        # pk breaks ties the same way on every shard and in the merge
+        self.queryset = queryset.order_by(*ordering, '-pk' if self.reverse else 'pk')
+        self.fields = [field.lstrip('-') for field in ordering] + ['pk']
+
+    def _key(self, obj):
+        return tuple(getattr(obj, field) for field in self.fields)
+
+    def count(self):
+        return sum(self.queryset.using(alias).count() for alias in all_shards())
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[0:None])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+
+        start, stop = index.start or 0, index.stop
+        parts = [
+            list(self.queryset.using(alias)[:stop]) if stop is not None else list(self.queryset.using(alias))
+            for alias in all_shards()
+        ]
+        merged = heapq.merge(*parts, key=self._key, reverse=self.reverse)
+        return list(islice(merged, start, stop))
+
+
+def _model_label(model):
+    return model._meta.label_lower
+
+
+def _shard_from_hints(hints):
+    alias = getattr(_state, 'shard', None)
+    if alias:
+        return alias
+
+    instance = hints.get('instance')
+    if instance is None:
+        return DEFAULT_DB_ALIAS
+
+    if _model_label(type(instance)) == 'stores.store' and instance.pk is not None:
+        return shard_for_store(instance.pk)
+    store_id = getattr(instance, 'store_id', None)
+    if store_id is not None:
+        return shard_for_store(store_id)
+    # Related lookups from a row read on a shard stay there
+    if instance._state.db in settings.DATABASE_SHARDS:
+        return instance._state.db
+    return DEFAULT_DB_ALIAS
+
+
+class ShardRouter:
+    """
+    Sends store data to its shard and catalog writes to the default
+    database; catalog reads inside use_shard() use the shard's copy. Place
+    it before ReplicaRouter.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not sharding_enabled():
+            return None
+
+        label = _model_label(model)
+        if label in SHARDED_MODELS:
+            return _shard_from_hints(hints)
+        if label in REPLICATED_MODELS:
+            alias = getattr(_state, 'shard', None)
+            if alias:
+                return alias
+            # Related lookups from a shard's rows stay on that shard
+            instance = hints.get('instance')
+            if instance is not None and instance._state.db in settings.DATABASE_SHARDS:
+                return instance._state.db
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not sharding_enabled():
+            return None
+
+        label = _model_label(model)
+        if label in SHARDED_MODELS:
+            return _shard_from_hints(hints)
+        if label in REPLICATED_MODELS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not sharding_enabled():
+            return None
+
+        # The catalog exists everywhere; store data must share its shard
+        labels = {_model_label(type(obj1)), _model_label(type(obj2))}
+        if labels & REPLICATED_MODELS:
+            return True
+        return obj1._state.db == obj2._state.db
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def replicate_instance(instance):
+    """Copy a saved catalog row from the default database to every shard"""
+    model = type(instance)
+    values = {field.attname: getattr(instance, field.attname) for field in model._meta.concrete_fields}
+    for alias in settings.DATABASE_SHARDS:
+        rows = model._base_manager.using(alias)
+        if not rows.filter(pk=instance.pk).update(**values):
+            rows.bulk_create([model(**values)])
+
+
+def replicate_delete(instance):
+    """Delete a catalog row from every shard, cascading to its store data"""
+    model = type(instance)
+    for alias in settings.DATABASE_SHARDS:
+        with use_shard(alias):
+            model._base_manager.using(alias).filter(pk=instance.pk).delete()
+
+
+def replicate_catalog(models, batch_size=1000):
+    """
+    Make every shard's copy of these catalog models match the default
+    database: missing rows are added, changed ones rewritten and extra
+    ones deleted. Returns rows copied per shard.
+    """
+    copied = {}
+    for alias in settings.DATABASE_SHARDS:
+        copied[alias] = 0
+        for model in models:
+            source = model._base_manager.using(DEFAULT_DB_ALIAS).order_by('pk')
+            target = model._base_manager.using(alias)
+            with use_shard(alias):
+                target.exclude(pk__in=list(source.values_list('pk', flat=True))).delete()
+            fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+            batch = []
+            for obj in source.iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    copied[alias] += _upsert(target, batch, fields)
+                    batch = []
+            if batch:
+                copied[alias] += _upsert(target, batch, fields)
+    return copied
+
+
+def _upsert(target, objs, fields):
+    existing = set(target.filter(pk__in=[obj.pk for obj in objs]).values_list('pk', flat=True))
+    target.bulk_update([obj for obj in objs if obj.pk in existing], [field.name for field in fields])
+    target.bulk_create([obj for obj in objs if obj.pk not in existing])
+    return len(objs)
+
+
+def in_sender_database(receiver):
+    """Run a signal receiver for store data on the database that sent it"""
+    @wraps(receiver)
+    def wrapper(sender, **kwargs):
+        with use_shard(kwargs.get('using')):
+            return receiver(sender, **kwargs)
+    return wrapper
+
+
+def replicate_catalog_changes(sender, instance, using, **kwargs):
+    """post_save/post_delete receiver copying catalog writes to the shards"""
+    if not sharding_enabled() or using != DEFAULT_DB_ALIAS:
+        return
+    if kwargs.get('signal') is post_delete:
+        replicate_delete(instance)
+    else:
+        replicate_instance(instance)
+
+
+def interleave_id_sequences(models):
+    """
+    Give each shard's ID sequences for these models a disjoint stride
+    (shard i of n hands out IDs congruent to i + 1 mod n, above every
+    existing one), so an ID names one row across all shards. PostgreSQL
+    only; returns the aliases changed.
+    """
+    shards = list(settings.DATABASE_SHARDS)
+    changed = []
+    for model in models:
+        base = max(
+            model._base_manager.using(alias).order_by('-pk').values_list('pk', flat=True).first() or 0
+            for alias in shards
+        ) + 1
+        for number, alias in enumerate(shards):
+            connection = connections[alias]
+            if connection.vendor != 'postgresql':
+                continue
+            start = base + (number + 1 - base) % len(shards)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [model._meta.db_table, model._meta.pk.column])
+                sequence = cursor.fetchone()[0]
+                cursor.execute(f'ALTER SEQUENCE {sequence} INCREMENT BY {len(shards)} RESTART WITH {start}')
+            if alias not in changed:
+                changed.append(alias)
+    return changed
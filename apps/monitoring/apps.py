@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoring'
+
+    def ready(self):
+        from django.conf import settings
+        from .instrumentation import instrument_caches, instrument_redis
+
+        if settings.METRICS_ENABLED:
+            instrument_caches()
+            instrument_redis()
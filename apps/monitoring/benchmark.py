@@ -0,0 +1,180 @@
+import json
+import math
+import time
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+# Outside INTERNAL_IPS, so the debug toolbar stays out of the timings
+CLIENT_ADDRESS = '10.0.0.1'
+
+# (name, method, path, body, query ceiling); path and body are built from
+# the context returned by benchmark_context
+SCENARIOS = [
+    ('categories.list', 'get', '/api/categories/', None, 2),
+    ('products.list', 'get', '/api/products/', None, 2),
+    ('products.list.category', 'get', '/api/products/?category={category_id}', None, 2),
+    ('products.retrieve', 'get', '/api/products/{product_id}/', None, 1),
+    # Inventory listings include the query computing their validators
+    ('stores.inventory', 'get', '/api/stores/{store_id}/inventory/', None, 4),
+    ('stores.inventory.cursor', 'get', '/api/stores/{store_id}/inventory/?cursor=', None, 3),
+    ('stores.orders', 'get', '/api/stores/{store_id}/orders/', None, 4),
+    ('orders.create', 'post', '/api/orders/', 'order', 18),
+    ('search.relevance', 'get', '/api/search/products/?q={term}&sort=relevance', None, 3),
+    ('search.price_asc', 'get', '/api/search/products/?q={term}&sort=price_asc', None, 3),
+    ('search.price_desc', 'get', '/api/search/products/?q={term}&sort=price_desc', None, 3),
+    ('search.newest', 'get', '/api/search/products/?q={term}&sort=newest', None, 3),
+    ('search.store_in_stock', 'get', '/api/search/products/?q={term}&store_id={store_id}&in_stock=true', None, 4),
+    ('suggest', 'get', '/api/search/suggest/?q={prefix}', None, 2),
+]
+
+
+def benchmark_context():
+    """IDs and terms the scenarios need, taken from the current data"""
+    store = Store.objects.annotate(
+        inventory_count=Count('inventory_items')
+    ).order_by('-inventory_count').first()
+    if store is None:
+        return None
+
+    in_stock = list(
+        Inventory.objects.filter(store=store, quantity__gt=0).order_by('id').values_list('product_id', flat=True)[:3]
+    )
+    product = Product.objects.order_by('id').first()
+    term = product.title.split()[-1].lower()
+    return {
+        'store_id': store.id,
+        'category_id': Category.objects.order_by('id').values_list('id', flat=True).first(),
+        'product_id': product.id,
+        'term': term,
+        'prefix': term[:3],
+        'order': {
+            'store_id': store.id,
+            'fulfillment': 'partial',
+            'items': [{'product_id': product_id, 'quantity_requested': 1} for product_id in in_stock],
+        },
+    }
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(client, method, path, body, iterations, warmup):
+    """
+    Time the request in-process; returns (timings in ms, max queries,
+    status codes). POSTs are rolled back after each request, so every
+    order sees the same stock.
+    """
+    timings, queries, statuses = [], 0, set()
+    for iteration in range(warmup + iterations):
+        if method == 'post':
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.post(path, body, content_type='application/json')
+                    elapsed = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+        else:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                elapsed = (time.perf_counter() - started) * 1000
+
+        if iteration >= warmup:
+            timings.append(elapsed)
+            queries = max(queries, len(captured))
+            statuses.add(response.status_code)
+    return sorted(timings), queries, statuses
+
+
+def run_benchmarks(iterations=50, warmup=3, only=None):
+    """
+    Drive every scenario and return {name: result}; results hold the
+    percentiles, the most queries any iteration ran and the ceiling.
+    """
+    context = benchmark_context()
+    if context is None:
+        raise ValueError('No stores found. Seed data first.')
+
+    client = Client(REMOTE_ADDR=CLIENT_ADDRESS)
+    results = {}
+    # Rate limiting would turn the suggest scenario into 429s; cached
+    # responses would hide the views' own queries
+    with override_settings(RATE_LIMIT_AUTOCOMPLETE=10 ** 9, RESPONSE_CACHE_ENABLED=False):
+        for name, method, path, body, max_queries in SCENARIOS:
+            if only and name not in only:
+                continue
+            timings, queries, statuses = run_scenario(
+                client,
+                method,
+                path.format(**context),
+                json.dumps(context[body]) if body else None,
+                iterations,
+                warmup
+            )
+            results[name] = {
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'queries': queries,
+                'max_queries': max_queries,
+                'statuses': sorted(statuses),
+            }
+    return results
+
+
+def check_results(results, baseline=None, tolerance=0.2, noise_ms=1.0):
+    """
+    Failures as messages: query ceilings exceeded, error statuses, and
+    against a baseline, more queries or a p95 more than tolerance (and
+    noise_ms) slower.
+    """
+    failures = []
+    previous = (baseline or {}).get('scenarios', {})
+    for name, result in results.items():
+        if result['queries'] > result['max_queries']:
+            failures.append(f"{name}: {result['queries']} queries, ceiling is {result['max_queries']}")
+        errors = [code for code in result['statuses'] if code >= 400]
+        if errors:
+            failures.append(f"{name}: returned {', '.join(map(str, errors))}")
+
+        before = previous.get(name)
+        if before is None:
+            continue
+        if result['queries'] > before['queries']:
+            failures.append(f"{name}: {result['queries']} queries, baseline ran {before['queries']}")
+        allowed = before['p95_ms'] * (1 + tolerance)
+        if result['p95_ms'] > allowed and result['p95_ms'] - before['p95_ms'] > noise_ms:
+            failures.append(
+                f"{name}: p95 {result['p95_ms']:.2f} ms, baseline {before['p95_ms']:.2f} ms "
+                f"(+{tolerance:.0%} allowed)"
+            )
+    return failures
+
+
+def load_baseline(path):
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, scale=None):
+    with open(path, 'w') as output:
+        json.dump({
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'scale': scale,
+            'scenarios': results,
+        }, output, indent=2, sort_keys=True)
+        output.write('\n')
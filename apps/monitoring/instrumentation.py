@@ -0,0 +1,130 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+# Try to import redis, but make it optional
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+_state = threading.local()
+_MISSING = object()
+
+MAX_CAPTURED_STATEMENTS = 500
+
+
+class RequestUsage:
+    """What the current request has used so far"""
+
+    __slots__ = (
+        'queries', 'query_seconds', 'cache_hits', 'cache_misses', 'redis_commands', 'statements'
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.redis_commands = 0
+        # (alias, sql, params, many, seconds) while capturing, else None
+        self.statements = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.query_seconds += elapsed
+            if self.statements is not None and len(self.statements) < MAX_CAPTURED_STATEMENTS:
+                self.statements.append((context['connection'].alias, sql, params, many, elapsed))
+
+
+def start_request():
+    usage = _state.usage = RequestUsage()
+    return usage
+
+
+def start_capture():
+    """Keep the current request's statements for slow query capture"""
+    usage = current_usage()
+    if usage is not None and usage.statements is None:
+        usage.statements = []
+
+
+def finish_request():
+    _state.usage = None
+
+
+def current_usage():
+    return getattr(_state, 'usage', None)
+
+
+def instrument_caches():
+    """
+    Count hits and misses of every configured cache backend class.
+    Outside a request the wrappers only cost a thread-local lookup.
+    """
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend, '_metrics_instrumented', False):
+            continue
+
+        original_get = backend.get
+        original_get_many = backend.get_many
+
+        def get(self, key, default=None, *args, _get=original_get, **kwargs):
+            value = _get(self, key, _MISSING, *args, **kwargs)
+            usage = current_usage()
+            if usage is not None:
+                if value is _MISSING:
+                    usage.cache_misses += 1
+                else:
+                    usage.cache_hits += 1
+            return default if value is _MISSING else value
+
+        def get_many(self, keys, *args, _get_many=original_get_many, **kwargs):
+            keys = list(keys)
+            usage = current_usage()
+            if usage is None:
+                return _get_many(self, keys, *args, **kwargs)
+
+            # Backends without a native get_many call get() per key; count once
+            hits, misses = usage.cache_hits, usage.cache_misses
+            found = _get_many(self, keys, *args, **kwargs)
+            usage.cache_hits = hits + len(found)
+            usage.cache_misses = misses + len(keys) - len(found)
+            return found
+
+        backend.get = get
+        backend.get_many = get_many
+        backend._metrics_instrumented = True
+
+
+def instrument_redis():
+    """Count Redis round trips: single commands and pipeline executions"""
+    if not REDIS_AVAILABLE or getattr(redis.Redis, '_metrics_instrumented', False):
+        return
+
+    original_execute_command = redis.Redis.execute_command
+    original_pipeline_execute = redis.client.Pipeline.execute
+
+    def execute_command(self, *args, **options):
+        usage = current_usage()
+        if usage is not None:
+            usage.redis_commands += 1
+        return original_execute_command(self, *args, **options)
+
+    def pipeline_execute(self, *args, **kwargs):
+        usage = current_usage()
+        if usage is not None and self.command_stack:
+            usage.redis_commands += 1
+        return original_pipeline_execute(self, *args, **kwargs)
+
+    redis.Redis.execute_command = execute_command
+    redis.client.Pipeline.execute = pipeline_execute
+    redis.Redis._metrics_instrumented = True
@@ -0,0 +1,90 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.monitoring import benchmark
+from apps.products.seeding import DEFAULT_DENSITY, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every API endpoint in-process, enforce query ceilings and compare '
+        'p50/p95/p99 against a JSON baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Replace the catalog with generated data first (destructive)')
+        parser.add_argument('--categories', type=int, default=15)
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--stores', type=int, default=100)
+        parser.add_argument('--density', type=float, default=DEFAULT_DENSITY,
+                            help='Share of all products each store stocks')
+        parser.add_argument('--orders', type=int, default=0, help='Historical orders to seed')
+        parser.add_argument('--random-seed', type=int, default=42)
+        parser.add_argument('--workers', type=int, default=1, help='Seed generator processes')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json'))
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Write this run as the new baseline instead of comparing')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 slowdown against the baseline (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        scale = None
+        if options['seed']:
+            scale = {
+                'categories': options['categories'],
+                'products': options['products'],
+                'stores': options['stores'],
+                'density': options['density'],
+                'orders': options['orders'],
+                'random_seed': options['random_seed'],
+            }
+            self.stdout.write(f'Seeding {scale}...')
+            counts = seed_catalog(
+                categories=options['categories'],
+                products=options['products'],
+                stores=options['stores'],
+                density=options['density'],
+                orders=options['orders'],
+                seed=options['random_seed'],
+                workers=options['workers'],
+                log=self.stdout.write
+            )
+            self.stdout.write(self.style.SUCCESS(f'Seeded {counts}'))
+
+        try:
+            results = benchmark.run_benchmarks(
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                only=options['scenarios']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'{"scenario":<26}{"queries":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<26}{result['queries']:>5}/{result['max_queries']:<3}"
+                f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+            )
+
+        if options['update_baseline']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['baseline'])), exist_ok=True)
+            benchmark.save_baseline(options['baseline'], results, scale=scale)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            baseline = None
+        else:
+            baseline = benchmark.load_baseline(options['baseline'])
+            if baseline is None:
+                self.stdout.write(f"No baseline at {options['baseline']}; checking query ceilings only")
+
+        failures = benchmark.check_results(results, baseline, tolerance=options['tolerance'])
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise CommandError(f'{len(failures)} benchmark checks failed')
+        self.stdout.write(self.style.SUCCESS('All benchmark checks passed'))
@@ -0,0 +1,59 @@
+import io
+import pstats
+import shutil
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.monitoring import profiling
+
+
+class Command(BaseCommand):
+    help = 'List, show or download profiles captured by ProfilingMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'show', 'get'])
+        parser.add_argument('name', nargs='?', help='show/get: profile file name (see list)')
+        parser.add_argument('--output', help='get: file to write (defaults to stdout)')
+        parser.add_argument('--limit', type=int, default=30,
+                            help='show: functions (pstats) or stacks (collapsed) to print')
+
+    def handle(self, *args, **options):
+        if options['action'] == 'list':
+            for name, size, modified in profiling.list_profiles():
+                self.stdout.write(f'{datetime.fromtimestamp(modified):%Y-%m-%d %H:%M:%S}  {size:>9}  {name}')
+            return
+
+        if not options['name']:
+            raise CommandError(f"{options['action']} needs a profile name.")
+        path = profiling.profile_path(options['name'])
+        if path is None:
+            raise CommandError(f"Profile {options['name']} not found.")
+
+        if options['action'] == 'get':
+            self._get(path, options['output'])
+        else:
+            self._show(path, options['limit'])
+
+    def _get(self, path, output_path):
+        if output_path:
+            shutil.copyfile(path, output_path)
+            self.stderr.write(self.style.SUCCESS(f'Profile written to {output_path}'))
+        elif path.endswith('.prof'):
+            raise CommandError('pstats profiles are binary; use --output.')
+        else:
+            with open(path, encoding='utf-8') as source:
+                self.stdout.write(source.read(), ending='')
+
+    def _show(self, path, limit):
+        if path.endswith('.prof'):
+            report = io.StringIO()
+            pstats.Stats(path, stream=report).sort_stats('cumulative').print_stats(limit)
+            self.stdout.write(report.getvalue())
+            return
+
+        with open(path, encoding='utf-8') as source:
+            lines = [line.rstrip('\n').rsplit(' ', 1) for line in source if line.strip()]
+        total = sum(int(count) for _, count in lines) or 1
+        for stack, count in lines[:limit]:
+            # The innermost frames say the most; keep the last few
+            frames = stack.split(';')
+            self.stdout.write(f"{int(count) * 100 / total:5.1f}%  {' <- '.join(reversed(frames[-4:]))}")
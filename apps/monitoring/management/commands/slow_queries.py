@@ -0,0 +1,27 @@
+import json
+from django.core.management.base import BaseCommand
+from apps.monitoring import slow_queries
+
+
+class Command(BaseCommand):
+    help = 'Dump captured slow requests (newest first) as JSON, or clear the buffer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Only the newest N entries')
+        parser.add_argument('--output', help='File to write (defaults to stdout)')
+        parser.add_argument('--clear', action='store_true', help='Empty the buffer after dumping')
+
+    def handle(self, *args, **options):
+        entries = slow_queries.entries(limit=options['limit'])
+        dump = json.dumps(entries, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(dump + '\n')
+            self.stderr.write(self.style.SUCCESS(f"{len(entries)} entries written to {options['output']}"))
+        else:
+            self.stdout.write(dump)
+
+        if options['clear']:
+            slow_queries.clear()
+            self.stderr.write(self.style.SUCCESS('Slow query buffer cleared'))
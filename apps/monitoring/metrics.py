@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+COUNTERS = {
+    'http_requests_total': 'Requests by view, method and status',
+    'db_queries_total': 'SQL queries run while serving requests',
+    'db_query_duration_seconds_total': 'Time spent in SQL queries',
+    'cache_hits_total': 'Django cache lookups that found a value',
+    'cache_misses_total': 'Django cache lookups that found nothing',
+    'redis_commands_total': 'Redis round trips (pipelines count once)',
+}
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': 'Request latency until the response is returned',
+    'db_queries_per_request': 'SQL queries per request',
+}
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Registry:
+    """
+    This process's metrics. Counters map (name, labels) to a number and
+    histograms to per-bucket counts plus sum and count, where labels is a
+    tuple of (label, value) pairs.
+
+    Each worker writes its registry to METRICS_DIR/<pid>.json at most
+    every METRICS_FLUSH_SECONDS; the /metrics view merges every file, so
+    the numbers cover all workers of the host.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Held from the due check to the rename, so threads don't write the
+        # temp file at once
+        self.flush_lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+        self.pid = None
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0, 0]
+        histogram[1][bisect_left(buckets, value)] += 1
+        histogram[2] += value
+        histogram[3] += 1
+
+    def record_request(self, view, method, status, duration, usage):
+        """Add one finished request; usage is the request's RequestUsage"""
+        labels = (('view', view), ('method', method))
+        with self.lock:
+            self.inc('http_requests_total', labels + (('status', str(status)),))
+            self.observe('http_request_duration_seconds', labels, duration, settings.METRICS_LATENCY_BUCKETS)
+            self.observe('db_queries_per_request', labels, usage.queries, QUERY_COUNT_BUCKETS)
+            view_labels = (('view', view),)
+            if usage.queries:
+                self.inc('db_queries_total', view_labels, usage.queries)
+                self.inc('db_query_duration_seconds_total', view_labels, usage.query_seconds)
+            if usage.cache_hits:
+                self.inc('cache_hits_total', view_labels, usage.cache_hits)
+            if usage.cache_misses:
+                self.inc('cache_misses_total', view_labels, usage.cache_misses)
+            if usage.redis_commands:
+                self.inc('redis_commands_total', view_labels, usage.redis_commands)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, list(labels), list(buckets), list(counts), total, count]
+                    for (name, labels), (buckets, counts, total, count) in self.histograms.items()
+                ],
+            }
+
+    def merge(self, snapshot):
+        with self.lock:
+            _merge_into(self.counters, self.histograms, snapshot)
+
+    def flush(self, force=False):
+        """
+        Write this process's file if it is due (or forced). Unforced
+        flushes skip while another thread is writing; write errors are
+        logged, never raised, since this runs after the response is built.
+        """
+        if not self.flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self.last_flush < settings.METRICS_FLUSH_SECONDS:
+                return
+            self.last_flush = now
+            try:
+                self._write()
+            except OSError as e:
+                logger.warning(f"Writing metrics to {settings.METRICS_DIR} failed: {e}")
+        finally:
+            self.flush_lock.release()
+
+    def _write(self):
+        directory = settings.METRICS_DIR
+        pid = os.getpid()
+        path = os.path.join(directory, f'{pid}.json')
+        if self.pid != pid:
+            # Forked, or a recycled pid: keep what the file already holds
+            self.pid = pid
+            existing = _read(path)
+            if existing:
+                self.merge(existing)
+
+        os.makedirs(directory, exist_ok=True)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as output:
+            json.dump(self.snapshot(), output)
+        os.replace(temporary, path)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.last_flush = 0.0
+            self.pid = None
+
+
+registry = Registry()
+
+
+def _read(path):
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_into(counters, histograms, snapshot):
+    for name, labels, value in snapshot['counters']:
+        key = (name, tuple(tuple(pair) for pair in labels))
+        counters[key] = counters.get(key, 0) + value
+
+    for name, labels, buckets, counts, total, count in snapshot['histograms']:
+        key = (name, tuple(tuple(pair) for pair in labels))
+        histogram = histograms.get(key)
+        if histogram is None:
+            histograms[key] = [buckets, list(counts), total, count]
+        elif histogram[0] == buckets:
+            histogram[1] = [a + b for a, b in zip(histogram[1], counts)]
+            histogram[2] += total
+            histogram[3] += count
+        # Files written with other buckets (before a settings change) are skipped
+
+
+def collect():
+    """Merge every worker's file in METRICS_DIR"""
+    counters, histograms = {}, {}
+    directory = settings.METRICS_DIR
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        names = []
+
+    for name in sorted(names):
+        if name.endswith('.json'):
+            snapshot = _read(os.path.join(directory, name))
+            if snapshot:
+                _merge_into(counters, histograms, snapshot)
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render(counters, histograms):
+    """Prometheus text exposition format"""
+    lines = []
+
+    for name, description in COUNTERS.items():
+        series = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in series:
+            lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    for name, description in HISTOGRAMS.items():
+        series = sorted(
+            (labels, histogram) for (metric, labels), histogram in histograms.items() if metric == name
+        )
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, (buckets, counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+
+    return '\n'.join(lines) + '\n'
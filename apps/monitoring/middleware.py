@@ -0,0 +1,103 @@
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .instrumentation import start_request, finish_request, start_capture
+from .metrics import registry
+from . import profiling, slow_queries
+
+logger = logging.getLogger(__name__)
+
+
+def view_label(request):
+    """
+    Router basename and action for ViewSets (orders.create,
+    stores.inventory), the URL name otherwise, or unmatched.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+
+    view = match.func
+    basename = getattr(view, 'initkwargs', {}).get('basename')
+    actions = getattr(view, 'actions', None)
+    if basename and actions:
+        return f"{basename}.{actions.get(request.method.lower(), request.method.lower())}"
+    return match.view_name or getattr(view, '__name__', 'unknown')
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL queries and time, cache hits/misses and Redis
+    round trips per view. Place it first so it times the whole stack.
+
+    Requests to SLOW_QUERY_VIEWS also keep their statements, and those
+    over SLOW_QUERY_BUDGET_MS are captured with plans (slow_queries).
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED and not settings.SLOW_QUERY_CAPTURE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        usage = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(usage.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            finish_request()
+
+        duration = time.perf_counter() - started
+        view = view_label(request)
+        if settings.METRICS_ENABLED:
+            registry.record_request(view, request.method, response.status_code, duration, usage)
+            registry.flush()
+
+        if usage.statements is not None and duration * 1000 >= settings.SLOW_QUERY_BUDGET_MS:
+            try:
+                slow_queries.capture(request, view, duration, usage)
+            except Exception as e:
+                logger.warning(f"Slow query capture failed for {view}: {e}")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The view is only known once the URL is resolved
+        if slow_queries.watched(view_label(request)):
+            start_capture()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the view (and response rendering) of requests that carry
+    X-Profile: <PROFILING_TOKEN>, or of a PROFILING_SAMPLE_RATE share of
+    requests. Place it last so only the view is inside the profiler.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_TOKEN and not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = view_label(request)
+        if not profiling.should_profile(request, view):
+            return None
+
+        def run_view():
+            response = view_func(request, *view_args, **view_kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            return response
+
+        response, name = profiling.profile_call(view, run_view)
+        response['X-Profile-Id'] = name
+        return response
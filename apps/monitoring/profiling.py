@@ -0,0 +1,137 @@
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_HEADER = 'X-Profile'
+EXTENSIONS = {'sampling': 'collapsed', 'cprofile': 'prof'}
+
+
+def should_profile(request, view):
+    """An authenticated X-Profile header, or the configured sample rate"""
+    if settings.PROFILING_VIEWS and view not in settings.PROFILING_VIEWS:
+        return False
+
+    token = request.headers.get(PROFILE_HEADER)
+    if token and settings.PROFILING_TOKEN:
+        return hmac.compare_digest(token, settings.PROFILING_TOKEN)
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+    return f'{module}.{code.co_name}:{code.co_firstlineno}'
+
+
+class StackSampler:
+    """
+    Samples one thread's stack every PROFILING_INTERVAL_MS from a helper
+    thread and counts identical stacks, for collapsed-stack output
+    (flamegraph.pl, speedscope). Time spent waiting on the database
+    shows up under the driver's execute frames.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f'{stack} {count}\n')
+
+
+def profile_call(view, callback):
+    """
+    Run callback under the PROFILING_MODE profiler, store the result in
+    PROFILING_DIR and return (callback's result, file name).
+    """
+    mode = settings.PROFILING_MODE
+    started = time.perf_counter()
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        result = profiler.runcall(callback)
+    else:
+        with StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000) as profiler:
+            result = callback()
+    duration_ms = int((time.perf_counter() - started) * 1000)
+
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    name = '{}-{}-{}ms-{}.{}'.format(
+        timezone.now().strftime('%Y%m%dT%H%M%S%f'),
+        view.replace('/', '_'),
+        duration_ms,
+        os.getpid(),
+        EXTENSIONS.get(mode, 'collapsed')
+    )
+    if mode == 'cprofile':
+        profiler.dump_stats(os.path.join(settings.PROFILING_DIR, name))
+    else:
+        profiler.dump(os.path.join(settings.PROFILING_DIR, name))
+
+    prune_profiles()
+    return result, name
+
+
+def list_profiles():
+    """(name, size, modified) for stored profiles, newest first"""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+
+    profiles = []
+    for name in names:
+        if name.rsplit('.', 1)[-1] in EXTENSIONS.values():
+            try:
+                stat = os.stat(os.path.join(settings.PROFILING_DIR, name))
+            except FileNotFoundError:
+                continue
+            profiles.append((name, stat.st_size, stat.st_mtime))
+    profiles.sort(key=lambda profile: (profile[2], profile[0]), reverse=True)
+    return profiles
+
+
+def prune_profiles():
+    """Keep only the newest PROFILING_MAX_FILES profiles"""
+    for name, _, _ in list_profiles()[settings.PROFILING_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(settings.PROFILING_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def profile_path(name):
+    """Path of a stored profile, or None for unknown or unsafe names"""
+    if os.path.basename(name) != name:
+        return None
+    path = os.path.join(settings.PROFILING_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,104 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'slow_queries:seq'
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def _entry_key(slot):
+    return f'slow_queries:entry:{slot}'
+
+
+def watched(view):
+    return settings.SLOW_QUERY_CAPTURE and view in settings.SLOW_QUERY_VIEWS
+
+
+def _jsonable(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _jsonable_value(value) for key, value in params.items()}
+    return [_jsonable_value(value) for value in params]
+
+
+def _jsonable_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable_value(item) for item in value]
+    return str(value)
+
+
+def explain(alias, sql, params):
+    """
+    The plan for one statement without running it: EXPLAIN (ANALYZE off,
+    FORMAT JSON) on PostgreSQL, EXPLAIN QUERY PLAN on SQLite. Runs in a
+    savepoint so a failure can't break an open transaction.
+    """
+    connection = connections[alias]
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (ANALYZE off, FORMAT JSON) {sql}', params)
+                return cursor.fetchone()[0]
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return [row[-1] for row in cursor.fetchall()]
+    except DatabaseError as e:
+        return {'error': str(e)}
+    return None
+
+
+def capture(request, view, duration, usage):
+    """
+    Store a request that went over SLOW_QUERY_BUDGET_MS: its
+    SLOW_QUERY_TOP slowest statements, their parameters and plans.
+    """
+    statements = sorted(usage.statements, key=lambda statement: statement[4], reverse=True)
+    queries = []
+    for alias, sql, params, many, seconds in statements[:settings.SLOW_QUERY_TOP]:
+        explainable = not many and sql.lstrip().upper().startswith(EXPLAINABLE)
+        queries.append({
+            'database': alias,
+            'sql': sql,
+            'params': _jsonable(params),
+            'duration_ms': round(seconds * 1000, 2),
+            'plan': explain(alias, sql, params) if explainable else None,
+        })
+
+    record({
+        'captured_at': timezone.now().isoformat(),
+        'view': view,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'duration_ms': round(duration * 1000, 2),
+        'query_count': usage.queries,
+        'query_ms': round(usage.query_seconds * 1000, 2),
+        'queries': queries,
+    })
+
+
+def record(entry):
+    """
+    Add an entry to the ring buffer: a shared sequence number picks one
+    of SLOW_QUERY_BUFFER_SIZE slots, so the oldest entry is overwritten.
+    """
+    cache.add(SEQUENCE_KEY, 0, None)
+    entry['id'] = cache.incr(SEQUENCE_KEY)
+    cache.set(_entry_key(entry['id'] % settings.SLOW_QUERY_BUFFER_SIZE), entry, None)
+
+
+def entries(limit=None):
+    """Buffered entries, newest first"""
+    keys = [_entry_key(slot) for slot in range(settings.SLOW_QUERY_BUFFER_SIZE)]
+    found = sorted(cache.get_many(keys).values(), key=lambda entry: entry['id'], reverse=True)
+    return found[:limit] if limit else found
+
+
+def clear():
+    cache.delete_many([_entry_key(slot) for slot in range(settings.SLOW_QUERY_BUFFER_SIZE)])
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('metrics', views.metrics, name='metrics'),
+    path('api/monitoring/slow-queries/', views.slow_queries, name='slow-queries'),
+]
@@ -0,0 +1,47 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .metrics import CONTENT_TYPE, registry, collect, render
+from . import slow_queries as slow_query_buffer
+
+
+def metrics(request):
+    """
+    GET /metrics
+    
+    Prometheus text format, summed over every worker that shares
+    METRICS_DIR. Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+    """
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied, f'Bearer {settings.METRICS_TOKEN}'):
+            return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    
+    # Include this worker's latest numbers
+    registry.flush(force=True)
+    return HttpResponse(render(*collect()), content_type=CONTENT_TYPE)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def slow_queries(request):
+    """
+    GET /api/monitoring/slow-queries/?limit=20
+    
+    Captured slow requests, newest first, with their slowest statements
+    and EXPLAIN plans. Staff only.
+    """
+    try:
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        return Response(
+            {'error': 'limit must be an integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    entries = slow_query_buffer.entries(limit=max(limit, 1))
+    return Response({'count': len(entries), 'results': entries})
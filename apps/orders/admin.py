@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, Reservation, ReservationItem, OrderEvent
 
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ['product', 'quantity_requested']
+    readonly_fields = ['product', 'quantity_requested', 'quantity_fulfilled']
 
 
 @admin.register(Order)
@@ -19,7 +19,30 @@ class OrderAdmin(admin.ModelAdmin):
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ['id', 'order', 'product', 'quantity_requested']
+    list_display = ['id', 'order', 'product', 'quantity_requested', 'quantity_fulfilled']
     list_filter = ['order__status', 'order__created_at']
     search_fields = ['product__title', 'order__id']
-    list_select_related = ['order', 'product']
\ No newline at end of file
+    list_select_related = ['order', 'product']
+
+
+class ReservationItemInline(admin.TabularInline):
+    model = ReservationItem
+    extra = 0
+    readonly_fields = ['product', 'quantity']
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'store', 'status', 'expires_at', 'order', 'created_at']
+    list_filter = ['status', 'store']
+    search_fields = ['id', 'store__name']
+    list_select_related = ['store', 'order']
+    inlines = [ReservationItemInline]
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order', 'event_type', 'created_at', 'published_at', 'attempts']
+    list_filter = ['event_type', 'published_at']
+    search_fields = ['order__id']
+    readonly_fields = ['order', 'event_type', 'payload', 'created_at']
@@ -0,0 +1,104 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from apps.products.models import Product
+from apps.stores.models import Store
+
+# Bumped whenever a store or product changes; every process drops its
+# copy when it sees a new value
+VERSION_KEY = 'catalog:version'
+
+# Only what the order path reads
+STORE_FIELDS = ('id', 'name')
+PRODUCT_FIELDS = ('id', 'title', 'price')
+
+
+class _CatalogState:
+    def __init__(self, version):
+        self.version = version
+        self.stores = {}
+        self.products = {}
+
+
+_state = _CatalogState(None)
+_lock = threading.Lock()
+
+
+def _new_version():
+    # Never equal to a version a process saw before the key went missing
+    return time.time_ns()
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _current_state():
+    """This process's catalog copy, replaced when the shared version moves"""
+    global _state
+    version = _current_version()
+    state = _state
+    if state.version != version:
+        with _lock:
+            if _state.version != version:
+                _state = _CatalogState(version)
+            state = _state
+    return state
+
+
+def get_store(store_id):
+    """The store (id and name only), or None if it doesn't exist"""
+    if not settings.CATALOG_CACHE_ENABLED:
+        return Store.objects.only(*STORE_FIELDS).filter(id=store_id).first()
+
+    state = _current_state()
+    store = state.stores.get(store_id)
+    if store is None:
+        # Unknown IDs are not cached, so a new store is found right away
+        store = Store.objects.only(*STORE_FIELDS).filter(id=store_id).first()
+        if store is not None:
+            state.stores[store_id] = store
+    return store
+
+
+def get_products(product_ids):
+    """in_bulk() for products (id, title and price only); unknown IDs are left out"""
+    if not settings.CATALOG_CACHE_ENABLED:
+        return Product.objects.only(*PRODUCT_FIELDS).in_bulk(product_ids)
+
+    state = _current_state()
+    products = {}
+    missing = []
+    for product_id in product_ids:
+        product = state.products.get(product_id)
+        if product is None:
+            missing.append(product_id)
+        else:
+            products[product_id] = product
+
+    if missing:
+        fetched = Product.objects.only(*PRODUCT_FIELDS).in_bulk(missing)
+        if len(state.products) + len(fetched) > settings.CATALOG_CACHE_MAX_PRODUCTS:
+            state.products.clear()
+        state.products.update(fetched)
+        products.update(fetched)
+    return products
+
+
+def invalidate_catalog():
+    """Bump the shared version once the current transaction commits"""
+    transaction.on_commit(_bump_version)
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Not set yet or evicted
+        cache.set(VERSION_KEY, _new_version(), timeout=None)
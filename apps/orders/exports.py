@@ -0,0 +1,31 @@
+from apps.stores.exports import EXPORT_CHUNK_SIZE
+from .models import OrderItem
+
+ORDER_EXPORT_FIELDS = (
+    # (column name, values_list lookup) - one row per order line
+    ('order_id', 'order_id'),
+    ('store_id', 'order__store_id'),
+    ('status', 'order__status'),
+    ('created_at', 'order__created_at'),
+    ('item_id', 'id'),
+    ('product_id', 'product_id'),
+    ('product_title', 'product__title'),
+    ('quantity_requested', 'quantity_requested'),
+    ('quantity_fulfilled', 'quantity_fulfilled'),
+)
+
+ORDER_EXPORT_HEADER = [column for column, _ in ORDER_EXPORT_FIELDS]
+
+
+def order_export_rows(store_id=None, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    """
+    Iterate order lines as tuples through a server-side cursor.
+    Exports every store when store_id is None.
+    """
+    items = OrderItem.objects.using(using).all()
+    if store_id is not None:
+        items = items.filter(order__store_id=store_id)
+
+    return items.order_by('order_id', 'id').values_list(
+        *[lookup for _, lookup in ORDER_EXPORT_FIELDS]
+    ).iterator(chunk_size=chunk_size)
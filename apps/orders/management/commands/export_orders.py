@@ -0,0 +1,35 @@
+from itertools import chain
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.sharding import all_shards, shard_for_store
+from apps.stores.models import Store
+from apps.stores.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, write_export
+from apps.orders.exports import ORDER_EXPORT_HEADER, order_export_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream order history (one row per order line) to CSV or NDJSON with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--store', type=int, help='Only export this store (defaults to all stores)')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        store_id = options['store']
+        if store_id is not None and not Store.objects.filter(id=store_id).exists():
+            raise CommandError(f'Store with id {store_id} not found.')
+
+        # All stores are exported shard by shard
+        shards = all_shards() if store_id is None else [shard_for_store(store_id)]
+        rows = chain.from_iterable(
+            order_export_rows(store_id, chunk_size=options['chunk_size'], using=alias)
+            for alias in shards
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                write_export(options['format'], ORDER_EXPORT_HEADER, rows, output)
+            self.stderr.write(self.style.SUCCESS(f"Orders written to {options['output']}"))
+        else:
+            write_export(options['format'], ORDER_EXPORT_HEADER, rows, self.stdout)
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.stores.models import Store
+from apps.orders import redis_stock
+
+
+class Command(BaseCommand):
+    help = "Load store stock into Redis, verify it against the database, or flush queued orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['load', 'verify', 'flush'])
+        parser.add_argument('--store', type=int, action='append', dest='stores',
+                            help='Store ID (repeatable; defaults to every store)')
+        parser.add_argument('--force', action='store_true',
+                            help='load: reload stores that are already in Redis')
+        parser.add_argument('--fix', action='store_true',
+                            help='verify: correct mismatches in Redis')
+
+    def handle(self, *args, **options):
+        if not redis_stock.REDIS_AVAILABLE:
+            raise CommandError('The redis package is not installed.')
+
+        if options['action'] == 'flush':
+            flushed = redis_stock.flush_pending_orders()
+            self.stdout.write(self.style.SUCCESS(f'Wrote {flushed} queued orders'))
+            return
+
+        store_ids = options['stores'] or list(Store.objects.values_list('id', flat=True))
+        if options['action'] == 'load':
+            self._load(store_ids, options['force'])
+        else:
+            self._verify(store_ids, options['fix'])
+
+    def _load(self, store_ids, force):
+        loaded = 0
+        for store_id in store_ids:
+            if redis_stock.load_store(store_id, force=force):
+                loaded += 1
+            else:
+                self.stdout.write(f'Store {store_id} already loaded, skipped (use --force)')
+        self.stdout.write(self.style.SUCCESS(f'Loaded {loaded} stores into Redis'))
+
+    def _verify(self, store_ids, fix):
+        mismatched = 0
+        for store_id in store_ids:
+            try:
+                mismatches = redis_stock.verify_store(store_id, fix=fix)
+            except redis_stock.StoreNotLoaded:
+                self.stdout.write(f'Store {store_id} not loaded')
+                continue
+
+            if mismatches:
+                mismatched += 1
+                for product_id, (expected, actual) in sorted(mismatches.items()):
+                    self.stdout.write(
+                        f'Store {store_id} product {product_id}: expected {expected}, Redis has {actual}'
+                    )
+
+        if mismatched:
+            action = 'corrected' if fix else 'found'
+            self.stdout.write(self.style.WARNING(f'Mismatches {action} in {mismatched} stores'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Redis stock matches the database'))
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.core.sharding import for_each_shard
+from apps.orders.outbox import relay_order_events
+
+
+class Command(BaseCommand):
+    help = "Publish pending order events to ORDER_EVENT_SINK (run several for more throughput)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Events per batch (defaults to ORDER_EVENT_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep relaying until interrupted')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='--loop: seconds to sleep when no events are pending')
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            published = sum(for_each_shard(relay_order_events, batch_size=options['batch_size']))
+            self.stdout.write(self.style.SUCCESS(f'Published {published} order events'))
+            return
+
+        total = 0
+        try:
+            while True:
+                published = sum(for_each_shard(relay_order_events, batch_size=options['batch_size']))
+                total += published
+                if not published:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS(f'Published {total} order events'))
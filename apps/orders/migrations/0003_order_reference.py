@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='reference',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
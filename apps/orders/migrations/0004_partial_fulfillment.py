@@ -0,0 +1,33 @@
+# Generated by Django 4.2.9 on 2026-10-19 07:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_quantity_fulfilled(apps, schema_editor):
+    # Orders before partial fulfillment were all-or-nothing
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    OrderItem.objects.filter(order__status='CONFIRMED').update(
+        quantity_fulfilled=F('quantity_requested')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='quantity_fulfilled',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_quantity_fulfilled, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('PARTIAL', 'Partially fulfilled'), ('REJECTED', 'Rejected')], db_index=True, default='PENDING', max_length=20),
+        ),
+    ]
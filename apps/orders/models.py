@@ -7,6 +7,7 @@ class Order(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('CONFIRMED', 'Confirmed'),
+        ('PARTIAL', 'Partially fulfilled'),
         ('REJECTED', 'Rejected'),
     ]
     
@@ -22,6 +23,8 @@ class Order(models.Model):
         db_index=True
     )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Handed out when Redis stock mode accepts an order before it is written
+    reference = models.UUIDField(null=True, blank=True, unique=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
@@ -46,6 +49,9 @@ class OrderItem(models.Model):
         related_name='order_items'
     )
     quantity_requested = models.IntegerField()
+    # Units actually deducted: all of them for confirmed orders, none for
+    # rejected ones, and anything in between for partial fulfillment
+    quantity_fulfilled = models.IntegerField(default=0)
     
     class Meta:
         indexes = [
@@ -53,4 +59,114 @@ class OrderItem(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.product.title} x {self.quantity_requested}"
\ No newline at end of file
+        return f"{self.product.title} x {self.quantity_requested}"
+
+
+class Reservation(models.Model):
+    """
+    Time-limited hold on stock for a cart. Stock is deducted from
+    Inventory when the hold is placed and either turned into an Order or
+    returned to the store on release/expiry.
+    """
+    STATUS_CHOICES = [
+        ('ACTIVE', 'Active'),
+        ('CONVERTED', 'Converted'),
+        ('RELEASED', 'Released'),
+        ('EXPIRED', 'Expired'),
+    ]
+    
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='ACTIVE'
+    )
+    expires_at = models.DateTimeField()
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reservation'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The expiry sweeper only ever looks at active holds
+            models.Index(
+                fields=['expires_at'],
+                name='reservation_active_expiry_idx',
+                condition=models.Q(status='ACTIVE')
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Reservation #{self.id} - store {self.store_id} - {self.status}"
+
+
+class ReservationItem(models.Model):
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='reservation_items'
+    )
+    quantity = models.IntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['reservation', 'product']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity}"
+
+
+class OrderEvent(models.Model):
+    """
+    Outbox row written in the same transaction as its order. A relay
+    publishes pending events to the configured sink in batches; delivery
+    is at least once, so consumers should dedupe on the event id.
+    """
+    EVENT_TYPE_CHOICES = [
+        ('order.created', 'Order created'),
+        ('order.confirmed', 'Order confirmed'),
+        ('order.partial', 'Order partially fulfilled'),
+        ('order.rejected', 'Order rejected'),
+    ]
+    
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    
+    class Meta:
+        indexes = [
+            # The relay only scans unpublished events, oldest first
+            models.Index(
+                fields=['id'],
+                name='order_event_pending_idx',
+                condition=models.Q(published_at__isnull=True)
+            ),
+            models.Index(fields=['published_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} for order #{self.order_id}"
@@ -0,0 +1,166 @@
+import json
+import logging
+import urllib.request
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from apps.core.sharding import current_shard
+from .models import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+STATUS_EVENTS = {
+    'CONFIRMED': 'order.confirmed',
+    'PARTIAL': 'order.partial',
+    'REJECTED': 'order.rejected',
+}
+
+
+def record_order_events(orders):
+    """
+    Write outbox events for new orders in the caller's transaction.
+    orders is a list of (order, lines) with lines as (product_id,
+    quantity_requested, quantity_fulfilled); each order gets an
+    order.created event and one for its status.
+    """
+    events = []
+    for order, lines in orders:
+        payload = {
+            'order_id': order.id,
+            'store_id': order.store_id,
+            'status': order.status,
+            'reference': str(order.reference) if order.reference else None,
+            'items': [
+                {
+                    'product_id': product_id,
+                    'quantity_requested': requested,
+                    'quantity_fulfilled': fulfilled,
+                }
+                for product_id, requested, fulfilled in lines
+            ],
+        }
+        events.append(OrderEvent(order=order, event_type='order.created', payload=payload))
+        events.append(OrderEvent(order=order, event_type=STATUS_EVENTS[order.status], payload=payload))
+    OrderEvent.objects.bulk_create(events)
+
+
+def order_lines(items, fulfilled):
+    """Event lines for validated order items and their fulfilled quantities"""
+    return [
+        (item['product_id'], item['quantity_requested'], quantity)
+        for item, quantity in zip(items, fulfilled)
+    ]
+
+
+def event_message(event):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'created_at': event.created_at,
+        'data': event.payload,
+    }
+
+
+class LogSink:
+    """Writes events to the application log"""
+
+    def publish(self, messages):
+        for message in messages:
+            logger.info(f"Order event {message['id']} {message['type']}: {message['data']}")
+
+
+class FileSink:
+    """Appends events as NDJSON to ORDER_EVENT_FILE_PATH"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.ORDER_EVENT_FILE_PATH
+
+    def publish(self, messages):
+        with open(self.path, 'a', encoding='utf-8') as output:
+            for message in messages:
+                output.write(json.dumps(message, cls=DjangoJSONEncoder) + '\n')
+
+
+class HttpSink:
+    """POSTs each batch as a JSON array to ORDER_EVENT_HTTP_URL"""
+
+    def __init__(self, url=None, timeout=None):
+        self.url = url or settings.ORDER_EVENT_HTTP_URL
+        self.timeout = timeout or settings.ORDER_EVENT_HTTP_TIMEOUT
+
+    def publish(self, messages):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(messages, cls=DjangoJSONEncoder).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        # Non-2xx responses raise HTTPError, so the batch is retried
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_sink():
+    return import_string(settings.ORDER_EVENT_SINK)()
+
+
+def relay_order_events(sink=None, batch_size=None, max_batches=None):
+    """
+    Publish pending events in batches until none are left (or max_batches).
+
+    Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED and held
+    until it is published and marked, so any number of relays can run side
+    by side without sending the same batch. A failed batch records the
+    error and stays pending; events past ORDER_EVENT_MAX_ATTEMPTS are left
+    for inspection. Returns the number of events published.
+    """
+    sink = sink or get_sink()
+    batch_size = batch_size or settings.ORDER_EVENT_BATCH_SIZE
+    published = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        batches += 1
+        with transaction.atomic(using=current_shard()):
+            batch = list(
+                OrderEvent.objects.select_for_update(skip_locked=True).filter(
+                    published_at__isnull=True,
+                    attempts__lt=settings.ORDER_EVENT_MAX_ATTEMPTS
+                ).order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+
+            event_ids = [event.id for event in batch]
+            try:
+                sink.publish([event_message(event) for event in batch])
+            except Exception as e:
+                logger.warning(f"Publishing {len(batch)} order events failed: {e}")
+                OrderEvent.objects.filter(id__in=event_ids).update(
+                    attempts=F('attempts') + 1,
+                    last_error=str(e)[:1000]
+                )
+                break
+
+            OrderEvent.objects.filter(id__in=event_ids).update(
+                published_at=timezone.now(),
+                attempts=F('attempts') + 1
+            )
+            published += len(batch)
+
+        if len(batch) < batch_size:
+            break
+
+    return published
+
+
+def prune_published_events(days=None):
+    """Delete events published more than ORDER_EVENT_RETENTION_DAYS ago"""
+    days = settings.ORDER_EVENT_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OrderEvent.objects.filter(published_at__lt=cutoff).delete()
+    return deleted
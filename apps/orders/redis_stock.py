@@ -0,0 +1,398 @@
+import json
+import uuid
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.core.sharding import current_shard, group_by_shard, shard_for_store, use_shard
+from apps.products.models import Product
+from apps.stores.ledger import ledger_enabled, append_movements
+from apps.stores.models import Store, Inventory
+from apps.stores.stats import LIVE_BALANCE, adjust_store_stats
+from .models import Order, OrderItem
+from .services import notify_order_confirmed
+from .outbox import record_order_events
+
+# Try to import redis, but make it optional
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Accepted orders waiting to be written to the database
+PENDING_KEY = 'stock:pending'
+FLUSH_LOCK_KEY = 'stock:flush-lock'
+
+# KEYS: stock hash, pending list. ARGV: payload ('' to skip queueing),
+# then product_id, quantity pairs. Returns {-1} if the store isn't
+# loaded, {0, short product ids...} or {1} once the basket is deducted.
+RESERVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1}
+end
+local short = {}
+for i = 2, #ARGV, 2 do
+    local available = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+    if available < tonumber(ARGV[i + 1]) then
+        table.insert(short, ARGV[i])
+    end
+end
+if #short > 0 then
+    return {0, unpack(short)}
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1]))
+end
+if ARGV[1] ~= '' then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return {1}
+"""
+
+# KEYS: stock hash. ARGV: product_id, quantity pairs. Adds stock back,
+# but only to a loaded store so a partial hash is never created.
+RESTOCK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], tonumber(ARGV[i + 1]))
+end
+return 1
+"""
+
+# KEYS: stock hash, pending list. ARGV: payload with [product_id, quantity]
+# lines. Fills each line as far as stock allows, in order, records the
+# fulfilled quantity as a third element of the line and queues the
+# payload if anything was filled. Returns {-1} if the store isn't loaded,
+# else {1, fulfilled per line...}.
+PARTIAL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1}
+end
+local entry = cjson.decode(ARGV[1])
+local fulfilled = {}
+local filled_any = false
+for i, line in ipairs(entry['items']) do
+    local product_id = tostring(line[1])
+    local available = tonumber(redis.call('HGET', KEYS[1], product_id) or '0')
+    local quantity = math.min(math.max(available, 0), line[2])
+    if quantity > 0 then
+        redis.call('HINCRBY', KEYS[1], product_id, -quantity)
+        filled_any = true
+    end
+    line[3] = quantity
+    fulfilled[i] = quantity
+end
+if filled_any then
+    redis.call('RPUSH', KEYS[2], cjson.encode(entry))
+end
+return {1, unpack(fulfilled)}
+"""
+
+# KEYS: stock hash, pending list. ARGV: store_id, then product_id,
+# quantity pairs from the database. Queued orders for the store are not
+# in the database yet, so they are subtracted before the hash is written.
+LOAD_SCRIPT = """
+local held = {}
+for _, raw in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+    local entry = cjson.decode(raw)
+    if tostring(entry['store_id']) == ARGV[1] then
+        for _, line in ipairs(entry['items']) do
+            local product_id = tostring(line[1])
+            held[product_id] = (held[product_id] or 0) + (line[3] or line[2])
+        end
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '_loaded', 1)
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], tonumber(ARGV[i + 1]) - (held[ARGV[i]] or 0))
+end
+return 1
+"""
+
+# Marks a loaded store, so stores without inventory still count as loaded
+LOADED_FIELD = '_loaded'
+
+
+class StoreNotLoaded(Exception):
+    """Raised when a store's stock hasn't been loaded into Redis"""
+
+
+def redis_stock_enabled():
+    return settings.REDIS_STOCK_MODE and REDIS_AVAILABLE
+
+
+@lru_cache(maxsize=None)
+def _client_for(url):
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def get_client():
+    return _client_for(settings.REDIS_STOCK_URL)
+
+
+def stock_key(store_id):
+    return f'stock:{store_id}'
+
+
+def _pairs(quantities):
+    args = []
+    for product_id, quantity in sorted(quantities.items()):
+        args.extend([product_id, quantity])
+    return args
+
+
+def basket_quantities(items):
+    """Total quantity per product, so repeated lines are checked together"""
+    quantities = {}
+    for item in items:
+        quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity_requested']
+    return quantities
+
+
+def reserve(store_id, quantities, payload=None):
+    """
+    Check and deduct a whole basket in one atomic script, queueing payload
+    for write-behind when given. Returns the product IDs that are short
+    (nothing is deducted then); raises StoreNotLoaded.
+    """
+    client = get_client()
+    result = client.eval(
+        RESERVE_SCRIPT,
+        2,
+        stock_key(store_id),
+        PENDING_KEY,
+        json.dumps(payload) if payload else '',
+        *_pairs(quantities)
+    )
+    if result[0] == -1:
+        raise StoreNotLoaded(store_id)
+    return [int(product_id) for product_id in result[1:]]
+
+
+def restock(store_id, quantities):
+    """Add stock back in Redis; a no-op for stores that aren't loaded"""
+    if quantities:
+        get_client().eval(RESTOCK_SCRIPT, 1, stock_key(store_id), *_pairs(quantities))
+
+
+def place_order(store_id, items, partial=False):
+    """
+    Accept an order against Redis stock. Returns (reference, fulfilled):
+    the reference of the queued order, or None if nothing was filled, and
+    the fulfilled quantity per line. Without partial, a basket is filled
+    completely or not at all.
+    """
+    reference = str(uuid.uuid4())
+    payload = {
+        'reference': reference,
+        'store_id': store_id,
+        'items': [[item['product_id'], item['quantity_requested']] for item in items],
+    }
+
+    if partial:
+        result = get_client().eval(
+            PARTIAL_SCRIPT, 2, stock_key(store_id), PENDING_KEY, json.dumps(payload)
+        )
+        if result[0] == -1:
+            raise StoreNotLoaded(store_id)
+        fulfilled = [int(quantity) for quantity in result[1:]]
+        return (reference if any(fulfilled) else None), fulfilled
+
+    if reserve(store_id, basket_quantities(items), payload):
+        return None, [0] * len(items)
+    return reference, [item['quantity_requested'] for item in items]
+
+
+def database_stock(store_id):
+    """Live balance per product from the database"""
+    return dict(
+        Inventory.objects.using(shard_for_store(store_id)).filter(store_id=store_id).annotate(
+            balance=LIVE_BALANCE
+        ).values_list('product_id', 'balance')
+    )
+
+
+def _flush_lock(client, blocking=True):
+    return client.lock(FLUSH_LOCK_KEY, timeout=300, blocking_timeout=60 if blocking else None)
+
+
+def load_store(store_id, force=False):
+    """
+    Load a store's stock into Redis. Holding the flush lock keeps the
+    database still while the script subtracts orders queued meanwhile, so
+    this is safe under traffic. Returns False if already loaded.
+    """
+    client = get_client()
+    if client.exists(stock_key(store_id)) and not force:
+        return False
+
+    with _flush_lock(client):
+        client.eval(
+            LOAD_SCRIPT,
+            2,
+            stock_key(store_id),
+            PENDING_KEY,
+            store_id,
+            *_pairs(database_stock(store_id))
+        )
+    return True
+
+
+def verify_store(store_id, fix=False):
+    """
+    Compare Redis with the database plus queued orders. Returns
+    {product_id: (expected, actual)} for every mismatch; with fix, the
+    differences are applied to Redis as increments so orders accepted
+    meanwhile are kept.
+    """
+    client = get_client()
+    with _flush_lock(client):
+        pipe = client.pipeline(transaction=True)
+        pipe.hgetall(stock_key(store_id))
+        pipe.lrange(PENDING_KEY, 0, -1)
+        cached, pending = pipe.execute()
+        expected = database_stock(store_id)
+
+    if not cached:
+        raise StoreNotLoaded(store_id)
+
+    for raw in pending:
+        entry = json.loads(raw)
+        if entry['store_id'] == store_id:
+            for line in entry['items']:
+                product_id, quantity = line[0], line[-1]
+                expected[product_id] = expected.get(product_id, 0) - quantity
+
+    actual = {int(field): int(value) for field, value in cached.items() if field != LOADED_FIELD}
+    mismatches = {
+        product_id: (expected.get(product_id, 0), actual.get(product_id, 0))
+        for product_id in set(expected) | set(actual)
+        if expected.get(product_id, 0) != actual.get(product_id, 0)
+    }
+
+    if fix and mismatches:
+        restock(store_id, {
+            product_id: wanted - found for product_id, (wanted, found) in mismatches.items()
+        })
+    return mismatches
+
+
+def flush_pending_orders(batch_size=None):
+    """
+    Write queued orders and their inventory deltas to the database, one
+    transaction per batch. Entries are only trimmed from the queue after
+    their batch commits, and already-written references are skipped, so
+    a crash between the two replays safely. A Redis lock keeps flushers
+    from overlapping. Returns the number of entries flushed.
+    """
+    batch_size = batch_size or settings.REDIS_STOCK_FLUSH_BATCH_SIZE
+    client = get_client()
+    lock = _flush_lock(client, blocking=False)
+    if not lock.acquire(blocking=False):
+        return 0
+
+    flushed = 0
+    try:
+        while True:
+            raw = client.lrange(PENDING_KEY, 0, batch_size - 1)
+            if not raw:
+                break
+            # One transaction per shard; replays skip what was written
+            for alias, entries in group_by_shard([json.loads(entry) for entry in raw], 'store_id'):
+                with use_shard(alias):
+                    _write_batch(entries)
+            client.ltrim(PENDING_KEY, len(raw), -1)
+            flushed += len(raw)
+            if len(raw) < batch_size:
+                break
+    finally:
+        lock.release()
+    return flushed
+
+
+def _write_batch(entries):
+    with transaction.atomic(using=current_shard()):
+        written = {
+            str(reference) for reference in Order.objects.filter(
+                reference__in=[entry['reference'] for entry in entries]
+            ).values_list('reference', flat=True)
+        }
+        entries = [entry for entry in entries if entry['reference'] not in written]
+        if not entries:
+            return
+
+        # Lines are [product_id, requested] or, from partial orders,
+        # [product_id, requested, fulfilled]
+        for entry in entries:
+            entry['lines'] = [
+                (line[0], line[1], line[2] if len(line) > 2 else line[1])
+                for line in entry['items']
+            ]
+
+        orders = Order.objects.bulk_create([
+            Order(
+                store_id=entry['store_id'],
+                status='CONFIRMED' if all(
+                    requested == fulfilled for _, requested, fulfilled in entry['lines']
+                ) else 'PARTIAL',
+                reference=entry['reference']
+            )
+            for entry in entries
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=product_id,
+                quantity_requested=requested,
+                quantity_fulfilled=fulfilled
+            )
+            for order, entry in zip(orders, entries)
+            for product_id, requested, fulfilled in entry['lines']
+        ])
+        record_order_events([(order, entry['lines']) for order, entry in zip(orders, entries)])
+
+        # Deltas are summed per (store, product) over the whole batch, so a
+        # hot row is written once per flush rather than once per order
+        deltas = {}
+        for order, entry in zip(orders, entries):
+            order_deltas = {}
+            for product_id, _, fulfilled in entry['lines']:
+                order_deltas[product_id] = order_deltas.get(product_id, 0) - fulfilled
+            if ledger_enabled():
+                append_movements(entry['store_id'], order_deltas, 'ORDER', order=order)
+
+            store_deltas = deltas.setdefault(entry['store_id'], {})
+            for product_id, delta in order_deltas.items():
+                store_deltas[product_id] = store_deltas.get(product_id, 0) + delta
+
+        prices = Product.objects.in_bulk({
+            product_id for store_deltas in deltas.values() for product_id in store_deltas
+        })
+        now = timezone.now()
+        for store_id, store_deltas in deltas.items():
+            if not ledger_enabled():
+                for product_id, delta in store_deltas.items():
+                    if not delta:
+                        continue
+                    Inventory.objects.filter(
+                        store_id=store_id,
+                        product_id=product_id
+                    ).update(quantity=F('quantity') + delta, updated_at=now)
+            adjust_store_stats(
+                store_id,
+                units=sum(store_deltas.values()),
+                value=sum(
+                    prices[product_id].price * delta
+                    for product_id, delta in store_deltas.items()
+                )
+            )
+
+        stores = Store.objects.in_bulk(deltas.keys())
+        transaction.on_commit(lambda: [
+            notify_order_confirmed(order, stores[order.store_id]) for order in orders
+        ], using=current_shard())
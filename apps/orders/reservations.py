@@ -0,0 +1,278 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Sum, F, OuterRef, Subquery, Exists, DecimalField, ExpressionWrapper
+)
+from django.utils import timezone
+from apps.core.sharding import current_shard
+from apps.stores.models import Inventory
+from apps.stores.hot_skus import InsufficientStock, add_to_slots
+from apps.stores.stats import adjust_store_stats
+from .models import Order, OrderItem, Reservation, ReservationItem
+from . import redis_stock
+from .outbox import record_order_events
+from .services import (
+    lock_inventory, check_stock, available_quantity, deduct_stock, restock, notify_order_confirmed
+)
+
+
+class ReservationError(Exception):
+    """Raised when a reservation can't be placed, converted or released"""
+
+    def __init__(self, message, unavailable=None):
+        self.message = message
+        self.unavailable = unavailable or []
+        super().__init__(message)
+
+
+class ReservationNotFound(ReservationError):
+    """Raised when no reservation has the given ID"""
+
+
+def _held_quantities(reservation):
+    quantities = {}
+    for item in reservation.items.all():
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+def create_reservation(store, items, products, ttl_seconds=None):
+    """
+    Hold stock for a basket: lock the rows, check every line and deduct
+    the held quantities, all in one transaction. Raises ReservationError
+    listing the short products if any line can't be filled.
+
+    In Redis stock mode the hold is taken from Redis first and given back
+    if the database side fails.
+    """
+    ttl = ttl_seconds or settings.RESERVATION_TTL_SECONDS
+
+    held_in_redis = _hold_in_redis(store.id, items)
+    try:
+        reservation = _create_reservation(store, items, products, ttl)
+    except Exception:
+        if held_in_redis:
+            redis_stock.restock(store.id, held_in_redis)
+        raise
+    return reservation
+
+
+def _hold_in_redis(store_id, items):
+    """
+    In Redis stock mode, take the hold from the Redis counters too so
+    orders accepted there can't sell it. Returns the quantities held, or
+    None if the store isn't served from Redis.
+    """
+    if not redis_stock.redis_stock_enabled():
+        return None
+
+    quantities = redis_stock.basket_quantities(items)
+    try:
+        short = redis_stock.reserve(store_id, quantities)
+    except redis_stock.StoreNotLoaded:
+        return None
+    if short:
+        raise ReservationError('Insufficient stock.', unavailable=sorted(short))
+    return quantities
+
+
+def _release_in_redis(store_id, quantities):
+    if redis_stock.redis_stock_enabled():
+        transaction.on_commit(lambda: redis_stock.restock(store_id, quantities), using=current_shard())
+
+
+def _create_reservation(store, items, products, ttl):
+    product_ids = [item['product_id'] for item in items]
+
+    with transaction.atomic(using=current_shard()):
+        inventory_lookup = lock_inventory(store.id, product_ids)
+        inventory_updates = check_stock(items, inventory_lookup)
+
+        if inventory_updates is None:
+            unavailable = sorted({
+                item['product_id'] for item in items
+                if item['product_id'] not in inventory_lookup
+                or available_quantity(inventory_lookup[item['product_id']]) < item['quantity_requested']
+            })
+            raise ReservationError('Insufficient stock.', unavailable=unavailable)
+
+        try:
+            deduct_stock(
+                store.id,
+                inventory_updates,
+                {product_id: product.price for product_id, product in products.items()},
+                reason='RESERVATION'
+            )
+        except InsufficientStock as e:
+            raise ReservationError('Insufficient stock.', unavailable=[e.product_id])
+
+        reservation = Reservation.objects.create(
+            store=store,
+            expires_at=timezone.now() + timedelta(seconds=ttl)
+        )
+        ReservationItem.objects.bulk_create([
+            ReservationItem(
+                reservation=reservation,
+                product_id=item['product_id'],
+                quantity=item['quantity_requested']
+            )
+            for item in items
+        ])
+
+    return reservation
+
+
+def convert_reservation(reservation_id):
+    """
+    Turn an active hold into a CONFIRMED order. The stock was already
+    deducted, so no inventory rows are touched. An expired hold is
+    released instead and ReservationError is raised.
+    """
+    with transaction.atomic(using=current_shard()):
+        reservation = _lock_active(reservation_id)
+
+        if reservation.expires_at <= timezone.now():
+            _release(reservation, 'EXPIRED')
+            expired = True
+        else:
+            expired = False
+            order = Order.objects.create(store_id=reservation.store_id, status='CONFIRMED')
+            items = list(reservation.items.all())
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product_id=item.product_id,
+                    quantity_requested=item.quantity,
+                    quantity_fulfilled=item.quantity
+                )
+                for item in items
+            ])
+            record_order_events([
+                (order, [(item.product_id, item.quantity, item.quantity) for item in items])
+            ])
+            reservation.status = 'CONVERTED'
+            reservation.order = order
+            reservation.save(update_fields=['status', 'order'])
+            notify_order_confirmed(order, reservation.store)
+
+    # Raised outside the atomic block so the expiry release is kept
+    if expired:
+        raise ReservationError('Reservation has expired.')
+    return order
+
+
+def release_reservation(reservation_id):
+    """Return an active hold's stock to the store"""
+    with transaction.atomic(using=current_shard()):
+        reservation = _lock_active(reservation_id)
+        _release(reservation, 'RELEASED')
+    return reservation
+
+
+def _lock_active(reservation_id):
+    try:
+        reservation = Reservation.objects.select_for_update().select_related(
+            'store'
+        ).get(id=reservation_id)
+    except (Reservation.DoesNotExist, ValueError):
+        raise ReservationNotFound('Reservation not found.')
+
+    if reservation.status != 'ACTIVE':
+        raise ReservationError(f'Reservation is {reservation.status.lower()}.')
+    return reservation
+
+
+def _release(reservation, status):
+    quantities = _held_quantities(reservation)
+    prices = dict(
+        ReservationItem.objects.filter(
+            reservation=reservation
+        ).values_list('product_id', 'product__price')
+    )
+    restock(reservation.store_id, quantities, prices)
+    _release_in_redis(reservation.store_id, quantities)
+    reservation.status = status
+    reservation.save(update_fields=['status'])
+
+
+def release_expired_reservations(batch_size=None):
+    """
+    Release every expired hold in batches of set-based statements:
+    claim a batch of expired reservations (skipping any another sweeper
+    or a checkout has locked), restock all their products with a single
+    UPDATE, and mark the batch EXPIRED. Returns the number released.
+    """
+    batch_size = batch_size or settings.RESERVATION_SWEEP_BATCH_SIZE
+    released = 0
+
+    while True:
+        with transaction.atomic(using=current_shard()):
+            batch = list(
+                Reservation.objects.select_for_update(skip_locked=True).filter(
+                    status='ACTIVE',
+                    expires_at__lte=timezone.now()
+                ).order_by('expires_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            held = ReservationItem.objects.filter(reservation_id__in=batch)
+
+            # Held units per (store, product) across the whole batch
+            held_for_row = held.filter(
+                reservation__store_id=OuterRef('store_id'),
+                product_id=OuterRef('product_id')
+            ).values('product_id').annotate(total=Sum('quantity')).values('total')
+
+            # Lock the rows first so none is promoted or demoted mid-batch
+            rows = Inventory.objects.filter(Exists(held_for_row))
+            locked = rows.select_for_update().order_by('id').values_list(
+                'store_id', 'product_id', 'sharded'
+            )
+            sharded = {
+                (store_id, product_id)
+                for store_id, product_id, is_sharded in locked
+                if is_sharded
+            }
+
+            rows.filter(sharded=False).update(
+                quantity=F('quantity') + Subquery(held_for_row),
+                updated_at=timezone.now()
+            )
+
+            if sharded or redis_stock.redis_stock_enabled():
+                held_per_row = held.values(
+                    'reservation__store_id', 'product_id'
+                ).annotate(units=Sum('quantity'))
+                per_store_quantities = {}
+                for row in held_per_row:
+                    key = (row['reservation__store_id'], row['product_id'])
+                    if key in sharded:
+                        add_to_slots(*key, row['units'])
+                    per_store_quantities.setdefault(key[0], {})[key[1]] = row['units']
+                for store_id, quantities in per_store_quantities.items():
+                    _release_in_redis(store_id, quantities)
+
+            # Store totals, one adjustment per store
+            per_store = held.values('reservation__store_id').annotate(
+                units=Sum('quantity'),
+                value=Sum(ExpressionWrapper(
+                    F('quantity') * F('product__price'),
+                    output_field=DecimalField(max_digits=16, decimal_places=2)
+                ))
+            )
+            for row in per_store:
+                adjust_store_stats(
+                    row['reservation__store_id'],
+                    units=row['units'],
+                    value=row['value']
+                )
+
+            Reservation.objects.filter(id__in=batch).update(status='EXPIRED')
+            released += len(batch)
+
+        if len(batch) < batch_size:
+            break
+
+    return released
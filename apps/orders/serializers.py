@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import Order, OrderItem, Reservation, ReservationItem
 from apps.products.models import Product
 from apps.stores.models import Store
 
@@ -14,6 +14,8 @@ class OrderCreateSerializer(serializers.Serializer):
     """Serializer for creating orders"""
     store_id = serializers.IntegerField()
     items = OrderItemInputSerializer(many=True)
+    # 'partial' confirms whatever can be filled instead of rejecting the order
+    fulfillment = serializers.ChoiceField(choices=['all', 'partial'], default='all')
     
     def validate_items(self, value):
         if not value:
@@ -34,7 +36,10 @@ class OrderItemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = OrderItem
-        fields = ['id', 'product_id', 'product_title', 'product_price', 'quantity_requested']
+        fields = [
+            'id', 'product_id', 'product_title', 'product_price',
+            'quantity_requested', 'quantity_fulfilled'
+        ]
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -47,7 +52,7 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = [
             'id', 'store', 'store_name', 'store_location',
-            'status', 'created_at', 'items'
+            'status', 'reference', 'created_at', 'items'
         ]
 
 
@@ -57,4 +62,29 @@ class OrderListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Order
-        fields = ['id', 'status', 'created_at', 'total_items']
\ No newline at end of file
+        fields = ['id', 'status', 'created_at', 'total_items']
+
+
+class ReservationCreateSerializer(OrderCreateSerializer):
+    """Serializer for placing a stock hold; same basket shape as orders"""
+    ttl_seconds = serializers.IntegerField(min_value=30, max_value=3600, required=False)
+    # Holds are all-or-nothing
+    fulfillment = None
+
+
+class ReservationItemSerializer(serializers.ModelSerializer):
+    product_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ReservationItem
+        fields = ['id', 'product_id', 'quantity']
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    items = ReservationItemSerializer(many=True, read_only=True)
+    store_id = serializers.IntegerField(read_only=True)
+    order_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Reservation
+        fields = ['id', 'store_id', 'status', 'expires_at', 'order_id', 'created_at', 'items']
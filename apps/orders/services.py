@@ -0,0 +1,227 @@
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from apps.stores.models import Inventory
+from apps.stores.ledger import ledger_enabled, lock_balances, append_movements
+from apps.stores.hot_skus import SLOT_TOTAL, sharding_enabled, take_from_slots, return_stock
+from apps.stores.stats import adjust_store_stats, adjust_store_stats_on_commit
+from .models import OrderItem
+
+# Try to import Celery task, but make it optional
+try:
+    from .tasks import send_order_confirmation
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+
+def lock_inventory(store_id, product_ids):
+    """
+    Fetch and lock the store's inventory rows for these products
+    (single query with select_for_update).
+
+    Rows are locked in product_id order so concurrent baskets touching
+    the same products queue up instead of deadlocking. In ledger mode the
+    rows carry a live balance and are not written.
+    """
+    if ledger_enabled():
+        return lock_balances(store_id, product_ids)
+    
+    inventory_qs = Inventory.objects.filter(
+        store_id=store_id,
+        product_id__in=product_ids,
+        sharded=False
+    ).order_by('product_id').select_for_update()
+
+    inventory_lookup = {inv.product_id: inv for inv in inventory_qs}
+    
+    # Sharded hot SKUs are not locked here; their balance is the slot
+    # total and take_from_slots does the guarded deduction
+    unlocked = set(product_ids) - set(inventory_lookup)
+    if unlocked:
+        sharded_qs = Inventory.objects.filter(
+            store_id=store_id,
+            product_id__in=unlocked,
+            sharded=True
+        ).annotate(balance=SLOT_TOTAL)
+        inventory_lookup.update((inv.product_id, inv) for inv in sharded_qs)
+
+    return inventory_lookup
+
+
+def _stats_adjuster():
+    """
+    Orders that lock Inventory rows already serialize per product, so they
+    adjust the stats row in their transaction; ledger and slot writes defer
+    it to commit rather than serialize every order in the store on it.
+    """
+    if ledger_enabled() or sharding_enabled():
+        return adjust_store_stats_on_commit
+    return adjust_store_stats
+
+
+def available_quantity(inventory):
+    """Stock on hand for a row from lock_inventory"""
+    return getattr(inventory, 'balance', inventory.quantity)
+
+
+def check_stock(items, inventory_lookup):
+    """
+    Return (inventory, quantity) pairs to deduct if every item can be
+    filled from the locked rows, or None if any item is short.
+    """
+    inventory_updates = []
+    # Stock left per product, so repeated lines can't oversell one row
+    remaining = {}
+
+    for item in items:
+        product_id = item['product_id']
+        inventory = inventory_lookup.get(product_id)
+
+        # Missing inventory or insufficient stock rejects the whole basket
+        if inventory is None:
+            return None
+        available = remaining.get(product_id, available_quantity(inventory))
+        if available < item['quantity_requested']:
+            return None
+
+        remaining[product_id] = available - item['quantity_requested']
+        inventory_updates.append((inventory, item['quantity_requested']))
+
+    return inventory_updates
+
+
+def fill_partially(items, inventory_lookup):
+    """
+    Fill each line as far as the locked rows allow, in request order.
+    Returns (inventory, quantity) pairs to deduct and the fulfilled
+    quantity for every line.
+    """
+    inventory_updates = []
+    fulfilled = []
+    remaining = {}
+
+    for item in items:
+        product_id = item['product_id']
+        inventory = inventory_lookup.get(product_id)
+
+        available = 0
+        if inventory is not None:
+            available = max(remaining.get(product_id, available_quantity(inventory)), 0)
+        quantity = min(available, item['quantity_requested'])
+
+        fulfilled.append(quantity)
+        if quantity:
+            remaining[product_id] = available - quantity
+            inventory_updates.append((inventory, quantity))
+
+    return inventory_updates, fulfilled
+
+
+def plan_fulfillment(items, inventory_lookup, partial=False):
+    """
+    Work out what to deduct for a basket. Returns the order status, the
+    (inventory, quantity) pairs to deduct and the fulfilled quantity per
+    line. Without partial, a basket is filled completely or not at all.
+    """
+    if partial:
+        inventory_updates, fulfilled = fill_partially(items, inventory_lookup)
+    else:
+        inventory_updates = check_stock(items, inventory_lookup) or []
+        fulfilled = [
+            item['quantity_requested'] if inventory_updates else 0
+            for item in items
+        ]
+    return fulfillment_status(items, fulfilled), inventory_updates, fulfilled
+
+
+def fulfillment_status(items, fulfilled):
+    """CONFIRMED if every line is filled, REJECTED if none is, else PARTIAL"""
+    if not any(fulfilled):
+        return 'REJECTED'
+    if all(quantity == item['quantity_requested'] for item, quantity in zip(items, fulfilled)):
+        return 'CONFIRMED'
+    return 'PARTIAL'
+
+
+def deduct_stock(store_id, inventory_updates, prices, reason='ORDER', order=None):
+    """
+    Deduct locked inventory rows and adjust the store's running totals
+    (see _stats_adjuster). prices maps product_id to unit price.
+    
+    In ledger mode the deductions are appended as movements (tagged with
+    reason and order) and the Inventory rows are left untouched. Sharded
+    rows are deducted from their slots, which raises InsufficientStock if
+    they sold out since the check; callers roll back on it.
+    """
+    if ledger_enabled():
+        deltas = {}
+        for inventory, quantity in inventory_updates:
+            deltas[inventory.product_id] = deltas.get(inventory.product_id, 0) - quantity
+        append_movements(store_id, deltas, reason, order=order)
+    else:
+        sharded = {}
+        for inventory, quantity in inventory_updates:
+            if inventory.sharded:
+                sharded[inventory.product_id] = sharded.get(inventory.product_id, 0) + quantity
+            else:
+                # Not through the instance: if a slot deduction below fails,
+                # the caller replans with these rows' quantities
+                Inventory.objects.filter(pk=inventory.pk).update(
+                    quantity=F('quantity') - quantity,
+                    updated_at=timezone.now()
+                )
+        
+        # Product order, so baskets draining the same slots can't deadlock
+        for product_id in sorted(sharded):
+            take_from_slots(store_id, product_id, sharded[product_id])
+
+    _stats_adjuster()(
+        store_id,
+        units=-sum(quantity for _, quantity in inventory_updates),
+        value=-sum(
+            prices[inventory.product_id] * quantity
+            for inventory, quantity in inventory_updates
+        )
+    )
+
+
+def restock(store_id, quantities, prices):
+    """
+    Return held stock to the store, product by product (or as movements
+    in ledger mode). quantities and prices map product_id to
+    units and unit price.
+    """
+    if ledger_enabled():
+        append_movements(store_id, quantities, 'RELEASE')
+    else:
+        for product_id in sorted(quantities):
+            return_stock(store_id, product_id, quantities[product_id])
+
+    _stats_adjuster()(
+        store_id,
+        units=sum(quantities.values()),
+        value=sum(prices[product_id] * quantity for product_id, quantity in quantities.items())
+    )
+
+
+def create_order_items(order, items, fulfilled):
+    """Bulk-create an order's lines with their fulfilled quantities"""
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product_id=item['product_id'],
+            quantity_requested=item['quantity_requested'],
+            quantity_fulfilled=quantity
+        )
+        for item, quantity in zip(items, fulfilled)
+    ])
+
+
+def notify_order_confirmed(order, store):
+    """Trigger the confirmation task (only if Celery is available)"""
+    if CELERY_AVAILABLE and getattr(settings, 'USE_REDIS', False):
+        send_order_confirmation.delay(order.id, order.store_id)
+    else:
+        # Log confirmation without Celery
+        print(f"✓ Order #{order.id} confirmed for {store.name}")
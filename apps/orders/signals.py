@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.products.models import Product
+from apps.stores.models import Store
+from .catalog import invalidate_catalog
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Stores and products changed; order-path caches must reload"""
+    invalidate_catalog()
@@ -7,16 +7,23 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task
-def send_order_confirmation(order_id):
+def send_order_confirmation(order_id, store_id=None):
     """
     Async task to send order confirmation.
     In production, this would send an actual email.
     For now, we log the confirmation.
     """
+    from apps.core.sharding import shard_for_store, find_shard
     from .models import Order
     
+    # The store picks the shard; tasks queued without it search them all
+    if store_id is not None:
+        alias = shard_for_store(store_id)
+    else:
+        alias = find_shard(Order.objects.filter(id=order_id))
+    
     try:
-        order = Order.objects.select_related('store').prefetch_related('items__product').get(id=order_id)
+        order = Order.objects.using(alias).select_related('store').prefetch_related('items__product').get(id=order_id)
         
         # Simulate email sending
         message = f"""
@@ -56,30 +63,91 @@ def generate_inventory_summary():
     Periodic task to generate daily inventory summary.
     This could be expanded to send reports, update analytics, etc.
     """
+    from apps.core.sharding import shard_for_store, use_shard
     from apps.stores.models import Inventory, Store
+    from apps.stores.low_stock import low_stock_inventory, store_low_stock_threshold
     from django.db.models import Sum, Count
     
     stores = Store.objects.all()
     
     for store in stores:
-        total_products = Inventory.objects.filter(store=store).count()
-        total_stock = Inventory.objects.filter(store=store).aggregate(
-            total=Sum('quantity')
-        )['total'] or 0
-        
-        low_stock_items = Inventory.objects.filter(
-            store=store,
-            quantity__lt=10
-        ).count()
+        with use_shard(shard_for_store(store.id)):
+            total_products = Inventory.objects.filter(store=store).count()
+            total_stock = Inventory.objects.filter(store=store).aggregate(
+                total=Sum('quantity')
+            )['total'] or 0
+            
+            low_stock_threshold = store_low_stock_threshold(store)
+            low_stock_items = low_stock_inventory(store).count()
         
         summary = f"""
         Daily Inventory Summary for {store.name}
         =========================================
         Total Products: {total_products}
         Total Stock Units: {total_stock}
-        Low Stock Items (<10): {low_stock_items}
+        Low Stock Items (<{low_stock_threshold}): {low_stock_items}
         """
         
         logger.info(summary)
     
-    return "Inventory summary generated"
\ No newline at end of file
+    return "Inventory summary generated"
+
+
+@shared_task
+def release_expired_reservations():
+    """
+    Periodic task to return stock held by abandoned carts.
+    Works in batches of set-based UPDATEs rather than row by row.
+    """
+    from apps.core.sharding import for_each_shard
+    from .reservations import release_expired_reservations as release_expired
+    
+    released = sum(for_each_shard(release_expired))
+    
+    if released:
+        logger.info(f"Released {released} expired reservations")
+    return f"Released {released} expired reservations"
+
+
+@shared_task
+def flush_redis_stock_orders():
+    """
+    Write-behind worker for Redis stock mode: writes queued orders and
+    their inventory deltas to the database in batches.
+    """
+    from .redis_stock import redis_stock_enabled, flush_pending_orders
+    
+    if not redis_stock_enabled():
+        return "Redis stock mode is off"
+    
+    flushed = flush_pending_orders()
+    
+    if flushed:
+        logger.info(f"Wrote {flushed} orders from Redis stock mode")
+    return f"Wrote {flushed} orders"
+
+
+@shared_task
+def relay_order_events():
+    """
+    Outbox relay: publishes pending order events to ORDER_EVENT_SINK in
+    batches. Safe to run on several workers at once.
+    """
+    from apps.core.sharding import for_each_shard
+    from .outbox import relay_order_events as relay
+    
+    published = sum(for_each_shard(relay))
+    
+    if published:
+        logger.info(f"Published {published} order events")
+    return f"Published {published} order events"
+
+
+@shared_task
+def prune_order_events():
+    """Periodic task to delete published events past their retention"""
+    from apps.core.sharding import for_each_shard
+    from .outbox import prune_published_events
+    
+    deleted = sum(for_each_shard(prune_published_events))
+    return f"Deleted {deleted} published order events"
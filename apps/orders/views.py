@@ -1,26 +1,50 @@
-from rest_framework import viewsets, status
+import time
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
-from django.db.models import F
-from django.conf import settings
-from .models import Order, OrderItem
+from apps.core.sharding import (
+    MergedQuerySet,
+    ShardedObjectMixin,
+    all_shards,
+    current_shard,
+    find_shard,
+    sharding_enabled,
+    shard_for_store,
+    use_shard
+)
+from .models import Order, Reservation
 from .serializers import (
     OrderCreateSerializer,
     OrderSerializer,
-    OrderListSerializer
+    OrderListSerializer,
+    ReservationCreateSerializer,
+    ReservationSerializer
+)
+from .services import (
+    lock_inventory,
+    plan_fulfillment,
+    fulfillment_status,
+    deduct_stock,
+    create_order_items,
+    notify_order_confirmed
+)
+from .catalog import get_store, get_products
+from .outbox import record_order_events, order_lines
+from .redis_stock import StoreNotLoaded, redis_stock_enabled, place_order
+from .reservations import (
+    ReservationError,
+    ReservationNotFound,
+    create_reservation,
+    convert_reservation,
+    release_reservation
 )
-from apps.stores.models import Store, Inventory
+from apps.stores.hot_skus import InsufficientStock, record_lock_wait
+from apps.stores.models import Store
 from apps.products.models import Product
 
-# Try to import Celery task, but make it optional
-try:
-    from .tasks import send_order_confirmation
-    CELERY_AVAILABLE = True
-except:
-    CELERY_AVAILABLE = False
 
-
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ShardedObjectMixin, viewsets.ModelViewSet):
     """
     API endpoint for creating and viewing orders.
     """
@@ -48,13 +72,17 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = OrderCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        store_id = serializer.validated_data['store_id']
-        items_data = serializer.validated_data['items']
+        # Everything below runs on the store's shard
+        with use_shard(shard_for_store(serializer.validated_data['store_id'])):
+            return self._create_order(serializer.validated_data)
+    
+    def _create_order(self, validated_data):
+        store_id = validated_data['store_id']
+        items_data = validated_data['items']
         
-        # Validate store exists
-        try:
-            store = Store.objects.get(id=store_id)
-        except Store.DoesNotExist:
+        # Validate store exists (served from the per-process catalog cache when warm)
+        store = get_store(store_id)
+        if store is None:
             return Response(
                 {'error': f'Store with id {store_id} not found.'},
                 status=status.HTTP_404_NOT_FOUND
@@ -63,8 +91,8 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Extract all product IDs from request
         product_ids = [item['product_id'] for item in items_data]
         
-        # Fetch all products at once (single query, not N queries)
-        products = Product.objects.in_bulk(product_ids)
+        # Fetch all products at once (cached, otherwise a single query)
+        products = get_products(product_ids)
         
         # Validate all products exist
         missing_products = set(product_ids) - set(products.keys())
@@ -74,81 +102,247 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        partial = validated_data['fulfillment'] == 'partial'
+        
+        # Stores loaded into Redis take orders there; the database write is deferred
+        if redis_stock_enabled():
+            try:
+                reference, fulfilled = place_order(store.id, items_data, partial=partial)
+            except StoreNotLoaded:
+                pass
+            else:
+                if reference:
+                    return Response(
+                        {
+                            'reference': reference,
+                            'store': store.id,
+                            'status': fulfillment_status(items_data, fulfilled),
+                            'items': [
+                                {**item, 'quantity_fulfilled': quantity}
+                                for item, quantity in zip(items_data, fulfilled)
+                            ]
+                        },
+                        status=status.HTTP_202_ACCEPTED
+                    )
+                
+                # Rejected orders are written straight away (no stock involved)
+                with transaction.atomic(using=current_shard()):
+                    order = Order.objects.create(store=store, status='REJECTED')
+                    create_order_items(order, items_data, fulfilled)
+                    record_order_events([(order, order_lines(items_data, fulfilled))])
+                return self._created_response(order)
+        
         # Use atomic transaction for consistency
-        with transaction.atomic():
+        with transaction.atomic(using=current_shard()):
             # Fetch all inventory for this store and these products (single query with lock)
-            inventory_qs = Inventory.objects.filter(
-                store=store,
-                product_id__in=product_ids
-            ).select_for_update()
-            
-            # Create a lookup dictionary for fast access
-            inventory_lookup = {inv.product_id: inv for inv in inventory_qs}
+            lock_started = time.monotonic()
+            inventory_lookup = lock_inventory(store.id, product_ids)
+            lock_wait = time.monotonic() - lock_started
             
-            # Check stock availability and prepare updates
-            can_fulfill = True
-            inventory_updates = []
-            
-            for item in items_data:
-                product_id = item['product_id']
-                quantity_requested = item['quantity_requested']
+            # Rows that can still be deducted from
+            available_lookup = dict(inventory_lookup)
+            while True:
+                # Check stock availability and prepare updates (all lines, or
+                # as much of each line as possible in partial mode)
+                order_status, inventory_updates, fulfilled = plan_fulfillment(
+                    items_data, available_lookup, partial=partial
+                )
                 
-                # Check if inventory exists for this product
-                if product_id not in inventory_lookup:
-                    can_fulfill = False
+                if order_status == 'REJECTED':
+                    # Create rejected order (no stock deduction)
+                    order = Order.objects.create(
+                        store=store,
+                        status='REJECTED'
+                    )
                     break
                 
-                inventory = inventory_lookup[product_id]
-                
-                # Check if sufficient stock
-                if inventory.quantity < quantity_requested:
-                    can_fulfill = False
+                try:
+                    with transaction.atomic(using=current_shard()):
+                        order = Order.objects.create(
+                            store=store,
+                            status=order_status
+                        )
+                        
+                        # Deduct inventory and the store's running totals
+                        deduct_stock(
+                            store.id,
+                            inventory_updates,
+                            {product_id: product.price for product_id, product in products.items()},
+                            order=order
+                        )
                     break
-                
-                # Store for later update
-                inventory_updates.append((inventory, quantity_requested))
-            
-            # Create order based on stock availability
-            if can_fulfill:
-                # Deduct inventory
-                for inventory, quantity in inventory_updates:
-                    inventory.quantity = F('quantity') - quantity
-                    inventory.save(update_fields=['quantity'])
-                
-                order = Order.objects.create(
-                    store=store,
-                    status='CONFIRMED'
-                )
-            else:
-                # Create rejected order (no stock deduction)
-                order = Order.objects.create(
-                    store=store,
-                    status='REJECTED'
-                )
+                except InsufficientStock as e:
+                    # A sharded hot SKU sold out after the check; plan again without it
+                    available_lookup.pop(e.product_id)
             
             # Create order items (bulk create for efficiency)
-            order_items = [
-                OrderItem(
-                    order=order,
-                    product=products[item['product_id']],
-                    quantity_requested=item['quantity_requested']
-                )
-                for item in items_data
-            ]
-            OrderItem.objects.bulk_create(order_items)
+            create_order_items(order, items_data, fulfilled)
+            
+            # Outbox events commit (or roll back) with the order
+            record_order_events([(order, order_lines(items_data, fulfilled))])
             
-            # Trigger async task for confirmed orders (only if Celery is available)
-            if order.status == 'CONFIRMED':
-                if CELERY_AVAILABLE and getattr(settings, 'USE_REDIS', False):
-                    send_order_confirmation.delay(order.id)
-                else:
-                    # Log confirmation without Celery
-                    print(f"✓ Order #{order.id} confirmed for {store.name}")
+            # Trigger async task for confirmed orders
+            if order.status in ('CONFIRMED', 'PARTIAL'):
+                notify_order_confirmed(order, store)
         
+        # Feed the lock wait to hot SKU detection once the locks are released
+        record_lock_wait(store.id, inventory_lookup, lock_wait)
+        
+        return self._created_response(order)
+    
+    def _created_response(self, order):
         # Fetch the created order with all relations for response
         order = Order.objects.select_related('store').prefetch_related(
             'items__product__category'
         ).get(id=order.id)
         
         response_serializer = OrderSerializer(order)
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+    
+    def list(self, request, *args, **kwargs):
+        """
+        GET /orders/
+        
+        Newest first. With store shards, each page is merged from the
+        newest orders of every shard.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if sharding_enabled():
+            queryset = MergedQuerySet(queryset)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], url_path=r'by-reference/(?P<reference>[0-9a-f-]{36})')
+    def by_reference(self, request, reference=None):
+        """
+        GET /orders/by-reference/<reference>/
+        
+        Looks up an order accepted in Redis stock mode. Returns 404 until
+        the write-behind worker has written it.
+        """
+        order = None
+        for alias in all_shards():
+            order = self.get_queryset().using(alias).filter(reference=reference).first()
+            if order is not None:
+                break
+        if order is None:
+            return Response(
+                {'error': 'Order not written yet or unknown reference.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(OrderSerializer(order).data)
+
+
+class ReservationViewSet(ShardedObjectMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoint for time-limited stock holds during checkout.
+    """
+    queryset = Reservation.objects.prefetch_related('items').all()
+    serializer_class = ReservationSerializer
+    
+    def create(self, request, *args, **kwargs):
+        """
+        POST /reservations/
+        
+        Holds stock for a basket for ttl_seconds (default
+        RESERVATION_TTL_SECONDS). Stock is deducted now; confirm turns the
+        hold into an order, release or expiry returns it.
+        """
+        serializer = ReservationCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        with use_shard(shard_for_store(serializer.validated_data['store_id'])):
+            return self._reserve(serializer.validated_data)
+    
+    def _reserve(self, validated_data):
+        store_id = validated_data['store_id']
+        items_data = validated_data['items']
+        
+        try:
+            store = Store.objects.get(id=store_id)
+        except Store.DoesNotExist:
+            return Response(
+                {'error': f'Store with id {store_id} not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        product_ids = [item['product_id'] for item in items_data]
+        products = Product.objects.in_bulk(product_ids)
+        missing_products = set(product_ids) - set(products.keys())
+        if missing_products:
+            return Response(
+                {'error': f'Products not found: {list(missing_products)}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            reservation = create_reservation(
+                store,
+                items_data,
+                products,
+                ttl_seconds=validated_data.get('ttl_seconds')
+            )
+        except ReservationError as e:
+            return Response(
+                {'error': e.message, 'unavailable_products': e.unavailable},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        reservation = self.get_queryset().get(id=reservation.id)
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], url_path='confirm')
+    def confirm(self, request, pk=None):
+        """
+        POST /reservations/<id>/confirm/
+        
+        Converts an active hold into a CONFIRMED order.
+        """
+        with use_shard(self._reservation_shard(pk)):
+            try:
+                order = convert_reservation(pk)
+            except ReservationError as e:
+                return self._error_response(e)
+            
+            order = Order.objects.select_related('store').prefetch_related(
+                'items__product__category'
+            ).get(id=order.id)
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], url_path='release')
+    def release(self, request, pk=None):
+        """
+        POST /reservations/<id>/release/
+        
+        Returns the held stock to the store.
+        """
+        with use_shard(self._reservation_shard(pk)):
+            try:
+                release_reservation(pk)
+            except ReservationError as e:
+                return self._error_response(e)
+            
+            reservation = self.get_queryset().get(id=pk)
+        return Response(ReservationSerializer(reservation).data)
+    
+    @staticmethod
+    def _reservation_shard(pk):
+        # Unknown or malformed IDs fall through to the not-found error
+        if not sharding_enabled():
+            return None
+        try:
+            return find_shard(Reservation.objects.filter(pk=int(pk)))
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _error_response(e):
+        if isinstance(e, ReservationNotFound):
+            return Response({'error': e.message}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'error': e.message}, status=status.HTTP_409_CONFLICT)
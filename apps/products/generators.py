@@ -0,0 +1,127 @@
+"""
+Deterministic row generators for seeding. Pure Python (no Django
+imports) so they can run in worker processes; every chunk seeds its own
+RNG from (seed, table, chunk), so the output does not depend on how many
+workers produced it. Rows refer to other rows by index, not by ID.
+"""
+import random
+from faker import Faker
+
+CATEGORY_NAMES = [
+    'Electronics', 'Clothing', 'Books', 'Home & Garden',
+    'Sports & Outdoors', 'Toys & Games', 'Health & Beauty',
+    'Automotive', 'Food & Beverages', 'Office Supplies',
+    'Pet Supplies', 'Music & Instruments', 'Jewelry',
+    'Tools & Hardware', 'Baby Products'
+]
+
+PRODUCT_TEMPLATES = {
+    'Electronics': ['Smartphone', 'Laptop', 'Tablet', 'Headphones', 'Camera', 'Smartwatch'],
+    'Clothing': ['T-Shirt', 'Jeans', 'Jacket', 'Dress', 'Sweater', 'Shoes'],
+    'Books': ['Fiction Novel', 'Non-Fiction Book', 'Textbook', 'Magazine', 'Comic Book'],
+    'Home & Garden': ['Furniture', 'Lamp', 'Rug', 'Plant Pot', 'Kitchen Appliance'],
+    'Sports & Outdoors': ['Bicycle', 'Tennis Racket', 'Yoga Mat', 'Running Shoes', 'Camping Tent'],
+}
+
+# Historical order outcomes and their weights
+ORDER_STATUSES = ['CONFIRMED', 'PARTIAL', 'REJECTED']
+ORDER_STATUS_WEIGHTS = [85, 5, 10]
+
+
+def _rng(seed, table, chunk):
+    return random.Random(f'{seed}:{table}:{chunk}')
+
+
+def _faker(seed, table, chunk):
+    fake = Faker()
+    fake.seed_instance(f'{seed}:{table}:{chunk}')
+    return fake
+
+
+def category_names(count):
+    """The stock names first, then numbered ones past the list"""
+    names = CATEGORY_NAMES[:count]
+    names += [f'Category {number}' for number in range(len(names) + 1, count + 1)]
+    return names
+
+
+def chunks(total, size):
+    """(chunk number, start, count) covering range(total)"""
+    return [(number, start, min(size, total - start)) for number, start in enumerate(range(0, total, size))]
+
+
+def product_rows(args):
+    """(title, description, price in cents, category index) per product"""
+    seed, chunk, count, names = args
+    rng = _rng(seed, 'products', chunk)
+    fake = _faker(seed, 'products', chunk)
+    rows = []
+    for _ in range(count):
+        category = rng.randrange(len(names))
+        templates = PRODUCT_TEMPLATES.get(names[category])
+        if templates:
+            title = f"{fake.company()} {rng.choice(templates)}"
+        else:
+            title = fake.catch_phrase()
+        description = fake.text(max_nb_chars=200) if rng.random() > 0.3 else None
+        rows.append((title, description, rng.randint(999, 99999), category))
+    return rows
+
+
+def store_rows(args):
+    """(name, location) per store"""
+    seed, chunk, count = args
+    fake = _faker(seed, 'stores', chunk)
+    return [
+        (f"{fake.company()} Store", f"{fake.street_address()}, {fake.city()}, {fake.state()}")
+        for _ in range(count)
+    ]
+
+
+def inventory_rows(args):
+    """
+    (store index, product index, quantity) for one store: a density share
+    of all products, give or take 15%.
+    """
+    seed, store, products, density = args
+    rng = _rng(seed, 'inventory', store)
+    stocked = min(products, max(0, round(products * density * rng.uniform(0.85, 1.15))))
+    return [
+        (store, product, rng.randint(0, 100))
+        for product in sorted(rng.sample(range(products), stocked))
+    ]
+
+
+def order_rows(args):
+    """
+    (store index, status, seconds ago, lines) per order, with lines as
+    (product index, requested, fulfilled). Orders are spread over the
+    last `days` days.
+    """
+    seed, chunk, count, stores, products, days = args
+    rng = _rng(seed, 'orders', chunk)
+    rows = []
+    for _ in range(count):
+        status = rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0]
+        lines = []
+        for product in rng.sample(range(products), min(products, rng.randint(1, 4))):
+            requested = rng.randint(1, 5)
+            if status == 'CONFIRMED':
+                fulfilled = requested
+            elif status == 'PARTIAL':
+                fulfilled = rng.randint(0, requested - 1)
+            else:
+                fulfilled = 0
+            lines.append((product, requested, fulfilled))
+        if status == 'PARTIAL' and all(fulfilled == 0 for _, _, fulfilled in lines):
+            # Partial orders fill something
+            product, requested, _ = lines[0]
+            if len(lines) > 1:
+                lines[0] = (product, requested, requested)
+            elif requested > 1:
+                lines[0] = (product, requested, 1)
+            else:
+                status = 'CONFIRMED'
+                lines[0] = (product, requested, requested)
+        rows.append((rng.randrange(stores), status, rng.randint(0, days * 86400), lines))
+    return rows
@@ -0,0 +1,319 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+from decimal import Decimal
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from apps.core.cache import bump_generation
+from apps.core.sharding import (
+    all_shards,
+    for_each_shard,
+    replicate_catalog,
+    sharding_enabled,
+    shard_for_store
+)
+from apps.orders.catalog import invalidate_catalog
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+from apps.stores.stats import reconcile_store_stats
+from . import generators
+
+BATCH_SIZE = 5000
+DEFAULT_DENSITY = 0.29
+
+# Tables whose secondary indexes are dropped during the load and rebuilt
+# after it (PostgreSQL only); primary keys and unique constraints stay
+DEFERRED_INDEX_MODELS = [Product, Inventory, Order, OrderItem]
+
+
+class Progress:
+    """Logs rows written and rows/sec per table and overall"""
+
+    def __init__(self, log):
+        self.log = log
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    def table(self, name, total):
+        return _TableProgress(self, name, total)
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        self.log(f'{self.rows} rows in {elapsed:.1f}s ({self.rows / max(elapsed, 1e-9):,.0f} rows/sec)')
+
+
+class _TableProgress:
+    def __init__(self, progress, name, total):
+        self.progress = progress
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        self.last_log = 0.0
+
+    def add(self, rows):
+        self.done += rows
+        self.progress.rows += rows
+        now = time.perf_counter()
+        if self.done >= self.total or now - self.last_log >= 2:
+            self.last_log = now
+            rate = self.done / max(now - self.started, 1e-9)
+            self.progress.log(f'{self.name}: {self.done:,}/{self.total:,} ({rate:,.0f} rows/sec)')
+
+
+def clear_catalog():
+    """
+    Empty the catalog and everything that references it (orders included),
+    on every store shard too
+    """
+    for alias in _databases():
+        connection = connections[alias]
+        if connection.vendor == 'postgresql':
+            tables = ', '.join(
+                connection.ops.quote_name(model._meta.db_table)
+                for model in (Category, Product, Store)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+            continue
+
+        Order.objects.using(alias).all().delete()
+        Inventory.objects.using(alias).all().delete()
+        Product.objects.using(alias).all().delete()
+        Category.objects.using(alias).all().delete()
+        Store.objects.using(alias).all().delete()
+
+
+def _databases():
+    """The default database plus any store shards"""
+    return list(dict.fromkeys([DEFAULT_DB_ALIAS, *all_shards()]))
+
+
+def _drop_secondary_indexes():
+    """Drop indexes that aren't constraints; returns their definitions"""
+    tables = [model._meta.db_table for model in DEFERRED_INDEX_MODELS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexname, indexdef FROM pg_indexes '
+            'WHERE schemaname = current_schema() AND tablename = ANY(%s) '
+            'AND indexname NOT IN (SELECT conname FROM pg_constraint)',
+            [tables]
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    return [definition for _, definition in indexes]
+
+
+def _create_indexes(definitions):
+    with connection.cursor() as cursor:
+        for definition in definitions:
+            cursor.execute(definition)
+        for model in DEFERRED_INDEX_MODELS:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def insert_rows(model, field_names, rows, batch_size=BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """
+    Write plain tuples straight into a model's table: COPY on PostgreSQL,
+    batched executemany elsewhere. Skips model save logic (auto_now and
+    friends), so every value must be given.
+    """
+    connection = connections[using]
+    fields = [model._meta.get_field(name) for name in field_names]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+    def prepared():
+        for row in rows:
+            yield [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if connection.vendor == 'postgresql' and hasattr(raw_cursor, 'copy'):
+            with raw_cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+                for row in prepared():
+                    copy.write_row(row)
+            return
+
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+        batch = []
+        for row in prepared():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def _new_ids(model, after, using=DEFAULT_DB_ALIAS):
+    """IDs inserted since `after`, in insertion order"""
+    return list(
+        model.objects.using(using).filter(id__gt=after).order_by('id').values_list('id', flat=True)
+    )
+
+
+def _max_id(model, using=DEFAULT_DB_ALIAS):
+    return model.objects.using(using).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def _by_shard(rows, store_id):
+    """Split rows by the shard of store_id(row), keeping their order"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(shard_for_store(store_id(row)), []).append(row)
+    return groups.items()
+
+
+def seed_catalog(categories=15, products=1200, stores=25, density=DEFAULT_DENSITY, orders=0,
+                 order_days=365, seed=None, workers=1, batch_size=BATCH_SIZE, log=None):
+    """
+    Replace the catalog (and order history) with generated data.
+
+    Rows are generated in chunks across `workers` processes and written in
+    one transaction with insert_rows. On PostgreSQL the secondary indexes
+    of the large tables are dropped first and rebuilt once the data is in.
+    Each store stocks about `density` of all products. The same seed
+    produces the same data whatever the worker count. With store shards,
+    inventory and orders go to each store's shard and the catalog is
+    copied to all of them. Returns row counts.
+    """
+    log = log or (lambda message: None)
+    progress = Progress(log)
+    names = generators.category_names(categories)
+    product_chunks = generators.chunks(products, batch_size)
+    order_chunks = generators.chunks(orders, batch_size)
+
+    # Generation needs no database, so it can run ahead of the writes;
+    # connections are closed so forked workers don't inherit them
+    pool = None
+    if workers > 1:
+        if not connection.in_atomic_block:
+            connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers)
+    run = pool.map if pool else map
+    try:
+        product_batches = run(generators.product_rows, [
+            (seed, number, count, names) for number, _, count in product_chunks
+        ])
+        store_batches = run(generators.store_rows, [
+            (seed, number, count) for number, _, count in generators.chunks(stores, batch_size)
+        ])
+        inventory_batches = run(generators.inventory_rows, [
+            (seed, store, products, density) for store in range(stores)
+        ])
+        order_batches = run(generators.order_rows, [
+            (seed, number, count, stores, products, order_days) for number, _, count in order_chunks
+        ])
+
+        with ExitStack() as stack:
+            for alias in _databases():
+                stack.enter_context(transaction.atomic(using=alias))
+            clear_catalog()
+            deferred = _drop_secondary_indexes() if connection.vendor == 'postgresql' else []
+            now = timezone.now()
+
+            Category.objects.bulk_create([Category(name=name) for name in names])
+            category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+            progress.table('categories', categories).add(len(category_ids))
+
+            table = progress.table('products', products)
+            first_product = _max_id(Product)
+            titles = []
+            for batch in product_batches:
+                insert_rows(
+                    Product,
+                    ['title', 'description', 'price', 'category', 'created_at', 'updated_at'],
+                    [
+                        (title, description, Decimal(price).scaleb(-2), category_ids[category], now, now)
+                        for title, description, price, category in batch
+                    ],
+                    batch_size
+                )
+                titles.extend(row[0] for row in batch)
+                table.add(len(batch))
+            product_ids = _new_ids(Product, first_product)
+
+            table = progress.table('stores', stores)
+            first_store = _max_id(Store)
+            for batch in store_batches:
+                insert_rows(Store, ['name', 'location', 'created_at'], [
+                    (name, location, now) for name, location in batch
+                ], batch_size)
+                table.add(len(batch))
+            store_ids = _new_ids(Store, first_store)
+            
+            # Shard queries join their own copy of the catalog
+            if sharding_enabled():
+                replicate_catalog([Category, Product, Store])
+
+            table = progress.table('inventory', round(stores * products * density))
+            inventory_count = 0
+            for batch in inventory_batches:
+                rows = [
+                    (store_ids[store], product_ids[product], quantity, titles[product], False, now)
+                    for store, product, quantity in batch
+                ]
+                for alias, shard_rows in _by_shard(rows, lambda row: row[0]):
+                    insert_rows(
+                        Inventory,
+                        ['store', 'product', 'quantity', 'product_title', 'sharded', 'updated_at'],
+                        shard_rows,
+                        batch_size,
+                        using=alias
+                    )
+                inventory_count += len(batch)
+                table.add(len(batch))
+
+            table = progress.table('orders', orders)
+            item_count = 0
+            for batch in order_batches:
+                for alias, shard_batch in _by_shard(batch, lambda order: store_ids[order[0]]):
+                    first_order = _max_id(Order, using=alias)
+                    insert_rows(Order, ['store', 'status', 'created_at'], [
+                        (store_ids[store], status, now - timedelta(seconds=seconds_ago))
+                        for store, status, seconds_ago, _ in shard_batch
+                    ], batch_size, using=alias)
+                    order_ids = _new_ids(Order, first_order, using=alias)
+                    items = [
+                        (order_id, product_ids[product], requested, fulfilled)
+                        for order_id, (_, _, _, lines) in zip(order_ids, shard_batch)
+                        for product, requested, fulfilled in lines
+                    ]
+                    insert_rows(
+                        OrderItem,
+                        ['order', 'product', 'quantity_requested', 'quantity_fulfilled'],
+                        items,
+                        batch_size,
+                        using=alias
+                    )
+                    item_count += len(items)
+                table.add(len(batch))
+
+            if deferred:
+                log(f'Building {len(deferred)} indexes...')
+                started = time.perf_counter()
+                _create_indexes(deferred)
+                log(f'Indexes built in {time.perf_counter() - started:.1f}s')
+
+            # Raw inserts skip signals, so build the store totals directly
+            # and drop cached catalog lookups and responses
+            for_each_shard(reconcile_store_stats)
+            invalidate_catalog()
+            bump_generation('categories', 'products', 'stores')
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    progress.finish()
+    return {
+        'categories': len(category_ids),
+        'products': len(product_ids),
+        'stores': len(store_ids),
+        'inventory': inventory_count,
+        'orders': orders,
+        'order_items': item_count,
+    }
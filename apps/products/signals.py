@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.core.cache import bump_generation
+from apps.core.sharding import replicate_catalog_changes
+from .models import Category, Product
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    """Product responses carry the category name, so they go too"""
+    bump_generation('categories', 'products')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_responses(sender, **kwargs):
+    """Drop cached product list and detail responses"""
+    bump_generation('products')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def replicate_to_shards(sender, **kwargs):
+    """Copy catalog writes to every store shard"""
+    replicate_catalog_changes(sender, **kwargs)
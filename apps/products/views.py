@@ -1,4 +1,6 @@
 from rest_framework import viewsets
+from apps.core.cache import cached_action
+from apps.core.conditional import conditional_action, generation_validators
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 
@@ -9,6 +11,16 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    
+    @conditional_action(generation_validators('categories'))
+    @cached_action('categories', timeout=3600)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_action(generation_validators('categories'))
+    @cached_action('categories', timeout=3600)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
@@ -23,4 +35,14 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         category_id = self.request.query_params.get('category', None)
         if category_id:
             queryset = queryset.filter(category_id=category_id)
-        return queryset
\ No newline at end of file
+        return queryset
+    
+    @conditional_action(generation_validators('products'))
+    @cached_action('products')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_action(generation_validators('products'))
+    @cached_action('products')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -8,6 +8,7 @@ from django.conf import settings
 import time
 
 from apps.products.models import Product
+from apps.core.sharding import sharding_enabled, shard_for_store
 from apps.stores.models import Inventory
 from .utils import get_client_ip
 
@@ -59,6 +60,9 @@ def product_search(request):
     if store_id:
         try:
             store_id = int(store_id)
+            if sharding_enabled():
+                # The store's stock lives on its shard, next to a copy of the catalog
+                queryset = queryset.using(shard_for_store(store_id))
             # Prefetch only inventory items for the requested store
             store_inventory_prefetch = Prefetch(
                 'inventory_items',
@@ -1,16 +1,33 @@
 from django.contrib import admin
-from .models import Store, Inventory
+from .models import Store, Inventory, InventoryMovement, InventorySlot
 
 
 @admin.register(Store)
 class StoreAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name', 'location', 'created_at']
+    list_display = ['id', 'name', 'location', 'low_stock_threshold', 'created_at']
     search_fields = ['name', 'location']
 
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
-    list_display = ['id', 'store', 'product', 'quantity', 'updated_at']
+    list_display = ['id', 'store', 'product', 'quantity', 'sharded', 'updated_at']
     list_filter = ['store', 'updated_at']
     search_fields = ['product__title', 'store__name']
-    list_select_related = ['store', 'product']
\ No newline at end of file
+    list_select_related = ['store', 'product']
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = ['id', 'store', 'product', 'delta', 'reason', 'order', 'compacted', 'created_at']
+    list_filter = ['reason', 'compacted', 'store']
+    search_fields = ['product__title', 'store__name', 'order__id']
+    list_select_related = ['store', 'product']
+    raw_id_fields = ['order']
+
+
+@admin.register(InventorySlot)
+class InventorySlotAdmin(admin.ModelAdmin):
+    list_display = ['id', 'store', 'product', 'slot', 'quantity']
+    list_filter = ['store']
+    search_fields = ['product__title', 'store__name']
+    list_select_related = ['store', 'product']
@@ -0,0 +1,236 @@
+import csv
+import json
+from django.db import connections, transaction
+from django.utils import timezone
+from apps.core.sharding import current_shard
+from apps.products.models import Product
+from .models import Inventory, InventoryMovement
+from .hot_skus import unshard_store
+from .ledger import settle_pending
+from .stats import refresh_store_stats
+
+# Content types accepted by the bulk inventory endpoint
+BULK_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+# Unknown product IDs listed in the response are capped at this many
+MAX_REPORTED_UNKNOWN = 100
+
+
+class BulkInventoryError(Exception):
+    """Raised for malformed feed input; carries the offending line number"""
+
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+        super().__init__(f'Line {line}: {message}')
+
+
+def _coerce_row(line, product_id, quantity):
+    try:
+        product_id = int(product_id)
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        raise BulkInventoryError(line, 'product_id and quantity must be integers.')
+    if quantity < 0:
+        raise BulkInventoryError(line, 'quantity must not be negative.')
+    return line, product_id, quantity
+
+
+def parse_csv(lines):
+    """
+    Yield (line, product_id, quantity) from CSV text with a header row
+    naming at least product_id and quantity.
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {'product_id', 'quantity'} <= set(reader.fieldnames):
+        raise BulkInventoryError(1, 'CSV header must include product_id and quantity.')
+    for row in reader:
+        yield _coerce_row(reader.line_num, row['product_id'], row['quantity'])
+
+
+def parse_ndjson(lines):
+    """Yield (line, product_id, quantity) from one JSON object per line"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise BulkInventoryError(line_number, 'Invalid JSON.')
+        if not isinstance(row, dict):
+            raise BulkInventoryError(line_number, 'Each line must be a JSON object.')
+        yield _coerce_row(line_number, row.get('product_id'), row.get('quantity'))
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ndjson': parse_ndjson,
+}
+
+
+def bulk_upsert_inventory(store_id, rows):
+    """
+    Set stock levels for one store from (line, product_id, quantity) rows.
+    A product appearing more than once takes its last quantity; unknown
+    products are skipped and reported. Pending ledger movements for the
+    products are settled, since the feed's quantities supersede them.
+
+    Returns counts of received, inserted, updated and unchanged rows.
+    """
+    with transaction.atomic(using=current_shard()):
+        # Absolute quantities would be overwritten by slot totals, so fold
+        # any sharded hot SKUs back first; they are re-promoted if still hot
+        unshard_store(store_id)
+
+        if connections[current_shard()].vendor == 'postgresql':
+            result, settled = _upsert_with_copy(store_id, rows)
+        else:
+            result, settled = _upsert_with_orm(store_id, rows)
+
+        # A feed rewrites much of the store, so recompute its totals
+        # rather than tracking per-row deltas
+        if result['inserted'] or result['updated'] or settled:
+            refresh_store_stats(store_id)
+        return result
+
+
+def _upsert_with_copy(store_id, rows):
+    """
+    Stream rows into a temp table with COPY, then apply them with one
+    INSERT ... ON CONFLICT against unique_store_product. The conflict
+    update is skipped for rows whose quantity is unchanged, so those are
+    neither rewritten nor bumped in the change feed.
+
+    Returns the counts and the number of pending movements settled.
+    """
+    inventory_table = Inventory._meta.db_table
+    product_table = Product._meta.db_table
+    movement_table = InventoryMovement._meta.db_table
+
+    with connections[current_shard()].cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMP TABLE inventory_bulk_stage '
+            '(line integer, product_id bigint, quantity integer) ON COMMIT DROP'
+        )
+        with cursor.copy('COPY inventory_bulk_stage (line, product_id, quantity) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+
+        # Settle pending movements before touching Inventory, in the
+        # compactor's lock order
+        cursor.execute(
+            f'''
+            UPDATE {movement_table} SET compacted = true
+            WHERE store_id = %s AND NOT compacted
+                AND product_id IN (SELECT product_id FROM inventory_bulk_stage)
+            ''',
+            [store_id]
+        )
+        settled = cursor.rowcount
+
+        cursor.execute(
+            f'''
+            WITH staged AS (
+                SELECT DISTINCT ON (s.product_id) s.product_id, s.quantity, p.title
+                FROM inventory_bulk_stage s
+                JOIN {product_table} p ON p.id = s.product_id
+                ORDER BY s.product_id, s.line DESC
+            ), upserted AS (
+                INSERT INTO {inventory_table} (store_id, product_id, quantity, product_title, updated_at)
+                SELECT %s, product_id, quantity, title, %s FROM staged
+                ON CONFLICT ON CONSTRAINT unique_store_product DO UPDATE
+                    SET quantity = EXCLUDED.quantity, updated_at = EXCLUDED.updated_at
+                    WHERE {inventory_table}.quantity IS DISTINCT FROM EXCLUDED.quantity
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                (SELECT count(*) FROM inventory_bulk_stage),
+                (SELECT count(*) FROM staged),
+                count(*) FILTER (WHERE inserted),
+                count(*) FILTER (WHERE NOT inserted)
+            FROM upserted
+            ''',
+            [store_id, timezone.now()]
+        )
+        received, matched, inserted, updated = cursor.fetchone()
+
+        cursor.execute(
+            f'''
+            SELECT DISTINCT s.product_id FROM inventory_bulk_stage s
+            WHERE NOT EXISTS (SELECT 1 FROM {product_table} p WHERE p.id = s.product_id)
+            ORDER BY s.product_id
+            LIMIT %s
+            ''',
+            [MAX_REPORTED_UNKNOWN]
+        )
+        unknown = [product_id for (product_id,) in cursor.fetchall()]
+
+        # ON COMMIT DROP only fires at the outermost commit; inside an outer
+        # transaction this atomic block is a savepoint and the next call
+        # would find the table still there
+        cursor.execute('DROP TABLE inventory_bulk_stage')
+
+    return {
+        'received': received,
+        'inserted': inserted,
+        'updated': updated,
+        'unchanged': matched - inserted - updated,
+        'unknown_products': unknown,
+    }, settled
+
+
+def _upsert_with_orm(store_id, rows):
+    """Portable fallback for databases without COPY (used by SQLite dev setups)"""
+    received = 0
+    latest = {}
+    for _, product_id, quantity in rows:
+        received += 1
+        latest[product_id] = quantity
+
+    titles = dict(
+        Product.objects.filter(id__in=latest.keys()).values_list('id', 'title')
+    )
+    unknown = sorted(set(latest) - set(titles))[:MAX_REPORTED_UNKNOWN]
+
+    settled = settle_pending(store_id, titles.keys())
+
+    existing = {
+        inventory.product_id: inventory
+        for inventory in Inventory.objects.filter(store_id=store_id, product_id__in=titles.keys())
+    }
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    unchanged = 0
+    for product_id, title in titles.items():
+        quantity = latest[product_id]
+        inventory = existing.get(product_id)
+        if inventory is None:
+            to_create.append(Inventory(
+                store_id=store_id,
+                product_id=product_id,
+                product_title=title,
+                quantity=quantity
+            ))
+        elif inventory.quantity != quantity:
+            inventory.quantity = quantity
+            inventory.updated_at = now
+            to_update.append(inventory)
+        else:
+            unchanged += 1
+
+    Inventory.objects.bulk_create(to_create, batch_size=1000)
+    Inventory.objects.bulk_update(to_update, ['quantity', 'updated_at'], batch_size=1000)
+
+    return {
+        'received': received,
+        'inserted': len(to_create),
+        'updated': len(to_update),
+        'unchanged': unchanged,
+        'unknown_products': unknown,
+    }, settled
@@ -0,0 +1,103 @@
+import csv
+from datetime import datetime
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from .models import Inventory
+from .hot_skus import STOCK_QUANTITY
+
+# Rows per server-side cursor fetch
+EXPORT_CHUNK_SIZE = 2000
+
+# Encoded rows are joined into one chunk before being yielded, so the
+# response isn't written one tiny line at a time
+LINES_PER_CHUNK = 500
+
+INVENTORY_EXPORT_FIELDS = (
+    # (column name, values_list lookup)
+    ('id', 'id'),
+    ('product_id', 'product_id'),
+    ('product_title', 'product_title'),
+    ('price', 'product__price'),
+    ('category_name', 'product__category__name'),
+    ('quantity', 'stock'),
+    ('updated_at', 'updated_at'),
+)
+
+INVENTORY_EXPORT_HEADER = [column for column, _ in INVENTORY_EXPORT_FIELDS]
+
+
+class _Echo:
+    """File-like object that hands back whatever csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lines):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= LINES_PER_CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in row
+            ])
+
+    return _chunked(lines())
+
+
+def stream_ndjson(header, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+    def lines():
+        for row in rows:
+            yield encoder.encode(dict(zip(header, row))) + '\n'
+
+    return _chunked(lines())
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
+
+
+def write_export(fmt, header, rows, output):
+    """Write an export to a text file object (used by management commands)"""
+    encode, _ = EXPORT_FORMATS[fmt]
+    for chunk in encode(header, rows):
+        output.write(chunk)
+
+
+def streaming_export_response(fmt, header, rows, filename):
+    encode, content_type = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(encode(header, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+def inventory_export_rows(store_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate a store's inventory as tuples through a server-side cursor,
+    so memory stays constant whatever the store size.
+    """
+    return Inventory.objects.filter(
+        store_id=store_id
+    ).annotate(
+        stock=STOCK_QUANTITY
+    ).order_by('id').values_list(
+        *[lookup for _, lookup in INVENTORY_EXPORT_FIELDS]
+    ).iterator(chunk_size=chunk_size)
+
@@ -0,0 +1,295 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum, Case, When, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.core.sharding import current_shard
+from .models import Inventory, InventorySlot
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStock(Exception):
+    """Raised when a sharded SKU's slots can't cover a deduction"""
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        super().__init__(f'Insufficient stock for product {product_id}.')
+
+
+def sharding_enabled():
+    return (
+        settings.HOT_SKU_SHARDING
+        and not settings.INVENTORY_LEDGER_MODE
+        and not settings.REDIS_STOCK_MODE
+    )
+
+
+# Total of an Inventory row's slots; annotate sharded rows with this
+SLOT_TOTAL = Coalesce(
+    Subquery(
+        InventorySlot.objects.filter(
+            store_id=OuterRef('store_id'),
+            product_id=OuterRef('product_id')
+        ).values('product_id').annotate(total=Sum('quantity')).values('total'),
+        output_field=IntegerField()
+    ),
+    0
+)
+
+# Stock of an Inventory row: the slot total for sharded hot SKUs, whose
+# quantity column is only synced by the periodic rebalance. Read views
+# annotate rows with this as `stock`
+STOCK_QUANTITY = Case(
+    When(sharded=True, then=SLOT_TOTAL),
+    default=F('quantity')
+)
+
+
+def _wait_key(store_id, product_id):
+    return f'hot_sku:wait_ms:{store_id}:{product_id}'
+
+
+def _orders_key(store_id, product_id):
+    return f'hot_sku:orders:{store_id}:{product_id}'
+
+
+def record_lock_wait(store_id, inventory_lookup, seconds):
+    """
+    Feed one order's measured lock wait into the per-SKU windows.
+
+    Unsharded rows accumulate wait time (when it is worth sampling) and
+    are promoted once the window total passes HOT_SKU_PROMOTE_WAIT_MS.
+    Sharded rows count orders, which drives demotion. Runs after the order
+    commits, so failures are logged rather than raised.
+    """
+    if not sharding_enabled():
+        return
+
+    window = settings.HOT_SKU_WINDOW_SECONDS
+    wait_ms = int(seconds * 1000)
+
+    for product_id, inventory in inventory_lookup.items():
+        try:
+            if inventory.sharded:
+                _add_to_window(_orders_key(store_id, product_id), 1, window)
+            elif wait_ms >= settings.HOT_SKU_WAIT_SAMPLE_MS:
+                total = _add_to_window(_wait_key(store_id, product_id), wait_ms, window)
+                # Only the order that crosses the threshold schedules promotion
+                if total - wait_ms < settings.HOT_SKU_PROMOTE_WAIT_MS <= total:
+                    _schedule_promotion(store_id, product_id)
+        except Exception as e:
+            logger.warning(f"Recording lock wait for store {store_id} product {product_id} failed: {e}")
+
+
+def _add_to_window(key, amount, window):
+    cache.add(key, 0, window)
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        # The key expired between add() and incr(); start a new window
+        cache.set(key, amount, window)
+        return amount
+
+
+def _schedule_promotion(store_id, product_id):
+    # Off the request path when a worker is available
+    if getattr(settings, 'USE_REDIS', False):
+        try:
+            from .tasks import promote_hot_sku
+        except ImportError:
+            pass
+        else:
+            promote_hot_sku.delay(store_id, product_id)
+            return
+    shard_inventory(store_id, product_id)
+
+
+def _split(total, slots):
+    share, extra = divmod(max(total, 0), slots)
+    return [share + (1 if slot < extra else 0) for slot in range(slots)]
+
+
+def shard_inventory(store_id, product_id, slots=None):
+    """Split a row's stock into slots; returns False if nothing changed"""
+    if not sharding_enabled():
+        return False
+    slots = slots or settings.HOT_SKU_SLOTS
+
+    with transaction.atomic(using=current_shard()):
+        inventory = Inventory.objects.select_for_update().filter(
+            store_id=store_id,
+            product_id=product_id
+        ).first()
+        if inventory is None or inventory.sharded:
+            return False
+
+        InventorySlot.objects.bulk_create([
+            InventorySlot(store_id=store_id, product_id=product_id, slot=slot, quantity=quantity)
+            for slot, quantity in enumerate(_split(inventory.quantity, slots))
+        ])
+        Inventory.objects.filter(id=inventory.id).update(sharded=True)
+
+    # A fresh shard gets a full window before it can be demoted
+    cache.set(_orders_key(store_id, product_id), settings.HOT_SKU_DEMOTE_ORDERS, settings.HOT_SKU_WINDOW_SECONDS)
+    return True
+
+
+def unshard_inventory(store_id, product_id):
+    """Fold a sharded row's slots back into Inventory.quantity"""
+    with transaction.atomic(using=current_shard()):
+        inventory = Inventory.objects.select_for_update().filter(
+            store_id=store_id,
+            product_id=product_id
+        ).first()
+        if inventory is None or not inventory.sharded:
+            return False
+
+        slots = InventorySlot.objects.select_for_update().filter(
+            store_id=store_id,
+            product_id=product_id
+        ).order_by('slot')
+        total = sum(slot.quantity for slot in slots)
+        slots.delete()
+        Inventory.objects.filter(id=inventory.id).update(
+            quantity=total,
+            sharded=False,
+            updated_at=timezone.now()
+        )
+    return True
+
+
+def take_from_slots(store_id, product_id, quantity):
+    """
+    Deduct from a sharded SKU in the caller's transaction.
+
+    Tries one random slot with enough stock, skipping slots other orders
+    hold. Otherwise locks every slot and drains them in order. Raises
+    InsufficientStock if the slots together can't cover the quantity.
+    """
+    slot = InventorySlot.objects.select_for_update(skip_locked=True).filter(
+        store_id=store_id,
+        product_id=product_id,
+        quantity__gte=quantity
+    ).order_by('?').first()
+
+    if slot is not None:
+        InventorySlot.objects.filter(id=slot.id).update(quantity=F('quantity') - quantity)
+        return
+
+    slots = list(
+        InventorySlot.objects.select_for_update().filter(
+            store_id=store_id,
+            product_id=product_id
+        ).order_by('slot')
+    )
+    if not slots:
+        # Demoted since the stock check; fall back to the row itself
+        updated = Inventory.objects.filter(
+            store_id=store_id,
+            product_id=product_id,
+            sharded=False,
+            quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity, updated_at=timezone.now())
+        if not updated:
+            raise InsufficientStock(product_id)
+        return
+
+    if sum(slot.quantity for slot in slots) < quantity:
+        raise InsufficientStock(product_id)
+
+    remaining = quantity
+    for slot in slots:
+        taken = min(slot.quantity, remaining)
+        if taken:
+            slot.quantity -= taken
+            remaining -= taken
+    InventorySlot.objects.bulk_update(slots, ['quantity'])
+
+
+def add_to_slots(store_id, product_id, quantity):
+    """
+    Return stock to a sharded SKU whose Inventory row the caller has
+    locked; the periodic rebalance spreads it over the slots.
+    """
+    InventorySlot.objects.filter(
+        store_id=store_id,
+        product_id=product_id,
+        slot=0
+    ).update(quantity=F('quantity') + quantity)
+
+
+def return_stock(store_id, product_id, quantity):
+    """
+    Add stock back to a row in the caller's transaction, into its slots
+    if it is sharded. The row is locked first so it can't be promoted or
+    demoted in between.
+    """
+    sharded = Inventory.objects.select_for_update().filter(
+        store_id=store_id,
+        product_id=product_id
+    ).values_list('sharded', flat=True).first()
+
+    if sharded:
+        add_to_slots(store_id, product_id, quantity)
+    elif sharded is not None:
+        Inventory.objects.filter(
+            store_id=store_id,
+            product_id=product_id
+        ).update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+
+
+def unshard_store(store_id):
+    """Fold every sharded row of a store back, e.g. before absolute stock writes"""
+    product_ids = Inventory.objects.filter(
+        store_id=store_id,
+        sharded=True
+    ).values_list('product_id', flat=True)
+    for product_id in list(product_ids):
+        unshard_inventory(store_id, product_id)
+
+
+def rebalance_hot_skus():
+    """
+    Periodic upkeep for sharded rows: demote SKUs that took fewer than
+    HOT_SKU_DEMOTE_ORDERS orders in the last window (all of them when
+    sharding is off), and for the rest spread stock evenly over the slots
+    and sync Inventory.quantity to the slot total.
+
+    Returns (rebalanced, demoted) counts.
+    """
+    rows = list(Inventory.objects.filter(sharded=True).values_list('store_id', 'product_id'))
+    if sharding_enabled():
+        order_counts = cache.get_many([_orders_key(*row) for row in rows])
+    else:
+        order_counts = {}
+
+    rebalanced = demoted = 0
+    for store_id, product_id in rows:
+        orders = order_counts.get(_orders_key(store_id, product_id), 0)
+        if orders < settings.HOT_SKU_DEMOTE_ORDERS:
+            if unshard_inventory(store_id, product_id):
+                demoted += 1
+            continue
+
+        with transaction.atomic(using=current_shard()):
+            slots = list(
+                InventorySlot.objects.select_for_update().filter(
+                    store_id=store_id,
+                    product_id=product_id
+                ).order_by('slot')
+            )
+            total = sum(slot.quantity for slot in slots)
+            for slot, quantity in zip(slots, _split(total, len(slots))):
+                slot.quantity = quantity
+            InventorySlot.objects.bulk_update(slots, ['quantity'])
+            Inventory.objects.filter(
+                store_id=store_id,
+                product_id=product_id,
+                sharded=True
+            ).exclude(quantity=total).update(quantity=total, updated_at=timezone.now())
+        rebalanced += 1
+
+    return rebalanced, demoted
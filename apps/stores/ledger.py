@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Sum, OuterRef, Subquery, Exists, IntegerField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.core.sharding import current_shard
+from .models import Inventory, InventoryMovement
+
+
+def ledger_enabled():
+    return settings.INVENTORY_LEDGER_MODE
+
+
+def _pending_for_row(movements):
+    """Sum of the given movements for the outer Inventory row"""
+    return Coalesce(
+        Subquery(
+            movements.filter(
+                store_id=OuterRef('store_id'),
+                product_id=OuterRef('product_id')
+            ).values('product_id').annotate(total=Sum('delta')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+# Uncompacted movements for an Inventory row; annotate as quantity + this
+PENDING_DELTA = _pending_for_row(InventoryMovement.objects.filter(compacted=False))
+
+
+def lock_balances(store_id, product_ids):
+    """
+    Serialize stock checks for these products and return their Inventory
+    rows annotated with the live balance (quantity plus pending movements).
+
+    On PostgreSQL this takes transaction-scoped advisory locks keyed on
+    (store, product) in product order, so concurrent orders queue on the
+    lock instead of on the Inventory row, which they no longer write and
+    which compaction can update meanwhile. Elsewhere the rows are locked
+    with select_for_update.
+    """
+    product_ids = sorted(set(product_ids))
+    inventory_qs = Inventory.objects.filter(store_id=store_id, product_id__in=product_ids)
+
+    connection = connections[current_shard()]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, product_id) '
+                'FROM (SELECT unnest(%s::int[]) AS product_id ORDER BY 1) AS ordered',
+                [store_id, product_ids]
+            )
+    else:
+        inventory_qs = inventory_qs.order_by('product_id').select_for_update()
+
+    # One statement, so the balance can't straddle a compaction commit
+    inventory_qs = inventory_qs.annotate(balance=F('quantity') + PENDING_DELTA)
+    return {inv.product_id: inv for inv in inventory_qs}
+
+
+def append_movements(store_id, deltas, reason, order=None):
+    """Record stock changes; deltas maps product_id to a signed quantity"""
+    InventoryMovement.objects.bulk_create([
+        InventoryMovement(
+            store_id=store_id,
+            product_id=product_id,
+            delta=delta,
+            reason=reason,
+            order=order
+        )
+        for product_id, delta in deltas.items()
+        if delta
+    ])
+
+
+def compact_movements(batch_size=None):
+    """
+    Fold pending movements into Inventory.quantity, one batch per
+    transaction: claim a batch (skipping rows another compactor holds),
+    apply it with a single UPDATE and flag it compacted. Balances don't
+    change, only where they are stored. Returns the number compacted.
+    """
+    batch_size = batch_size or settings.INVENTORY_COMPACTION_BATCH_SIZE
+    compacted = 0
+
+    while True:
+        with transaction.atomic(using=current_shard()):
+            batch = list(
+                InventoryMovement.objects.select_for_update(skip_locked=True).filter(
+                    compacted=False
+                ).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            movements = InventoryMovement.objects.filter(id__in=batch)
+            Inventory.objects.filter(
+                Exists(movements.filter(
+                    store_id=OuterRef('store_id'),
+                    product_id=OuterRef('product_id')
+                ))
+            ).update(
+                quantity=F('quantity') + _pending_for_row(movements),
+                updated_at=timezone.now()
+            )
+            movements.update(compacted=True)
+            compacted += len(batch)
+
+        if len(batch) < batch_size:
+            break
+
+    return compacted
+
+
+def settle_pending(store_id, product_ids):
+    """
+    Flag pending movements for these products compacted without applying
+    them, for writers setting absolute quantities that already account for
+    them. Call it before writing the Inventory rows, matching the lock
+    order of compact_movements. Returns the number settled.
+    """
+    return InventoryMovement.objects.filter(
+        store_id=store_id,
+        product_id__in=product_ids,
+        compacted=False
+    ).update(compacted=True)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from .models import Inventory, LOW_STOCK_INDEX_CEILING
+from .hot_skus import STOCK_QUANTITY
+
+
+def global_low_stock_threshold():
+    return min(settings.LOW_STOCK_THRESHOLD, LOW_STOCK_INDEX_CEILING)
+
+
+def effective_threshold(store_threshold):
+    """Resolve a store's low_stock_threshold value (possibly None)"""
+    if store_threshold is not None:
+        return min(store_threshold, LOW_STOCK_INDEX_CEILING)
+    return global_low_stock_threshold()
+
+
+def store_low_stock_threshold(store):
+    return effective_threshold(store.low_stock_threshold)
+
+
+def low_stock_inventory(store=None):
+    """
+    Inventory rows below their store's low-stock threshold, annotated
+    with their stock.
+
+    Unsharded rows repeat the partial index predicate (quantity < ceiling)
+    literally, so PostgreSQL can prove the index applies and never scans
+    the full Inventory table. Sharded hot SKUs are few and found through
+    their own partial index; their stock is the slot total.
+    """
+    queryset = Inventory.objects.annotate(stock=STOCK_QUANTITY)
+
+    if store is not None:
+        queryset = queryset.filter(store=store)
+        threshold = store_low_stock_threshold(store)
+    else:
+        threshold = Coalesce('store__low_stock_threshold', Value(global_low_stock_threshold()))
+
+    return queryset.filter(
+        Q(sharded=False) & Q(quantity__lt=LOW_STOCK_INDEX_CEILING) & Q(quantity__lt=threshold)
+        | Q(sharded=True, stock__lt=threshold)
+    )
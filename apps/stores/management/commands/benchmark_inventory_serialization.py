@@ -0,0 +1,90 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from apps.stores.hot_skus import STOCK_QUANTITY
+from apps.stores.models import Store, Inventory
+from apps.stores.serializers import (
+    InventorySerializer,
+    INVENTORY_ROW_LOOKUPS,
+    map_inventory_row
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare InventorySerializer with the values() fast path for store inventory pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--store', type=int, help='Store ID (defaults to the store with most inventory)')
+        parser.add_argument('--rows', type=int, default=100, help='Rows per page')
+        parser.add_argument('--iterations', type=int, default=200, help='Timed iterations per path')
+
+    def handle(self, *args, **options):
+        store = self.get_store(options['store'])
+        rows = options['rows']
+        iterations = options['iterations']
+
+        queryset = Inventory.objects.filter(store=store).annotate(
+            stock=STOCK_QUANTITY
+        ).order_by('product__title')
+
+        # Fetch once so the comparison measures serialization only
+        instances = list(queryset.select_related('product', 'product__category')[:rows])
+        value_rows = list(queryset.values_list(*INVENTORY_ROW_LOOKUPS)[:rows])
+
+        serializer_output = InventorySerializer(instances, many=True).data
+        fast_output = [map_inventory_row(row) for row in value_rows]
+        if [dict(item) for item in serializer_output] != fast_output:
+            raise CommandError('Fast path output differs from InventorySerializer output')
+
+        self.stdout.write(f'Store #{store.id} {store.name}: {len(instances)} rows, {iterations} iterations')
+
+        serializer_time = self.time_it(
+            lambda: InventorySerializer(instances, many=True).data,
+            iterations
+        )
+        fast_time = self.time_it(
+            lambda: [map_inventory_row(row) for row in value_rows],
+            iterations
+        )
+
+        # End to end, including the query and row construction
+        serializer_total = self.time_it(
+            lambda: InventorySerializer(
+                queryset.select_related('product', 'product__category')[:rows], many=True
+            ).data,
+            iterations
+        )
+        fast_total = self.time_it(
+            lambda: [map_inventory_row(row) for row in queryset.values_list(*INVENTORY_ROW_LOOKUPS)[:rows]],
+            iterations
+        )
+
+        self.stdout.write(f'{"":<24}{"serialize (ms)":>16}{"query+serialize (ms)":>24}')
+        self.stdout.write(f'{"InventorySerializer":<24}{serializer_time:>16.3f}{serializer_total:>24.3f}')
+        self.stdout.write(f'{"values() fast path":<24}{fast_time:>16.3f}{fast_total:>24.3f}')
+        if fast_time:
+            self.stdout.write(self.style.SUCCESS(
+                f'Serialization speedup: {serializer_time / fast_time:.1f}x'
+            ))
+
+    def get_store(self, store_id):
+        if store_id is not None:
+            try:
+                return Store.objects.get(id=store_id)
+            except Store.DoesNotExist:
+                raise CommandError(f'Store with id {store_id} not found.')
+
+        store = Store.objects.annotate(
+            inventory_count=Count('inventory_items')
+        ).order_by('-inventory_count').first()
+        if store is None:
+            raise CommandError('No stores found. Run seed_data first.')
+        return store
+
+    def time_it(self, func, iterations):
+        """Return the mean wall time of func in milliseconds"""
+        func()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) * 1000 / iterations
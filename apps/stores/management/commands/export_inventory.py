@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.sharding import shard_for_store, use_shard
+from apps.stores.models import Store
+from apps.stores.exports import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    INVENTORY_EXPORT_HEADER,
+    inventory_export_rows,
+    write_export
+)
+
+
+class Command(BaseCommand):
+    help = "Stream a store's inventory to CSV or NDJSON with constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('store_id', type=int)
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        store_id = options['store_id']
+        if not Store.objects.filter(id=store_id).exists():
+            raise CommandError(f'Store with id {store_id} not found.')
+
+        with use_shard(shard_for_store(store_id)):
+            rows = inventory_export_rows(store_id, chunk_size=options['chunk_size'])
+
+            if options['output']:
+                with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                    write_export(options['format'], INVENTORY_EXPORT_HEADER, rows, output)
+                self.stderr.write(self.style.SUCCESS(f"Inventory written to {options['output']}"))
+            else:
+                write_export(options['format'], INVENTORY_EXPORT_HEADER, rows, self.stdout)
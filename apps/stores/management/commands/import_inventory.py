@@ -0,0 +1,46 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.sharding import shard_for_store, use_shard
+from apps.stores.models import Store
+from apps.stores.bulk import PARSERS, BulkInventoryError, bulk_upsert_inventory
+
+
+class Command(BaseCommand):
+    help = 'Bulk upsert stock levels for a store from a CSV or NDJSON feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('store_id', type=int)
+        parser.add_argument('path', help='Feed file with product_id and quantity per row')
+        parser.add_argument(
+            '--format',
+            choices=sorted(PARSERS),
+            help='Feed format (defaults to the file extension)'
+        )
+
+    def handle(self, *args, **options):
+        store_id = options['store_id']
+        if not Store.objects.filter(id=store_id).exists():
+            raise CommandError(f'Store with id {store_id} not found.')
+
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt == 'jsonl':
+            fmt = 'ndjson'
+        if fmt not in PARSERS:
+            raise CommandError('Cannot tell the feed format; pass --format csv or --format ndjson.')
+
+        with open(options['path'], newline='', encoding='utf-8') as feed, use_shard(shard_for_store(store_id)):
+            try:
+                result = bulk_upsert_inventory(store_id, PARSERS[fmt](feed))
+            except BulkInventoryError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Received {result['received']} rows: "
+            f"{result['inserted']} inserted, "
+            f"{result['updated']} updated, "
+            f"{result['unchanged']} unchanged"
+        ))
+        if result['unknown_products']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped unknown products: {result['unknown_products']}"
+            ))
@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.sharding import SHARDED_MODELS, interleave_id_sequences, replicate_catalog
+from apps.products.models import Category, Product
+from apps.stores.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Migrate the store shards, copy the catalog to them and interleave their ID sequences'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-migrate', action='store_true',
+                            help='Only copy the catalog and set the sequences')
+
+    def handle(self, *args, **options):
+        shards = settings.DATABASE_SHARDS
+        if not shards:
+            raise CommandError('No shards configured; set DATABASE_SHARD_HOSTS.')
+
+        if not options['skip_migrate']:
+            for alias in shards:
+                self.stdout.write(f'Migrating {alias}...')
+                call_command('migrate', database=alias, interactive=False, verbosity=options['verbosity'] - 1)
+
+        copied = replicate_catalog([Category, Product, Store])
+        for alias, rows in copied.items():
+            self.stdout.write(f'{alias}: {rows} catalog rows copied')
+
+        changed = interleave_id_sequences([apps.get_model(label) for label in sorted(SHARDED_MODELS)])
+        if changed:
+            self.stdout.write(f'ID sequences interleaved on {", ".join(changed)}')
+        else:
+            self.stdout.write(self.style.WARNING(
+                'ID sequences left alone (PostgreSQL only); IDs may repeat across shards'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(f'{len(shards)} shards in sync'))
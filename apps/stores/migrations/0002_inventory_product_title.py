@@ -0,0 +1,35 @@
+# Generated by Django 4.2.9 on 2026-10-19 06:53
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_product_title(apps, schema_editor):
+    Inventory = apps.get_model('stores', 'Inventory')
+    Product = apps.get_model('products', 'Product')
+    Inventory.objects.update(
+        product_title=Subquery(
+            Product.objects.filter(pk=OuterRef('product_id')).values('title')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('stores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='product_title',
+            field=models.CharField(default='', editable=False, max_length=300),
+        ),
+        migrations.RunPython(populate_product_title, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['store', 'product_title', 'id'], name='inventory_store_title_id_idx'),
+        ),
+    ]
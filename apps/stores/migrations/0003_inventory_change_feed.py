@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_inventory_product_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.BigIntegerField()),
+                ('product_id', models.BigIntegerField()),
+                ('inventory_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['store', 'updated_at', 'id'], name='inventory_store_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorytombstone',
+            index=models.Index(fields=['store_id', 'deleted_at'], name='stores_inve_store_i_e6b766_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 06:57
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0003_inventory_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(10)]),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('quantity__lt', 10)), fields=['store', 'quantity', 'id'], name='inventory_low_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.9 on 2026-10-19 06:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0004_low_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreStats',
+            fields=[
+                ('store', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='stores.store')),
+                ('total_skus', models.IntegerField(default=0)),
+                ('total_units', models.BigIntegerField(default=0)),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Store stats',
+            },
+        ),
+    ]
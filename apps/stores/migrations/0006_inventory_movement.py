@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-19 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('orders', '0002_reservations'),
+        ('stores', '0005_store_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('ORDER', 'Order'), ('RESERVATION', 'Reservation'), ('RELEASE', 'Reservation release'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('compacted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_movements', to='orders.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='products.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='stores.store')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('compacted', False)), fields=['store', 'product'], name='movement_pending_idx'), models.Index(fields=['store', 'product', 'created_at'], name='stores_inve_store_i_507ecd_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.9 on 2026-10-19 07:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('stores', '0006_inventory_movement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='sharded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='InventorySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_slots', to='products.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_slots', to='stores.store')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='inventoryslot',
+            constraint=models.UniqueConstraint(fields=('store', 'product', 'slot'), name='unique_store_product_slot'),
+        ),
+    ]
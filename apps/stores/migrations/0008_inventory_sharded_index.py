@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0007_hot_sku_slots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('sharded', True)), fields=['store', 'id'], name='inventory_sharded_idx'),
+        ),
+    ]
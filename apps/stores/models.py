@@ -1,10 +1,21 @@
+from django.core.validators import MaxValueValidator
 from django.db import models
 from apps.products.models import Product
 
+# Upper bound on any low-stock threshold. The partial low-stock index only
+# covers rows below this quantity, so thresholds must not exceed it.
+LOW_STOCK_INDEX_CEILING = 10
+
 
 class Store(models.Model):
     name = models.CharField(max_length=200, db_index=True)
     location = models.CharField(max_length=300)
+    # Per-store override of settings.LOW_STOCK_THRESHOLD
+    low_stock_threshold = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MaxValueValidator(LOW_STOCK_INDEX_CEILING)]
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -26,6 +37,12 @@ class Inventory(models.Model):
         related_name='inventory_items'
     )
     quantity = models.IntegerField(default=0, db_index=True)
+    # Denormalized copy of product.title so store listings can seek on
+    # (store, product_title, id) without joining products
+    product_title = models.CharField(max_length=300, default='', editable=False)
+    # Hot SKUs keep their stock in InventorySlot rows; quantity is then a
+    # copy of the slot total, synced periodically for listings
+    sharded = models.BooleanField(default=False, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -39,7 +56,158 @@ class Inventory(models.Model):
         indexes = [
             models.Index(fields=['store', 'quantity']),
             models.Index(fields=['product', 'quantity']),
+            models.Index(
+                fields=['store', 'product_title', 'id'],
+                name='inventory_store_title_id_idx'
+            ),
+            models.Index(
+                fields=['store', 'updated_at', 'id'],
+                name='inventory_store_updated_id_idx'
+            ),
+            models.Index(
+                fields=['store', 'quantity', 'id'],
+                name='inventory_low_stock_idx',
+                condition=models.Q(quantity__lt=LOW_STOCK_INDEX_CEILING)
+            ),
+            models.Index(
+                fields=['store', 'id'],
+                name='inventory_sharded_idx',
+                condition=models.Q(sharded=True)
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.store.name} - {self.product.title}: {self.quantity}"
+    
+    def save(self, *args, **kwargs):
+        # Partial saves (e.g. stock deductions) leave the title alone
+        if kwargs.get('update_fields') is None:
+            self.product_title = self.product.title
+        super().save(*args, **kwargs)
+
+
+class InventoryTombstone(models.Model):
+    """
+    Record of a deleted Inventory row, so the change feed can report
+    deletions. Holds plain IDs rather than foreign keys because the store
+    or product may be deleted along with it.
+    """
+    store_id = models.BigIntegerField()
+    product_id = models.BigIntegerField()
+    inventory_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['store_id', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"Deleted inventory #{self.inventory_id} (store {self.store_id})"
+
+
+class StoreStats(models.Model):
+    """
+    Per-store inventory totals, kept up to date incrementally by the write
+    paths (orders, bulk inventory writes, price changes) and corrected by
+    a periodic reconciliation. Reading them is a primary-key lookup.
+    """
+    store = models.OneToOneField(
+        Store,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    total_skus = models.IntegerField(default=0)
+    total_units = models.BigIntegerField(default=0)
+    stock_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Store stats'
+    
+    def __str__(self):
+        return f"Stats for store #{self.store_id}: {self.total_skus} SKUs, {self.total_units} units"
+
+
+class InventoryMovement(models.Model):
+    """
+    Append-only stock change used in ledger mode. Orders add a movement
+    instead of rewriting the Inventory row; a store's live balance is
+    Inventory.quantity plus its uncompacted movements, and compaction
+    folds them into quantity in batches. Compacted rows are kept as the
+    audit trail.
+    """
+    REASON_CHOICES = [
+        ('ORDER', 'Order'),
+        ('RESERVATION', 'Reservation'),
+        ('RELEASE', 'Reservation release'),
+        ('ADJUSTMENT', 'Adjustment'),
+    ]
+    
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='inventory_movements'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='inventory_movements'
+    )
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inventory_movements'
+    )
+    compacted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            # Balance reads and compaction only look at pending movements
+            models.Index(
+                fields=['store', 'product'],
+                name='movement_pending_idx',
+                condition=models.Q(compacted=False)
+            ),
+            models.Index(fields=['store', 'product', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.reason} {self.delta:+d} product {self.product_id} (store {self.store_id})"
+
+
+class InventorySlot(models.Model):
+    """
+    One of K sub-counters holding the stock of a hot (store, product).
+    Orders decrement a random slot with enough stock, so concurrent orders
+    for the same SKU mostly lock different rows.
+    """
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='inventory_slots'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='inventory_slots'
+    )
+    slot = models.PositiveSmallIntegerField()
+    quantity = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['store', 'product', 'slot'],
+                name='unique_store_product_slot'
+            )
         ]
     
     def __str__(self):
-        return f"{self.store.name} - {self.product.title}: {self.quantity}"
\ No newline at end of file
+        return f"Slot {self.slot} of product {self.product_id} (store {self.store_id}): {self.quantity}"
@@ -0,0 +1,104 @@
+import base64
+import json
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class InventoryKeysetPagination:
+    """
+    Keyset (seek) pagination over a store's inventory ordered by
+    (product_title, id).
+
+    Each page starts where the previous one ended, so the cost of a page
+    does not grow with its depth the way OFFSET does. Backed by the
+    (store, product_title, id) index on Inventory.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+
+    @staticmethod
+    def encode_cursor(title, pk):
+        raw = json.dumps([title, pk], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            title, pk = json.loads(raw)
+        except (ValueError, TypeError):
+            raise InvalidCursor(token)
+        if not isinstance(title, str) or not isinstance(pk, int):
+            raise InvalidCursor(token)
+        return title, pk
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, cursor_key):
+        """
+        Return (rows, next_cursor) for the page after the request's cursor.
+        An empty cursor starts from the beginning; next_cursor is None on
+        the last page.
+
+        The queryset must be filtered to one store. cursor_key maps a row
+        to its (product_title, id) pair.
+        """
+        token = request.query_params.get(self.cursor_query_param, '')
+        page_size = self.get_page_size(request)
+
+        if token:
+            title, pk = self.decode_cursor(token)
+            # Range scan from the cursor title; only the rows sharing that
+            # title need the id tie-break
+            queryset = queryset.filter(
+                product_title__gte=title
+            ).exclude(
+                Q(product_title=title) & Q(id__lte=pk)
+            )
+
+        rows = list(queryset.order_by('product_title', 'id')[:page_size + 1])
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = self.encode_cursor(*cursor_key(rows[-1]))
+
+        return rows, next_cursor
+
+
+class ChangeFeedToken:
+    """
+    Opaque position in a store's inventory change feed: the
+    (updated_at, id) of the last row already delivered.
+    """
+
+    @staticmethod
+    def encode(timestamp, pk):
+        raw = json.dumps([timestamp.isoformat(), pk], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode(token):
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            timestamp, pk = json.loads(raw)
+            timestamp = parse_datetime(timestamp)
+        except (ValueError, TypeError):
+            raise InvalidCursor(token)
+        # Tokens are always encoded with an offset; a naive one was not
+        # issued by encode() and can't be compared with the feed's window
+        if timestamp is None or timezone.is_naive(timestamp) or not isinstance(pk, int):
+            raise InvalidCursor(token)
+        return timestamp, pk
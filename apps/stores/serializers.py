@@ -1,11 +1,20 @@
 from rest_framework import serializers
-from .models import Store, Inventory
+from .models import Store, Inventory, StoreStats
+from apps.orders.serializers import OrderItemInputSerializer
 
 
 class StoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Store
-        fields = ['id', 'name', 'location', 'created_at']
+        fields = ['id', 'name', 'location', 'low_stock_threshold', 'created_at']
+
+
+class StoreStatsSerializer(serializers.ModelSerializer):
+    store_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = StoreStats
+        fields = ['store_id', 'total_skus', 'total_units', 'stock_value', 'updated_at']
 
 
 class InventorySerializer(serializers.ModelSerializer):
@@ -18,6 +27,7 @@ class InventorySerializer(serializers.ModelSerializer):
         read_only=True
     )
     category_name = serializers.CharField(source='product.category.name', read_only=True)
+    quantity = serializers.SerializerMethodField()
 
     class Meta:
         model = Inventory
@@ -30,3 +40,62 @@ class InventorySerializer(serializers.ModelSerializer):
             'quantity',
             'updated_at'
         ]
+
+    def get_quantity(self, inventory):
+        # The slot total for sharded hot SKUs when annotated with STOCK_QUANTITY
+        return getattr(inventory, 'stock', inventory.quantity)
+
+
+# Fast path for inventory listings: rows come from values_list() and are
+# mapped straight to dicts. Conversions reuse the DRF field instances the
+# InventorySerializer would apply, so the output is identical. Querysets
+# are annotated with stock=STOCK_QUANTITY, so sharded hot SKUs report
+# their slot total.
+_price_field = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+_datetime_field = serializers.DateTimeField(read_only=True)
+
+INVENTORY_ROW_FIELDS = (
+    # (output key, values_list lookup, converter or None for pass-through)
+    ('id', 'id', None),
+    ('product_id', 'product_id', None),
+    ('product_title', 'product__title', None),
+    ('price', 'product__price', _price_field.to_representation),
+    ('category_name', 'product__category__name', None),
+    ('quantity', 'stock', None),
+    ('updated_at', 'updated_at', _datetime_field.to_representation),
+)
+
+INVENTORY_ROW_LOOKUPS = tuple(lookup for _, lookup, _ in INVENTORY_ROW_FIELDS)
+
+
+def compile_row_mapper(fields):
+    """
+    Build a function turning a values_list() tuple into a response dict.
+    Keys and converters are resolved once, not per row.
+    """
+    keys = tuple(key for key, _, _ in fields)
+    converters = tuple(converter for _, _, converter in fields)
+    plan = tuple(zip(keys, converters))
+
+    def map_row(row):
+        return {
+            key: value if convert is None or value is None else convert(value)
+            for (key, convert), value in zip(plan, row)
+        }
+
+    return map_row
+
+
+map_inventory_row = compile_row_mapper(INVENTORY_ROW_FIELDS)
+
+
+class FulfillableBasketSerializer(serializers.Serializer):
+    """Serializer for the basket posted to the fulfillment finder"""
+    items = OrderItemInputSerializer(many=True)
+    allow_partial = serializers.BooleanField(default=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one item is required.")
+        return value
@@ -0,0 +1,151 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from apps.core.cache import bump_generation
+from apps.core.sharding import for_each_shard, in_sender_database, replicate_catalog_changes
+from apps.products.models import Category, Product
+from .models import Store, Inventory, InventoryTombstone
+from .stats import adjust_store_stats, apply_price_change
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_price(sender, instance, **kwargs):
+    """Stash the stored price and category so post_save can react to changes"""
+    instance._previous_price = None
+    instance._previous_category_id = None
+    if instance.pk is not None:
+        previous = Product.objects.filter(
+            pk=instance.pk
+        ).values_list('price', 'category_id').first()
+        if previous is not None:
+            instance._previous_price, instance._previous_category_id = previous
+
+
+@receiver(post_save, sender=Product)
+def sync_inventory_product_title(sender, instance, created, **kwargs):
+    """
+    Keep Inventory.product_title in step with renamed products, and bump
+    updated_at on rows whose catalog fields in the change feed (title,
+    price, category) changed so incremental sync clients refetch them.
+    """
+    if created:
+        return
+    
+    price_or_category_changed = (
+        getattr(instance, '_previous_price', None) not in (None, instance.price)
+        or getattr(instance, '_previous_category_id', None) not in (None, instance.category_id)
+    )
+    
+    def touch():
+        rows = Inventory.objects.filter(product=instance)
+        if not price_or_category_changed:
+            rows = rows.exclude(product_title=instance.title)
+        rows.update(product_title=instance.title, updated_at=timezone.now())
+    
+    for_each_shard(touch)
+
+
+@receiver(post_save, sender=Product)
+def update_stats_for_price_change(sender, instance, created, **kwargs):
+    previous_price = getattr(instance, '_previous_price', None)
+    if created or previous_price is None:
+        return
+    for_each_shard(apply_price_change, instance.pk, previous_price, instance.price)
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category_name(sender, instance, **kwargs):
+    instance._previous_name = None
+    if instance.pk is not None:
+        instance._previous_name = Category.objects.filter(
+            pk=instance.pk
+        ).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def touch_inventory_for_category_rename(sender, instance, created, **kwargs):
+    """The change feed carries category_name, so renamed categories bump their rows"""
+    previous_name = getattr(instance, '_previous_name', None)
+    if created or previous_name is None or previous_name == instance.name:
+        return
+    for_each_shard(
+        lambda: Inventory.objects.filter(
+            product__category=instance
+        ).update(updated_at=timezone.now())
+    )
+
+
+@receiver(pre_save, sender=Inventory)
+@in_sender_database
+def remember_previous_quantity(sender, instance, **kwargs):
+    """
+    Stash the stored quantity on full saves of existing rows (admin edits,
+    scripts). Partial saves such as order deductions adjust stats
+    themselves and carry an F() expression here.
+    """
+    instance._previous_quantity = None
+    if instance.pk is not None and kwargs.get('update_fields') is None:
+        instance._previous_quantity = Inventory.objects.filter(
+            pk=instance.pk
+        ).values_list('quantity', flat=True).first()
+
+
+@receiver(post_save, sender=Inventory)
+@in_sender_database
+def update_stats_for_inventory_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_store_stats(
+            instance.store_id,
+            skus=1,
+            units=instance.quantity,
+            value=instance.quantity * instance.product.price
+        )
+        return
+    
+    previous_quantity = getattr(instance, '_previous_quantity', None)
+    if previous_quantity is not None and previous_quantity != instance.quantity:
+        units = instance.quantity - previous_quantity
+        adjust_store_stats(
+            instance.store_id,
+            units=units,
+            value=units * instance.product.price
+        )
+
+
+@receiver(post_delete, sender=Inventory)
+@in_sender_database
+def record_inventory_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone so incremental sync clients see the deletion"""
+    InventoryTombstone.objects.create(
+        store_id=instance.store_id,
+        product_id=instance.product_id,
+        inventory_id=instance.id
+    )
+
+
+@receiver(post_delete, sender=Inventory)
+@in_sender_database
+def update_stats_for_inventory_delete(sender, instance, **kwargs):
+    price = Product.objects.filter(
+        pk=instance.product_id
+    ).values_list('price', flat=True).first() or 0
+    adjust_store_stats(
+        instance.store_id,
+        skus=-1,
+        units=-instance.quantity,
+        value=-instance.quantity * price
+    )
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store_responses(sender, **kwargs):
+    """Drop cached store list and detail responses"""
+    bump_generation('stores')
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def replicate_to_shards(sender, **kwargs):
+    """Copy store writes to every shard"""
+    replicate_catalog_changes(sender, **kwargs)
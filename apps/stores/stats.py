@@ -0,0 +1,142 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import (
+    Count, Sum, F, Value, DecimalField, ExpressionWrapper, OuterRef, Subquery
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.core.sharding import current_shard, shard_for_store, use_shard
+from .models import Store, Inventory, StoreStats
+from .ledger import PENDING_DELTA
+from .hot_skus import STOCK_QUANTITY
+
+CENTS = Decimal('0.01')
+
+# Live stock of an Inventory row: slot total for sharded hot SKUs, plus
+# movements not yet compacted (ledger mode)
+LIVE_BALANCE = STOCK_QUANTITY + PENDING_DELTA
+
+# Value of an Inventory row annotated with its live balance
+STOCK_VALUE = ExpressionWrapper(
+    F('balance') * F('product__price'),
+    output_field=DecimalField(max_digits=16, decimal_places=2)
+)
+
+
+def adjust_store_stats(store_id, skus=0, units=0, value=0):
+    """
+    Apply deltas to a store's stats row inside the caller's transaction.
+
+    Only updates an existing row: a missing row is built from scratch the
+    first time it is read or by reconciliation, and a store being deleted
+    must not get a fresh row from its cascading inventory deletes.
+    """
+    if not (skus or units or value):
+        return
+    StoreStats.objects.filter(store_id=store_id).update(
+        total_skus=F('total_skus') + skus,
+        total_units=F('total_units') + units,
+        stock_value=F('stock_value') + Decimal(str(value)).quantize(CENTS),
+        updated_at=timezone.now()
+    )
+
+
+def adjust_store_stats_on_commit(store_id, skus=0, units=0, value=0):
+    """
+    Apply deltas to a store's stats row once the caller's transaction
+    commits, so writers that avoid locking Inventory rows (ledger and slot
+    modes) don't queue on the stats row instead. A refresh committing in
+    between counts the change twice until the next reconciliation.
+    """
+    alias = current_shard()
+
+    def apply():
+        with use_shard(alias):
+            adjust_store_stats(store_id, skus=skus, units=units, value=value)
+
+    transaction.on_commit(apply, using=alias, robust=True)
+
+
+def compute_store_stats(store_id):
+    """
+    Aggregate the true totals for one store from its live inventory
+    balances
+    """
+    totals = Inventory.objects.filter(store_id=store_id).annotate(
+        balance=LIVE_BALANCE
+    ).aggregate(
+        total_skus=Count('id'),
+        total_units=Sum('balance'),
+        stock_value=Sum(STOCK_VALUE)
+    )
+    return {
+        'total_skus': totals['total_skus'],
+        'total_units': totals['total_units'] or 0,
+        'stock_value': totals['stock_value'] or Decimal('0.00'),
+    }
+
+
+def refresh_store_stats(store_id):
+    """
+    Recompute one store's stats and report whether they had drifted.
+
+    The stats row is locked before aggregating, so an order that has
+    already adjusted it is committed first, and one that has not yet will
+    apply its delta on top of the fresh totals.
+    """
+    with transaction.atomic(using=current_shard()):
+        stats = StoreStats.objects.select_for_update().filter(store_id=store_id).first()
+        actual = compute_store_stats(store_id)
+
+        if stats is None:
+            stats = StoreStats.objects.create(store_id=store_id, **actual)
+            return stats, True
+
+        drifted = any(getattr(stats, field) != value for field, value in actual.items())
+        if drifted:
+            for field, value in actual.items():
+                setattr(stats, field, value)
+            stats.save()
+        return stats, drifted
+
+
+def reconcile_store_stats():
+    """
+    Correct drift for every store on the current shard; returns how many
+    rows were fixed
+    """
+    corrected = 0
+    for store_id in Store.objects.values_list('id', flat=True).iterator():
+        if shard_for_store(store_id) != current_shard():
+            continue
+        _, drifted = refresh_store_stats(store_id)
+        if drifted:
+            corrected += 1
+    return corrected
+
+
+def apply_price_change(product_id, old_price, new_price):
+    """
+    Shift stock_value for every store holding the product in one UPDATE:
+    each store's value moves by its quantity times the price difference.
+    """
+    delta = Decimal(str(new_price)) - Decimal(str(old_price))
+    if not delta:
+        return
+
+    quantity = Subquery(
+        Inventory.objects.filter(
+            store_id=OuterRef('store_id'),
+            product_id=product_id
+        ).values('quantity')[:1]
+    )
+
+    StoreStats.objects.filter(
+        store__inventory_items__product_id=product_id
+    ).update(
+        stock_value=F('stock_value') + ExpressionWrapper(
+            Coalesce(quantity, 0) * Value(delta),
+            output_field=DecimalField(max_digits=16, decimal_places=2)
+        ),
+        updated_at=timezone.now()
+    )
@@ -0,0 +1,86 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def prune_inventory_tombstones():
+    """
+    Periodic task to drop deletion tombstones past the retention window.
+    Change feed tokens older than the window get 410 and resync fully.
+    """
+    from apps.core.sharding import all_shards
+    from .models import InventoryTombstone
+    
+    cutoff = timezone.now() - timedelta(days=settings.INVENTORY_TOMBSTONE_RETENTION_DAYS)
+    deleted = 0
+    for alias in all_shards():
+        deleted += InventoryTombstone.objects.using(alias).filter(deleted_at__lt=cutoff).delete()[0]
+    
+    logger.info(f"Pruned {deleted} inventory tombstones older than {cutoff}")
+    return f"Pruned {deleted} inventory tombstones"
+
+
+@shared_task
+def reconcile_store_stats():
+    """
+    Periodic task to correct drift in StoreStats, e.g. from raw SQL or
+    queryset.update() writes that bypass the incremental adjustments.
+    """
+    from apps.core.sharding import for_each_shard
+    from .stats import reconcile_store_stats as reconcile
+    
+    corrected = sum(for_each_shard(reconcile))
+    
+    logger.info(f"Store stats reconciled, {corrected} stores corrected")
+    return f"Corrected stats for {corrected} stores"
+
+
+@shared_task
+def compact_inventory_movements():
+    """
+    Periodic task to fold ledger movements into Inventory.quantity.
+    A no-op unless INVENTORY_LEDGER_MODE has produced movements.
+    """
+    from apps.core.sharding import for_each_shard
+    from .ledger import compact_movements
+    
+    compacted = sum(for_each_shard(compact_movements))
+    
+    if compacted:
+        logger.info(f"Compacted {compacted} inventory movements")
+    return f"Compacted {compacted} inventory movements"
+
+
+@shared_task
+def promote_hot_sku(store_id, product_id):
+    """Split a contended (store, product) row into slot sub-counters"""
+    from apps.core.sharding import shard_for_store, use_shard
+    from .hot_skus import shard_inventory
+    
+    with use_shard(shard_for_store(store_id)):
+        promoted = shard_inventory(store_id, product_id)
+    if promoted:
+        logger.info(f"Sharded product {product_id} at store {store_id}")
+
+
+@shared_task
+def rebalance_hot_skus():
+    """
+    Periodic task to even out sharded SKUs' slots, sync their displayed
+    quantity, and fold back the ones that are no longer hot.
+    """
+    from apps.core.sharding import for_each_shard
+    from .hot_skus import rebalance_hot_skus as rebalance
+    
+    results = for_each_shard(rebalance)
+    rebalanced = sum(count for count, _ in results)
+    demoted = sum(count for _, count in results)
+    
+    if rebalanced or demoted:
+        logger.info(f"Rebalanced {rebalanced} hot SKUs, demoted {demoted}")
+    return f"Rebalanced {rebalanced} hot SKUs, demoted {demoted}"
@@ -1,11 +1,85 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Prefetch
-from .models import Store, Inventory
-from .serializers import StoreSerializer, InventorySerializer
+import codecs
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from django.db.models import Sum, Count, Max, Prefetch, Q, Case, When, Value, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Least
+from .models import Store, Inventory, InventorySlot, InventoryTombstone, StoreStats
+from .serializers import (
+    StoreSerializer,
+    StoreStatsSerializer,
+    FulfillableBasketSerializer,
+    INVENTORY_ROW_LOOKUPS,
+    map_inventory_row
+)
+from .bulk import BULK_FORMATS, PARSERS, BulkInventoryError, bulk_upsert_inventory
+from .low_stock import (
+    low_stock_inventory,
+    effective_threshold,
+    global_low_stock_threshold,
+    store_low_stock_threshold
+)
+from .stats import refresh_store_stats
+from .hot_skus import STOCK_QUANTITY
+from .pagination import InventoryKeysetPagination, ChangeFeedToken, InvalidCursor
+from .exports import (
+    EXPORT_FORMATS,
+    INVENTORY_EXPORT_HEADER,
+    inventory_export_rows,
+    streaming_export_response
+)
+from apps.core.cache import cached_action, current_generations
+from apps.core.conditional import conditional_action, make_etag
+from apps.core.sharding import by_store, fan_out, merge_sorted
 from apps.orders.models import Order
 from apps.orders.serializers import OrderListSerializer
+from apps.orders.exports import ORDER_EXPORT_HEADER, order_export_rows
+
+
+def inventory_validators(view, request, pk=None):
+    """
+    ETag and Last-Modified for a store's inventory listing from one
+    aggregate over the (store, updated_at, id) index: row count, newest
+    change and newest deletion. Product names and prices come from the
+    products generation, and sharded hot SKUs' stock (whose orders don't
+    touch the Inventory row) from the store's slot total, so they move the
+    ETag only.
+    """
+    try:
+        store = Store.objects.filter(pk=pk).annotate(
+            inventory_count=Count('inventory_items'),
+            last_updated=Max('inventory_items__updated_at'),
+            last_deleted=Subquery(
+                InventoryTombstone.objects.filter(
+                    store_id=OuterRef('pk')
+                ).order_by('-deleted_at').values('deleted_at')[:1]
+            ),
+            slot_units=Subquery(
+                InventorySlot.objects.filter(
+                    store_id=OuterRef('pk')
+                ).values('store_id').annotate(total=Sum('quantity')).values('total')
+            )
+        ).values('inventory_count', 'last_updated', 'last_deleted', 'slot_units').first()
+    except (TypeError, ValueError):
+        return None
+    if store is None:
+        # Let the view answer 404
+        return None
+    
+    changes = [moment for moment in (store['last_updated'], store['last_deleted']) if moment is not None]
+    etag = make_etag(
+        request,
+        store['inventory_count'],
+        store['last_updated'],
+        store['last_deleted'],
+        store['slot_units'],
+        *current_generations(['products'])
+    )
+    return etag, max(changes, default=None)
 
 
 class StoreViewSet(viewsets.ReadOnlyModelViewSet):
@@ -15,32 +89,402 @@ class StoreViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Store.objects.all()
     serializer_class = StoreSerializer
     
+    @cached_action('stores')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_action('stores')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['post'], url_path='fulfillable')
+    def fulfillable(self, request):
+        """
+        POST /stores/fulfillable/
+        
+        Returns the stores that can fill the whole basket, ranked by coverage.
+        With allow_partial=true, stores covering only some lines are included
+        with their coverage counts.
+        
+        Runs as a single grouped Inventory query instead of one inventory
+        walk per store (one per shard, merged, with store sharding).
+        """
+        serializer = FulfillableBasketSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # Merge duplicate lines so each product is checked once
+        basket = {}
+        for item in serializer.validated_data['items']:
+            product_id = item['product_id']
+            basket[product_id] = basket.get(product_id, 0) + item['quantity_requested']
+        
+        allow_partial = serializer.validated_data['allow_partial']
+        limit = serializer.validated_data['limit']
+        total_items = len(basket)
+        
+        # A line is covered when the store holds the full requested quantity
+        covers_line = Q()
+        for product_id, quantity in basket.items():
+            covers_line |= Q(product_id=product_id, stock__gte=quantity)
+        
+        # Units the store could ship for each line, capped at the requested quantity
+        units_available = Case(
+            *[
+                When(product_id=product_id, then=Least('stock', Value(quantity)))
+                for product_id, quantity in basket.items()
+            ],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+        
+        stores = Inventory.objects.annotate(
+            stock=STOCK_QUANTITY
+        ).filter(
+            product_id__in=basket.keys(),
+            stock__gt=0
+        ).values(
+            'store_id', 'store__name', 'store__location'
+        ).annotate(
+            covered_items=Count('id', filter=covers_line),
+            covered_units=Sum(units_available)
+        )
+        
+        if allow_partial:
+            stores = stores.filter(covered_items__gt=0)
+        else:
+            stores = stores.filter(covered_items=total_items)
+        
+        # Each shard ranks its own stores; the best `limit` of all are kept
+        stores = merge_sorted(
+            fan_out(stores.order_by('-covered_items', '-covered_units', 'store__name')[:limit]),
+            key=lambda row: (-row['covered_items'], -row['covered_units'], row['store__name']),
+            limit=limit
+        )
+        
+        results = [
+            {
+                'store_id': row['store_id'],
+                'store_name': row['store__name'],
+                'store_location': row['store__location'],
+                'covered_items': row['covered_items'],
+                'missing_items': total_items - row['covered_items'],
+                'covered_units': row['covered_units'],
+                'fully_fulfillable': row['covered_items'] == total_items,
+            }
+            for row in stores
+        ]
+        
+        return Response({
+            'total_items': total_items,
+            'total_units': sum(basket.values()),
+            'results': results
+        })
+    
+    @action(detail=False, methods=['get'], url_path='low-stock')
+    def low_stock_report(self, request):
+        """
+        GET /stores/low-stock/
+        
+        Cross-store low-stock report: for each store with low stock, how
+        many items are below its threshold and how many are out of stock.
+        Reads only the partial low-stock index, so it is cheap to poll.
+        """
+        rows = low_stock_inventory().values(
+            'store_id', 'store__name', 'store__low_stock_threshold'
+        ).annotate(
+            low_stock_items=Count('id'),
+            out_of_stock_items=Count('id', filter=Q(stock__lte=0))
+        ).order_by('-low_stock_items', 'store_id')
+        rows = merge_sorted(fan_out(rows), key=lambda row: (-row['low_stock_items'], row['store_id']))
+        
+        return Response({
+            'default_threshold': global_low_stock_threshold(),
+            'stores': [
+                {
+                    'store_id': row['store_id'],
+                    'store_name': row['store__name'],
+                    'threshold': effective_threshold(row['store__low_stock_threshold']),
+                    'low_stock_items': row['low_stock_items'],
+                    'out_of_stock_items': row['out_of_stock_items'],
+                }
+                for row in rows
+            ]
+        })
+    
+    @action(detail=True, methods=['get'], url_path='low-stock')
+    @by_store
+    def low_stock(self, request, pk=None):
+        """
+        GET /stores/<store_id>/low-stock/
+        
+        Returns the store's inventory items below its low-stock threshold,
+        lowest quantity first. Served by the partial low-stock index.
+        """
+        store = self.get_object()
+        
+        inventory_rows = low_stock_inventory(store).order_by(
+            'stock', 'id'
+        ).values_list(*INVENTORY_ROW_LOOKUPS)
+        
+        threshold = store_low_stock_threshold(store)
+        
+        page = self.paginate_queryset(inventory_rows)
+        if page is not None:
+            response = self.get_paginated_response([map_inventory_row(row) for row in page])
+            response.data['threshold'] = threshold
+            return response
+        
+        return Response({
+            'threshold': threshold,
+            'results': [map_inventory_row(row) for row in inventory_rows]
+        })
+    
     @action(detail=True, methods=['get'], url_path='inventory')
+    @by_store
+    @conditional_action(inventory_validators)
     def inventory(self, request, pk=None):
         """
         GET /stores/<store_id>/inventory/
         
         Returns inventory items for the store, sorted alphabetically by product title.
-        Efficient query using select_related to avoid N+1 issues.
+        Rows are fetched with values_list() and mapped by a precompiled row
+        mapper, skipping model instances and DRF field machinery. Output is
+        identical to InventorySerializer.
+        
+        Pass ?cursor= (empty for the first page) to switch to keyset
+        pagination: each page seeks on (product_title, id) through the
+        (store, product_title, id) index instead of using OFFSET, and the
+        response carries next_cursor instead of page counts.
+        
+        Responses carry ETag and Last-Modified; a matching If-None-Match
+        or If-Modified-Since gets 304 without the rows being read.
         """
         store = self.get_object()
         
-        inventory_items = Inventory.objects.filter(
+        # product_title rides along at the end for the cursor; the row
+        # mapper ignores it
+        inventory_rows = Inventory.objects.filter(
             store=store
-        ).select_related(
-            'product', 'product__category'
-        ).order_by('product__title')
+        ).annotate(
+            stock=STOCK_QUANTITY
+        ).order_by('product_title', 'id').values_list(*INVENTORY_ROW_LOOKUPS, 'product_title')
+        
+        if InventoryKeysetPagination.cursor_query_param in request.query_params:
+            paginator = InventoryKeysetPagination()
+            try:
+                rows, next_cursor = paginator.paginate_queryset(
+                    inventory_rows,
+                    request,
+                    cursor_key=lambda row: (row[-1], row[0])
+                )
+            except InvalidCursor:
+                return Response(
+                    {'error': 'Invalid cursor.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response({
+                'next_cursor': next_cursor,
+                'page_size': paginator.get_page_size(request),
+                'results': [map_inventory_row(row) for row in rows]
+            })
         
         # Paginate results
-        page = self.paginate_queryset(inventory_items)
+        page = self.paginate_queryset(inventory_rows)
         if page is not None:
-            serializer = InventorySerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response([map_inventory_row(row) for row in page])
         
-        serializer = InventorySerializer(inventory_items, many=True)
-        return Response(serializer.data)
+        return Response([map_inventory_row(row) for row in inventory_rows])
+    
+    @action(detail=True, methods=['post'], url_path='inventory/bulk')
+    @by_store
+    def inventory_bulk(self, request, pk=None):
+        """
+        POST /stores/<store_id>/inventory/bulk/
+        
+        Sets stock levels for many products at once from a CSV
+        (Content-Type: text/csv, header product_id,quantity) or NDJSON
+        (Content-Type: application/x-ndjson) body.
+        
+        On PostgreSQL the body is streamed into a temp table with COPY and
+        applied with a single INSERT ... ON CONFLICT (store, product) DO UPDATE.
+        Returns counts of inserted, updated and unchanged rows.
+        """
+        store = self.get_object()
+        
+        fmt = BULK_FORMATS.get(request.content_type.split(';')[0].strip())
+        if fmt is None:
+            return Response(
+                {'error': 'Send text/csv or application/x-ndjson.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        
+        # Decode the body line by line as it is read; request.data is never touched
+        lines = codecs.iterdecode(request.stream or [], 'utf-8')
+        
+        try:
+            result = bulk_upsert_inventory(store.id, PARSERS[fmt](lines))
+        except BulkInventoryError as e:
+            return Response(
+                {'error': e.message, 'line': e.line},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except UnicodeDecodeError:
+            return Response(
+                {'error': 'Body must be UTF-8 encoded.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(result)
+    
+    @action(detail=True, methods=['get'], url_path='inventory/changes')
+    @by_store
+    def inventory_changes(self, request, pk=None):
+        """
+        GET /stores/<store_id>/inventory/changes/?since=<token>
+        
+        Returns inventory rows modified since the token, plus the IDs of
+        rows deleted since then, and a next_token for the following call.
+        Omit since to start from the beginning (a full initial sync).
+        
+        Rows are read in (updated_at, id) order through the
+        (store, updated_at, id) index. Delivery is at-least-once: a row or
+        deletion may be repeated across calls. Rows are not skipped as long
+        as their transaction commits within INVENTORY_CHANGES_LAG_SECONDS
+        of stamping updated_at; one that takes longer (a large bulk feed)
+        can land behind a token already handed out, and the client only
+        sees it on its next full sync.
+        """
+        store = self.get_object()
+        
+        try:
+            page_size = int(request.query_params.get('page_size', 500))
+        except ValueError:
+            page_size = 500
+        page_size = max(1, min(page_size, 5000))
+        
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since_ts, since_id = ChangeFeedToken.decode(since)
+            except InvalidCursor:
+                return Response(
+                    {'error': 'Invalid since token.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            retention = timedelta(days=settings.INVENTORY_TOMBSTONE_RETENTION_DAYS)
+            if since_ts < timezone.now() - retention:
+                return Response(
+                    {'error': 'Token is older than the deletion history. Run a full sync.'},
+                    status=status.HTTP_410_GONE
+                )
+        else:
+            since_ts, since_id = None, 0
+        
+        # Hold back the newest rows; see INVENTORY_CHANGES_LAG_SECONDS
+        upper = timezone.now() - timedelta(seconds=settings.INVENTORY_CHANGES_LAG_SECONDS)
+        
+        changed = Inventory.objects.filter(
+            store=store,
+            updated_at__lt=upper
+        ).annotate(stock=STOCK_QUANTITY)
+        if since_ts is not None:
+            changed = changed.filter(
+                updated_at__gte=since_ts
+            ).exclude(
+                Q(updated_at=since_ts) & Q(id__lte=since_id)
+            )
+        
+        rows = list(
+            changed.order_by('updated_at', 'id').values_list(
+                *INVENTORY_ROW_LOOKUPS, 'updated_at'
+            )[:page_size + 1]
+        )
+        
+        has_more = len(rows) > page_size
+        if has_more:
+            rows = rows[:page_size]
+            window_end = rows[-1][-1]
+            next_token = ChangeFeedToken.encode(window_end, rows[-1][0])
+        else:
+            window_end = upper
+            next_token = ChangeFeedToken.encode(upper, 0)
+        
+        # An initial sync has nothing to delete on the client side
+        deleted = []
+        if since_ts is not None:
+            deleted = list(
+                InventoryTombstone.objects.filter(
+                    store_id=store.id,
+                    deleted_at__gte=since_ts,
+                    deleted_at__lt=window_end
+                ).order_by('deleted_at', 'id').values('inventory_id', 'product_id', 'deleted_at')
+            )
+        
+        return Response({
+            'changes': [map_inventory_row(row) for row in rows],
+            'deleted': [
+                {
+                    'id': row['inventory_id'],
+                    'product_id': row['product_id'],
+                    'deleted_at': row['deleted_at']
+                }
+                for row in deleted
+            ],
+            'next_token': next_token,
+            'has_more': has_more
+        })
+    
+    @action(detail=True, methods=['get'], url_path='inventory/export')
+    @by_store
+    def inventory_export(self, request, pk=None):
+        """
+        GET /stores/<store_id>/inventory/export/?fmt=csv|ndjson
+        
+        Streams the store's entire inventory in one response. Rows are read
+        through a server-side cursor and written as they arrive, so memory
+        use is constant and there is no COUNT(*) or page walk.
+        """
+        store = self.get_object()
+        
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported export format: {fmt}. Use csv or ndjson.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return streaming_export_response(
+            fmt,
+            INVENTORY_EXPORT_HEADER,
+            inventory_export_rows(store.id),
+            filename=f'store-{store.id}-inventory'
+        )
+    
+    @action(detail=True, methods=['get'], url_path='stats')
+    @by_store
+    def stats(self, request, pk=None):
+        """
+        GET /stores/<store_id>/stats/
+        
+        Returns total SKUs, total units and stock value for the store.
+        Served from the incrementally maintained StoreStats row (a primary
+        key lookup); the row is built on first access.
+        """
+        store = self.get_object()
+        
+        stats = StoreStats.objects.filter(store_id=store.id).first()
+        if stats is None:
+            try:
+                stats, _ = refresh_store_stats(store.id)
+            except IntegrityError:
+                # A concurrent first request created the row
+                stats = StoreStats.objects.get(store_id=store.id)
+        
+        return Response(StoreStatsSerializer(stats).data)
     
     @action(detail=True, methods=['get'], url_path='orders')
+    @by_store
     def orders(self, request, pk=None):
         """
         GET /stores/<store_id>/orders/
@@ -65,4 +509,29 @@ class StoreViewSet(viewsets.ReadOnlyModelViewSet):
             return self.get_paginated_response(serializer.data)
         
         serializer = OrderListSerializer(orders, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], url_path='orders/export')
+    @by_store
+    def orders_export(self, request, pk=None):
+        """
+        GET /stores/<store_id>/orders/export/?fmt=csv|ndjson
+        
+        Streams the store's full order history, one row per order line,
+        through a server-side cursor.
+        """
+        store = self.get_object()
+        
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported export format: {fmt}. Use csv or ndjson.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return streaming_export_response(
+            fmt,
+            ORDER_EXPORT_HEADER,
+            order_export_rows(store.id),
+            filename=f'store-{store.id}-orders'
+        )
@@ -1,106 +1,360 @@
-import requests
+"""
+Concurrent load and contention generator for the order, search and
+suggest APIs.
+
+Discovers stores, stocked products and search terms through the API once,
+then drives a weighted traffic mix from a thread pool, either as fast as
+the workers go (closed loop) or at a fixed arrival rate (open loop, with
+latency measured from each request's scheduled start so queueing is not
+hidden). Products are picked with a Zipf skew so a few hot SKUs per store
+take most orders, like a flash sale.
+
+    python create_bulk_orders.py --concurrency 32 --duration 60 --zipf 1.2
+    python create_bulk_orders.py --rate 200 --mix order=60,search=30,suggest=10
+"""
+import argparse
+import bisect
+import json
+import math
 import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-# Configuration
-BASE_URL = "http://localhost:8000/api"
-NUM_ORDERS = 50  # increase load
+import requests
 
-TOTAL_STORES = 25  # we KNOW this
-TOTAL_PRODUCTS = 1200  # informational
-TOTAL_INVENTORY = 7000  # informational
+SEARCH_SORTS = ['relevance', 'price_asc', 'price_desc', 'newest']
 
+_local = threading.local()
 
-def get_store_inventory(store_id):
-    url = f"{BASE_URL}/stores/{store_id}/inventory/"
-    print(f"Calling: {url}")
-    response = requests.get(url)
-    print("Status:", response.status_code)
-    print("Response:", response.text)
-    response.raise_for_status()
-    data = response.json()
-    return data["results"]
 
+def session():
+    """One keep-alive session per worker thread"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
 
 
-def create_order(store_id, items):
-    """Create an order"""
-    response = requests.post(
-        f"{BASE_URL}/orders/",
-        json={
-            "store_id": store_id,
-            "items": items
-        }
-    )
-    return response
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in ('order', 'search', 'suggest'):
+            raise argparse.ArgumentTypeError(f'unknown traffic kind: {kind}')
+        mix[kind] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('the mix needs a positive weight')
+    return mix
 
 
-def main():
-    print(f"📦 Creating {NUM_ORDERS} random orders...")
-    print(f"🏬 Total Stores: {TOTAL_STORES}")
-    print(f"🛒 Total Products: {TOTAL_PRODUCTS}")
-    print(f"📊 Total Inventory Records: {TOTAL_INVENTORY}\n")
+class ZipfPicker:
+    """Picks items with probability proportional to 1 / rank ** exponent"""
 
-    successful = 0
-    failed = 0
+    def __init__(self, items, exponent):
+        self.items = items
+        total = 0.0
+        self.cumulative = []
+        for rank in range(1, len(items) + 1):
+            total += 1 / rank ** exponent
+            self.cumulative.append(total)
 
-    for i in range(NUM_ORDERS):
+    def pick(self, rng):
+        position = bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1])
+        return self.items[min(position, len(self.items) - 1)]
 
-        # 🔥 Pick random store using known ID range
-        store_id = random.randint(1, TOTAL_STORES)
 
-        # Get inventory for this store
-        inventory_data = get_store_inventory(store_id)
+def get_all_pages(base_url, path, params, max_pages, timeout):
+    """
+    Results of a paginated endpoint: page-number responses are followed
+    through next, cursor responses by resending params with next_cursor
+    """
+    results = []
+    url = f'{base_url}{path}'
+    for _ in range(max_pages):
+        response = session().get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        results.extend(data['results'])
+        if 'next_cursor' in data:
+            if data['next_cursor'] is None:
+                break
+            params = dict(params, cursor=data['next_cursor'])
+        else:
+            url, params = data.get('next'), None
+            if not url:
+                break
+    return results
 
-        # Filter products with stock > 5
-        in_stock_products = [
-            item for item in inventory_data
-            if item["quantity"] > 5
-        ]
 
-        if len(in_stock_products) < 2:
-            print(f"⚠️ Store {store_id} doesn't have enough stock, skipping")
-            continue
+def discover(args):
+    """Stores with their in-stock products, and search terms, fetched once"""
+    stores = get_all_pages(args.base_url, '/stores/', {}, args.discover_pages, args.timeout)
+    stores = stores[:args.max_stores] if args.max_stores else stores
 
-        # Pick 2-4 random products
-        num_items = random.randint(2, 4)
-        selected = random.sample(
-            in_stock_products,
-            min(num_items, len(in_stock_products))
+    def store_stock(store):
+        rows = get_all_pages(
+            args.base_url,
+            f"/stores/{store['id']}/inventory/",
+            {'cursor': '', 'page_size': 100},
+            args.discover_pages,
+            args.timeout
         )
+        return store['id'], rows
 
-        items = []
+    catalog = {}
+    words = set()
+    with ThreadPoolExecutor(max_workers=min(args.concurrency, 16)) as pool:
+        for store_id, rows in pool.map(store_stock, stores):
+            in_stock = [row['product_id'] for row in rows if row['quantity'] > 0]
+            if in_stock:
+                catalog[store_id] = in_stock
+            for row in rows:
+                words.update(word.lower() for word in row['product_title'].split() if len(word) >= 4 and word.isalpha())
+    return catalog, sorted(words)
 
-        for product in selected:
-            max_safe_qty = max(1, product["quantity"] // 2)
-            qty = random.randint(1, min(5, max_safe_qty))
 
-            product_id = product.get("product_id") or product.get("id")
+class Workload:
+    """Builds requests from the discovered data; one instance per run"""
 
-            items.append({
-                "product_id": product_id,
-                "quantity_requested": qty
-            })
+    def __init__(self, args, catalog, words):
+        self.args = args
+        rng = random.Random(args.seed)
+        store_ids = sorted(catalog)
+        rng.shuffle(store_ids)
+        self.stores = ZipfPicker(store_ids, args.store_zipf)
+        # Each store gets its own fixed popularity order
+        self.products = {}
+        for store_id in store_ids:
+            ranked = list(catalog[store_id])
+            rng.shuffle(ranked)
+            self.products[store_id] = ZipfPicker(ranked, args.zipf)
+        self.words = words or ['product']
+        self.kinds = list(args.mix)
+        self.weights = [args.mix[kind] for kind in self.kinds]
 
-        # Create order
-        response = create_order(store_id, items)
+    def next_request(self, rng):
+        kind = rng.choices(self.kinds, self.weights)[0]
+        base_url = self.args.base_url
+        if kind == 'order':
+            store_id = self.stores.pick(rng)
+            picker = self.products[store_id]
+            count = rng.randint(self.args.min_items, self.args.max_items)
+            product_ids = []
+            # Distinct lines; hot SKUs still dominate because of the skew
+            for _ in range(count * 4):
+                product_id = picker.pick(rng)
+                if product_id not in product_ids:
+                    product_ids.append(product_id)
+                if len(product_ids) == count or len(product_ids) == len(picker.items):
+                    break
+            body = {
+                'store_id': store_id,
+                'fulfillment': self.args.fulfillment,
+                'items': [
+                    {'product_id': product_id, 'quantity_requested': rng.randint(1, self.args.max_quantity)}
+                    for product_id in product_ids
+                ],
+            }
+            return kind, 'post', f'{base_url}/orders/', {'json': body}
+        if kind == 'search':
+            params = {'q': rng.choice(self.words), 'sort': rng.choice(SEARCH_SORTS)}
+            return kind, 'get', f'{base_url}/search/products/', {'params': params}
+        params = {'q': rng.choice(self.words)[:rng.randint(3, 5)]}
+        return kind, 'get', f'{base_url}/search/suggest/', {'params': params}
 
-        if response.status_code == 201:
-            order_data = response.json()
-            print(
-                f"✅ Order #{order_data['id']} | "
-                f"Store {store_id} | "
-                f"{len(items)} items | "
-                f"{order_data['status']}"
-            )
-            successful += 1
-        else:
-            print(f"❌ Failed (Store {store_id}): {response.status_code}")
-            failed += 1
 
-    print("\n🎯 FINAL SUMMARY")
-    print(f"✅ Successful: {successful}")
-    print(f"❌ Failed: {failed}")
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, kind, latency, outcome, error=None):
+        with self.lock:
+            self.latencies[kind].append(latency)
+            self.outcomes[kind][outcome] += 1
+            if error:
+                self.errors[f'{kind}: {error}'] += 1
+
+
+def send(workload, results, rng_seed, scheduled=None):
+    rng = random.Random(rng_seed)
+    kind, method, url, options = workload.next_request(rng)
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        response = session().request(method, url, timeout=workload.args.timeout, **options)
+    except requests.RequestException as e:
+        results.record(kind, time.perf_counter() - started, 'error', type(e).__name__)
+        return
+    latency = time.perf_counter() - started
+
+    status = response.status_code
+    if kind == 'order' and status == 201:
+        outcome = response.json().get('status', 'CREATED')
+    elif kind == 'order' and status == 202:
+        outcome = 'ACCEPTED'
+    elif status < 400:
+        outcome = 'ok'
+    else:
+        outcome = f'http {status}'
+    error = f'HTTP {status}' if status >= 400 else None
+    results.record(kind, latency, outcome, error)
+
+
+def run_closed_loop(args, workload, results):
+    """Every worker sends its next request as soon as the last one returns"""
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    counter = iter(range(args.requests or sys.maxsize))
+    counter_lock = threading.Lock()
+
+    def worker(number):
+        rng = random.Random(f'{args.seed}-{number}')
+        while deadline is None or time.perf_counter() < deadline:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            send(workload, results, rng.random())
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+
+
+def run_open_loop(args, workload, results):
+    """
+    Poisson arrivals at --rate per second regardless of how fast the
+    server answers; workers pick them up as they free.
+    """
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    deadline = started + args.duration if args.duration else None
+    scheduled = started
+    sent = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        while (deadline is None or scheduled < deadline) and (not args.requests or sent < args.requests):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, workload, results, rng.random(), scheduled)
+            sent += 1
+            scheduled += rng.expovariate(args.rate)
+
+
+def percentile(sorted_values, percent):
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(results, elapsed):
+    summary = {'elapsed_seconds': round(elapsed, 3), 'kinds': {}, 'errors': dict(results.errors.most_common())}
+    total = 0
+    for kind, latencies in sorted(results.latencies.items()):
+        latencies = sorted(latencies)
+        total += len(latencies)
+        outcomes = results.outcomes[kind]
+        entry = {
+            'requests': len(latencies),
+            'throughput_per_second': round(len(latencies) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'outcomes': dict(outcomes.most_common()),
+        }
+        if kind == 'order':
+            entry['rejection_rate'] = round(outcomes['REJECTED'] / len(latencies), 4)
+            entry['partial_rate'] = round(outcomes['PARTIAL'] / len(latencies), 4)
+        summary['kinds'][kind] = entry
+    summary['requests'] = total
+    summary['throughput_per_second'] = round(total / elapsed, 2) if elapsed else 0
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n🎯 {summary['requests']} requests in {summary['elapsed_seconds']}s "
+          f"({summary['throughput_per_second']} req/s)")
+    print(f"{'kind':<10}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for kind, entry in summary['kinds'].items():
+        print(
+            f"{kind:<10}{entry['requests']:>8}{entry['throughput_per_second']:>9}"
+            f"{entry['p50_ms']:>9}{entry['p95_ms']:>9}{entry['p99_ms']:>9}{entry['max_ms']:>9}"
+        )
+    for kind, entry in summary['kinds'].items():
+        outcomes = ', '.join(f'{outcome}={count}' for outcome, count in entry['outcomes'].items())
+        print(f"{kind} outcomes: {outcomes}")
+        if kind == 'order':
+            print(f"order rejection rate: {entry['rejection_rate']:.2%}, partial: {entry['partial_rate']:.2%}")
+    if summary['errors']:
+        print("❌ Errors:")
+        for error, count in summary['errors'].items():
+            print(f"  {error}: {count}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000/api')
+    parser.add_argument('--concurrency', type=int, default=16, help='Worker threads')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (0 = until --requests)')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Open loop: arrivals per second (0 = closed loop, as fast as workers go)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('order=70,search=20,suggest=10'),
+                        help='Traffic weights, e.g. order=70,search=20,suggest=10')
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help='Product skew exponent within a store (0 = uniform)')
+    parser.add_argument('--store-zipf', type=float, default=0.0,
+                        help='Store skew exponent (0 = uniform)')
+    parser.add_argument('--min-items', type=int, default=1)
+    parser.add_argument('--max-items', type=int, default=4)
+    parser.add_argument('--max-quantity', type=int, default=3)
+    parser.add_argument('--fulfillment', choices=['all', 'partial'], default='all')
+    parser.add_argument('--max-stores', type=int, default=0, help='Only use the first N stores (0 = all)')
+    parser.add_argument('--discover-pages', type=int, default=20,
+                        help='Most pages fetched per listing during discovery')
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', help='Also write the summary to this file')
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error('set --duration or --requests')
+    if args.min_items < 1 or args.max_items < args.min_items:
+        parser.error('need 1 <= --min-items <= --max-items')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    base = args.base_url.rstrip('/')
+    args.base_url = base
+
+    print(f"🔎 Discovering stores and stock at {base}...")
+    catalog, words = discover(args)
+    if 'order' in args.mix and not catalog:
+        print("⚠️ No store has stock; run seed_data first")
+        return 1
+    print(f"🏬 {len(catalog)} stores, {sum(map(len, catalog.values()))} stocked SKUs, {len(words)} search terms")
+
+    workload = Workload(args, catalog, words)
+    results = Results()
+    mode = f'open loop at {args.rate}/s' if args.rate else 'closed loop'
+    print(f"📦 {mode}, {args.concurrency} workers, mix {args.mix}, zipf {args.zipf}")
+
+    started = time.perf_counter()
+    if args.rate:
+        run_open_loop(args, workload, results)
+    else:
+        run_closed_loop(args, workload, results)
+    summary = summarize(results, time.perf_counter() - started)
+
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, 'w') as output:
+            json.dump(summary, output, indent=2)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -20,6 +20,38 @@ app.conf.beat_schedule = {
         'task': 'apps.orders.tasks.generate_inventory_summary',
         'schedule': crontab(hour=0, minute=0),  # Daily at midnight
     },
+    'prune-inventory-tombstones': {
+        'task': 'apps.stores.tasks.prune_inventory_tombstones',
+        'schedule': crontab(hour=1, minute=0),  # Daily at 01:00
+    },
+    'reconcile-store-stats': {
+        'task': 'apps.stores.tasks.reconcile_store_stats',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
+    'compact-inventory-movements': {
+        'task': 'apps.stores.tasks.compact_inventory_movements',
+        'schedule': 60.0,  # Every minute
+    },
+    'rebalance-hot-skus': {
+        'task': 'apps.stores.tasks.rebalance_hot_skus',
+        'schedule': 60.0,  # Every minute
+    },
+    'flush-redis-stock-orders': {
+        'task': 'apps.orders.tasks.flush_redis_stock_orders',
+        'schedule': 2.0,  # Every 2 seconds
+    },
+    'release-expired-reservations': {
+        'task': 'apps.orders.tasks.release_expired_reservations',
+        'schedule': 30.0,  # Every 30 seconds
+    },
+    'relay-order-events': {
+        'task': 'apps.orders.tasks.relay_order_events',
+        'schedule': 5.0,  # Every 5 seconds
+    },
+    'prune-order-events': {
+        'task': 'apps.orders.tasks.prune_order_events',
+        'schedule': crontab(hour=2, minute=0),  # Daily at 02:00
+    },
 }
 
 @app.task(bind=True)
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
-from decouple import config
+import tempfile
+from decouple import config, Csv
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,9 +37,11 @@ INSTALLED_APPS = [
     'apps.stores',
     'apps.orders',
     'apps.search',
+    'apps.monitoring',
 ]
 
 MIDDLEWARE = [
+    'apps.monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -47,7 +50,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'apps.monitoring.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'project.urls'
@@ -82,6 +87,45 @@ DATABASES = {
     }
 }
 
+# Read replicas
+# Every host in DATABASE_REPLICA_HOSTS becomes an alias (replica_1, ...)
+# with the primary's name and credentials. Safe requests to REPLICA_VIEWS
+# (view labels as in /metrics) read from a random replica; writes,
+# select_for_update() and transactions stay on the primary. After a
+# successful write a client reads from the primary for
+# REPLICA_STICKY_SECONDS (tracked in the REPLICA_STICKY_COOKIE cookie).
+# Responses cached by cached_action are always computed on the primary,
+# so listing those views here has no effect while the cache is enabled.
+DATABASE_REPLICA_HOSTS = config('DATABASE_REPLICA_HOSTS', default='', cast=Csv())
+DATABASE_REPLICAS = []
+for number, host in enumerate(DATABASE_REPLICA_HOSTS, 1):
+    DATABASES[f'replica_{number}'] = dict(DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica_{number}')
+REPLICA_VIEWS = config(
+    'REPLICA_VIEWS',
+    default=(
+        'product-search,autocomplete-suggest,stores.inventory'
+    ),
+    cast=Csv()
+)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+REPLICA_STICKY_COOKIE = config('REPLICA_STICKY_COOKIE', default='primary_until')
+
+# Store sharding
+# Every entry of DATABASE_SHARD_HOSTS ("host" or "host/name", so several
+# databases on one local server work too) becomes an alias (shard_1, ...)
+# with the primary's credentials. Inventory and orders of store N live on
+# DATABASE_SHARDS[N % len(DATABASE_SHARDS)]; categories, products and
+# stores are written to the default database and copied to every shard.
+# Run `manage.py sync_shards` after adding shards or loading data.
+DATABASE_SHARD_HOSTS = config('DATABASE_SHARD_HOSTS', default='', cast=Csv())
+DATABASE_SHARDS = []
+for number, entry in enumerate(DATABASE_SHARD_HOSTS, 1):
+    host, _, name = entry.partition('/')
+    DATABASES[f'shard_{number}'] = dict(DATABASES['default'], HOST=host, NAME=name or DATABASES['default']['NAME'])
+    DATABASE_SHARDS.append(f'shard_{number}')
+DATABASE_ROUTERS = ['apps.core.sharding.ShardRouter', 'apps.core.routers.ReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -124,6 +168,8 @@ CORS_ALLOW_ALL_ORIGINS = True
 REDIS_HOST = config('REDIS_HOST', default='localhost')
 REDIS_PORT = config('REDIS_PORT', default='6379')
 REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}'
+# Rate limiting and async order confirmations need a reachable Redis
+USE_REDIS = config('USE_REDIS', default=False, cast=bool)
 
 # Cache Configuration
 CACHES = {
@@ -150,4 +196,123 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 
 # Rate Limiting Configuration
 RATE_LIMIT_AUTOCOMPLETE = 20  # requests per minute
-RATE_LIMIT_WINDOW = 60  # seconds
\ No newline at end of file
+RATE_LIMIT_WINDOW = 60  # seconds
+
+# Inventory change feed
+# Rows newer than this lag are held back so transactions still in flight
+# with earlier timestamps cannot be skipped by a client's token. Writes
+# committing later than this after stamping updated_at can still be missed
+INVENTORY_CHANGES_LAG_SECONDS = config('INVENTORY_CHANGES_LAG_SECONDS', default=2, cast=int)
+# Deletion tombstones are kept this long; older tokens must do a full resync
+INVENTORY_TOMBSTONE_RETENTION_DAYS = config('INVENTORY_TOMBSTONE_RETENTION_DAYS', default=7, cast=int)
+
+# Low stock
+# Inventory below this quantity counts as low stock unless the store sets
+# its own threshold. Capped at apps.stores.models.LOW_STOCK_INDEX_CEILING.
+LOW_STOCK_THRESHOLD = config('LOW_STOCK_THRESHOLD', default=10, cast=int)
+
+# Cart reservations
+RESERVATION_TTL_SECONDS = config('RESERVATION_TTL_SECONDS', default=600, cast=int)  # 10 minutes
+RESERVATION_SWEEP_BATCH_SIZE = config('RESERVATION_SWEEP_BATCH_SIZE', default=500, cast=int)
+
+# Inventory ledger
+# When enabled, orders append InventoryMovement rows instead of rewriting
+# the Inventory row; a periodic task folds them into Inventory.quantity
+INVENTORY_LEDGER_MODE = config('INVENTORY_LEDGER_MODE', default=False, cast=bool)
+INVENTORY_COMPACTION_BATCH_SIZE = config('INVENTORY_COMPACTION_BATCH_SIZE', default=5000, cast=int)
+
+# Hot SKU sharding
+# When enabled, (store, product) rows whose accumulated lock wait in
+# OrderViewSet.create passes HOT_SKU_PROMOTE_WAIT_MS within a window are
+# split into HOT_SKU_SLOTS sub-counters; sharded rows taking fewer than
+# HOT_SKU_DEMOTE_ORDERS orders per window are folded back. Ignored in
+# ledger mode.
+HOT_SKU_SHARDING = config('HOT_SKU_SHARDING', default=False, cast=bool)
+HOT_SKU_SLOTS = config('HOT_SKU_SLOTS', default=8, cast=int)
+HOT_SKU_WINDOW_SECONDS = config('HOT_SKU_WINDOW_SECONDS', default=60, cast=int)
+HOT_SKU_WAIT_SAMPLE_MS = config('HOT_SKU_WAIT_SAMPLE_MS', default=5, cast=int)
+HOT_SKU_PROMOTE_WAIT_MS = config('HOT_SKU_PROMOTE_WAIT_MS', default=500, cast=int)
+HOT_SKU_DEMOTE_ORDERS = config('HOT_SKU_DEMOTE_ORDERS', default=30, cast=int)
+
+# Redis stock mode
+# When enabled, stores loaded into Redis (manage.py redis_stock load) take
+# orders against Redis counters; a Celery worker writes the confirmed
+# orders and inventory deltas to the database in batches
+REDIS_STOCK_MODE = config('REDIS_STOCK_MODE', default=False, cast=bool)
+REDIS_STOCK_URL = config('REDIS_STOCK_URL', default=f'{REDIS_URL}/2')
+REDIS_STOCK_FLUSH_BATCH_SIZE = config('REDIS_STOCK_FLUSH_BATCH_SIZE', default=500, cast=int)
+
+# Order path catalog cache
+# Per-process copy of store and product metadata used by order creation,
+# dropped whenever a store or product is saved or deleted
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=True, cast=bool)
+CATALOG_CACHE_MAX_PRODUCTS = config('CATALOG_CACHE_MAX_PRODUCTS', default=100000, cast=int)
+
+# Response cache
+# Read endpoints marked with apps.core.cache.cached_action keep their
+# responses in the shared cache with an LRU copy of up to
+# RESPONSE_CACHE_LOCAL_ENTRIES in each process. Model signals bump
+# generations to invalidate; a process trusts the generations it has read
+# for RESPONSE_CACHE_GENERATION_SECONDS, so other processes see a change
+# within that long. RESPONSE_CACHE_BETA scales early refresh (0 disables).
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+RESPONSE_CACHE_LOCAL_ENTRIES = config('RESPONSE_CACHE_LOCAL_ENTRIES', default=1000, cast=int)
+RESPONSE_CACHE_GENERATION_SECONDS = config('RESPONSE_CACHE_GENERATION_SECONDS', default=1, cast=float)
+RESPONSE_CACHE_BETA = config('RESPONSE_CACHE_BETA', default=1.0, cast=float)
+RESPONSE_CACHE_LOCK_SECONDS = config('RESPONSE_CACHE_LOCK_SECONDS', default=5, cast=float)
+
+# Conditional GET
+# Category, product and store inventory listings send ETag (and, for
+# inventory, Last-Modified) validators and answer matching conditional
+# requests with 304 Not Modified
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED', default=True, cast=bool)
+
+# Order event outbox
+# Order creation writes OrderEvent rows in the same transaction; a relay
+# (Celery beat or manage.py relay_order_events) publishes them in batches
+# to ORDER_EVENT_SINK (LogSink, FileSink or HttpSink in apps.orders.outbox)
+ORDER_EVENT_SINK = config('ORDER_EVENT_SINK', default='apps.orders.outbox.LogSink')
+ORDER_EVENT_FILE_PATH = config('ORDER_EVENT_FILE_PATH', default=str(BASE_DIR / 'order_events.ndjson'))
+ORDER_EVENT_HTTP_URL = config('ORDER_EVENT_HTTP_URL', default='')
+ORDER_EVENT_HTTP_TIMEOUT = config('ORDER_EVENT_HTTP_TIMEOUT', default=5, cast=float)
+ORDER_EVENT_BATCH_SIZE = config('ORDER_EVENT_BATCH_SIZE', default=100, cast=int)
+ORDER_EVENT_MAX_ATTEMPTS = config('ORDER_EVENT_MAX_ATTEMPTS', default=10, cast=int)
+ORDER_EVENT_RETENTION_DAYS = config('ORDER_EVENT_RETENTION_DAYS', default=7, cast=int)
+
+# Request metrics
+# MetricsMiddleware records per-view latency, SQL, cache and Redis usage;
+# each worker writes its totals to METRICS_DIR (shared by the workers of a
+# host, cleared on deploy) and GET /metrics serves the sum
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'aforro-metrics'))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_LATENCY_BUCKETS = config(
+    'METRICS_LATENCY_BUCKETS',
+    default='0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10',
+    cast=Csv(float)
+)
+
+# Slow query capture
+# Requests to SLOW_QUERY_VIEWS (view labels as in /metrics) slower than
+# SLOW_QUERY_BUDGET_MS keep their SLOW_QUERY_TOP slowest statements with
+# EXPLAIN plans in a cache ring buffer of SLOW_QUERY_BUFFER_SIZE entries
+SLOW_QUERY_CAPTURE = config('SLOW_QUERY_CAPTURE', default=True, cast=bool)
+SLOW_QUERY_VIEWS = config('SLOW_QUERY_VIEWS', default='product-search,orders.create', cast=Csv())
+SLOW_QUERY_BUDGET_MS = config('SLOW_QUERY_BUDGET_MS', default=500, cast=int)
+SLOW_QUERY_TOP = config('SLOW_QUERY_TOP', default=3, cast=int)
+SLOW_QUERY_BUFFER_SIZE = config('SLOW_QUERY_BUFFER_SIZE', default=100, cast=int)
+
+# On-demand profiling
+# Requests with "X-Profile: <PROFILING_TOKEN>" (no token disables the
+# header) or a PROFILING_SAMPLE_RATE share of requests to PROFILING_VIEWS
+# (empty for all) are profiled into PROFILING_DIR: collapsed stacks in
+# sampling mode, pstats in cprofile mode. See manage.py profiles.
+PROFILING_TOKEN = config('PROFILING_TOKEN', default='')
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_VIEWS = config('PROFILING_VIEWS', default='', cast=Csv())
+PROFILING_MODE = config('PROFILING_MODE', default='sampling')
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=5, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=os.path.join(tempfile.gettempdir(), 'aforro-profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=50, cast=int)
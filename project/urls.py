@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 
 from apps.products.views import CategoryViewSet, ProductViewSet
 from apps.stores.views import StoreViewSet
-from apps.orders.views import OrderViewSet
+from apps.orders.views import OrderViewSet, ReservationViewSet
 from django.conf import settings
 
 router = DefaultRouter()
@@ -13,6 +13,7 @@ router.register(r'categories', CategoryViewSet, basename='categories')
 router.register(r'products', ProductViewSet, basename='products')
 router.register(r'stores', StoreViewSet, basename='stores')
 router.register(r'orders', OrderViewSet, basename='orders')
+router.register(r'reservations', ReservationViewSet, basename='reservations')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -22,6 +23,9 @@ urlpatterns = [
 
     # Function-based views (search)
     path('api/', include('apps.search.urls')),
+
+    # Prometheus metrics
+    path('', include('apps.monitoring.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from apps.monitoring.benchmark import check_results, percentile
+from apps.products.models import Product
+from apps.products.seeding import seed_catalog
+
+
+class BenchmarkTestCase(TestCase):
+    """Test the endpoint benchmark command and its checks"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.directory.name, 'baseline.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def benchmark(self, *args):
+        output = StringIO()
+        call_command(
+            'benchmark_endpoints', '--iterations', '3', '--warmup', '1',
+            '--baseline', self.baseline, *args, stdout=output, stderr=StringIO()
+        )
+        return output.getvalue()
+
+    def test_seed_and_write_baseline(self):
+        """Test that a seeded run passes its ceilings and writes a baseline"""
+        output = self.benchmark(
+            '--seed', '--products', '200', '--stores', '3', '--density', '0.25', '--orders', '20',
+            '--update-baseline'
+        )
+
+        self.assertEqual(Product.objects.count(), 200)
+        self.assertIn('All benchmark checks passed', output)
+        with open(self.baseline) as source:
+            baseline = json.load(source)
+        self.assertEqual(baseline['scale']['products'], 200)
+        self.assertIn('orders.create', baseline['scenarios'])
+        self.assertIn('search.newest', baseline['scenarios'])
+
+    def test_regression_fails(self):
+        """Test that extra queries against the baseline fail the run"""
+        seed_catalog(products=100, stores=2, density=0.25, seed=1)
+        self.benchmark('--scenario', 'categories.list', '--update-baseline')
+
+        with open(self.baseline) as source:
+            baseline = json.load(source)
+        baseline['scenarios']['categories.list']['queries'] = 0
+        with open(self.baseline, 'w') as output:
+            json.dump(baseline, output)
+
+        with self.assertRaises(CommandError):
+            self.benchmark('--scenario', 'categories.list')
+
+    def test_check_results(self):
+        """Test ceilings, error statuses and the latency tolerance"""
+        result = {
+            'p50_ms': 5.0, 'p95_ms': 12.0, 'p99_ms': 15.0,
+            'queries': 3, 'max_queries': 2, 'statuses': [200, 500]
+        }
+        baseline = {'scenarios': {'x': {'p95_ms': 5.0, 'queries': 3}}}
+
+        failures = check_results({'x': result}, baseline, tolerance=0.2)
+        self.assertEqual(len(failures), 3)
+        self.assertEqual(check_results({'x': dict(result, max_queries=3, statuses=[200], p95_ms=5.5)}, baseline), [])
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+
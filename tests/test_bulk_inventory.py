@@ -0,0 +1,91 @@
+import json
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+class BulkInventoryUpsertTestCase(TestCase):
+    """Test bulk stock level upserts"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+        self.existing = Product.objects.create(title='Laptop', price=999.99, category=self.category)
+        self.steady = Product.objects.create(title='Mouse', price=29.99, category=self.category)
+        self.new = Product.objects.create(title='Keyboard', price=49.99, category=self.category)
+
+        Inventory.objects.create(store=self.store, product=self.existing, quantity=10)
+        Inventory.objects.create(store=self.store, product=self.steady, quantity=5)
+
+        self.url = f'/api/stores/{self.store.id}/inventory/bulk/'
+
+    def test_csv_upsert_counts(self):
+        """Test inserted/updated/unchanged counts and resulting stock"""
+        body = (
+            'product_id,quantity\n'
+            f'{self.existing.id},3\n'
+            f'{self.steady.id},5\n'
+            f'{self.new.id},12\n'
+            '999999,4\n'
+        )
+
+        response = self.client.generic('POST', self.url, body, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'received': 4,
+            'inserted': 1,
+            'updated': 1,
+            'unchanged': 1,
+            'unknown_products': [999999],
+        })
+
+        stock = dict(Inventory.objects.filter(store=self.store).values_list('product_id', 'quantity'))
+        self.assertEqual(stock, {self.existing.id: 3, self.steady.id: 5, self.new.id: 12})
+        self.assertEqual(
+            Inventory.objects.get(store=self.store, product=self.new).product_title,
+            'Keyboard'
+        )
+
+    def test_ndjson_last_duplicate_wins(self):
+        """Test that a product listed twice takes its last quantity"""
+        body = '\n'.join([
+            json.dumps({'product_id': self.existing.id, 'quantity': 1}),
+            json.dumps({'product_id': self.existing.id, 'quantity': 8}),
+        ])
+
+        response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Inventory.objects.get(store=self.store, product=self.existing).quantity,
+            8
+        )
+
+    def test_malformed_row_rolls_back(self):
+        """Test that a bad row rejects the whole feed with its line number"""
+        body = (
+            'product_id,quantity\n'
+            f'{self.existing.id},3\n'
+            f'{self.new.id},-1\n'
+        )
+
+        response = self.client.generic('POST', self.url, body, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['line'], 3)
+        self.assertEqual(
+            Inventory.objects.get(store=self.store, product=self.existing).quantity,
+            10
+        )
+
+    def test_unsupported_content_type(self):
+        """Test that JSON bodies are refused"""
+        response = self.client.post(self.url, [], format='json')
+
+        self.assertEqual(response.status_code, 415)
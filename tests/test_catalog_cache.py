@@ -0,0 +1,64 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.orders.catalog import get_store, get_products
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+@override_settings(CATALOG_CACHE_ENABLED=True)
+class CatalogCacheTestCase(TestCase):
+    """Test the per-process store/product cache used by order creation"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+
+    def order(self, store_id=None, product_id=None):
+        return self.client.post('/api/orders/', {
+            'store_id': store_id or self.store.id,
+            'items': [{'product_id': product_id or self.laptop.id, 'quantity_requested': 1}]
+        }, format='json')
+
+    def test_warm_lookups_skip_queries(self):
+        """Test that a second lookup is served without touching the database"""
+        get_store(self.store.id)
+        get_products([self.laptop.id])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_store(self.store.id).name, 'Tech Store')
+            self.assertEqual(get_products([self.laptop.id])[self.laptop.id].price, Decimal('1000.00'))
+
+    def test_unknown_ids_still_404(self):
+        """Test that unknown stores and products are looked up and rejected"""
+        self.order()
+
+        self.assertEqual(self.order(store_id=999999).status_code, 404)
+        self.assertEqual(self.order(product_id=999999).status_code, 404)
+
+    def test_save_invalidates(self):
+        """Test that saving a product makes every process reload it"""
+        get_products([self.laptop.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.laptop.price = Decimal('900.00')
+            self.laptop.save()
+
+        self.assertEqual(get_products([self.laptop.id])[self.laptop.id].price, Decimal('900.00'))
+
+    def test_delete_invalidates(self):
+        """Test that a deleted store is no longer served from the cache"""
+        other = Store.objects.create(name='Other Store', location='1 Side St')
+        self.assertIsNotNone(get_store(other.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+
+        self.assertIsNone(get_store(other.id))
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.core.cache import clear_local
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+@override_settings(CONDITIONAL_GET_ENABLED=True)
+class ConditionalGetTestCase(TestCase):
+    """Test ETag/Last-Modified validators and 304 responses"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=20, category=self.category)
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop_stock = Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.store, product=self.mouse, quantity=50)
+        self.inventory_url = f'/api/stores/{self.store.id}/inventory/'
+
+    def tearDown(self):
+        cache.clear()
+        clear_local()
+
+    def test_products_not_modified(self):
+        """Test that a matching ETag gets 304 without touching the database"""
+        response = self.client.get('/api/products/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_product_change_moves_etag(self):
+        """Test that saving a product invalidates the validator"""
+        etag = self.client.get(f'/api/products/{self.laptop.id}/')['ETag']
+
+        self.laptop.price = 900
+        self.laptop.save()
+
+        response = self.client.get(f'/api/products/{self.laptop.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_string_moves_etag(self):
+        """Test that each filtered listing has its own validator"""
+        etag = self.client.get('/api/products/')['ETag']
+
+        response = self.client.get('/api/products/', {'category': self.category.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_categories_not_modified(self):
+        """Test that categories answer conditional requests"""
+        etag = self.client.get('/api/categories/')['ETag']
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Category.objects.create(name='Books')
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_inventory_not_modified(self):
+        """Test that an unchanged inventory costs one aggregate query"""
+        response = self.client.get(self.inventory_url)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.inventory_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_inventory_if_modified_since(self):
+        """Test that Last-Modified validates on its own"""
+        last_modified = self.client.get(self.inventory_url)['Last-Modified']
+
+        response = self.client.get(self.inventory_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_inventory_changes_move_etag(self):
+        """Test that stock updates and deletions invalidate the validator"""
+        etag = self.client.get(self.inventory_url)['ETag']
+
+        self.laptop_stock.quantity = 4
+        self.laptop_stock.save()
+        response = self.client.get(self.inventory_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.laptop_stock.delete()
+        response = self.client.get(self.inventory_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_unknown_store(self):
+        """Test that a missing store is still a 404"""
+        self.assertEqual(self.client.get('/api/stores/999999/inventory/').status_code, 404)
+        self.assertEqual(self.client.get('/api/stores/abc/inventory/').status_code, 404)
+
+    @override_settings(CONDITIONAL_GET_ENABLED=False)
+    def test_disabled(self):
+        """Test that no validators are sent when turned off"""
+        self.assertNotIn('ETag', self.client.get(self.inventory_url))
+        self.assertNotIn('ETag', self.client.get('/api/products/'))
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+from apps.orders.models import Order, OrderItem
+
+
+class StreamingExportTestCase(TestCase):
+    """Test streaming CSV/NDJSON exports of inventory and orders"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+        self.products = [
+            Product.objects.create(title=f'Product {i}', price=10 + i, category=self.category)
+            for i in range(5)
+        ]
+        for product in self.products:
+            Inventory.objects.create(store=self.store, product=product, quantity=7)
+
+        order = Order.objects.create(store=self.store, status='CONFIRMED')
+        OrderItem.objects.create(order=order, product=self.products[0], quantity_requested=2)
+        OrderItem.objects.create(order=order, product=self.products[1], quantity_requested=1)
+
+    def read_stream(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_inventory_csv_export(self):
+        """Test that the CSV export has a header and one row per inventory item"""
+        response = self.client.get(f'/api/stores/{self.store.id}/inventory/export/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(self.read_stream(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['quantity'], '7')
+        self.assertEqual(rows[0]['price'], '10.00')
+
+    def test_orders_ndjson_export(self):
+        """Test that the NDJSON export emits one JSON object per order line"""
+        response = self.client.get(
+            f'/api/stores/{self.store.id}/orders/export/',
+            {'fmt': 'ndjson'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in self.read_stream(response).splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['status'], 'CONFIRMED')
+        self.assertEqual(lines[0]['quantity_requested'], 2)
+
+    def test_unknown_format_rejected(self):
+        """Test that an unsupported format returns 400"""
+        response = self.client.get(
+            f'/api/stores/{self.store.id}/inventory/export/',
+            {'fmt': 'xml'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_inventory_command(self):
+        """Test that the management command writes the same export"""
+        output = io.StringIO()
+        call_command('export_inventory', self.store.id, '--format', 'ndjson', stdout=output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['product_title'], 'Product 0')
@@ -0,0 +1,99 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+class FulfillableStoresTestCase(TestCase):
+    """Test the basket fulfillment finder"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+
+        self.laptop = Product.objects.create(
+            title='Laptop',
+            price=999.99,
+            category=self.category
+        )
+
+        self.mouse = Product.objects.create(
+            title='Mouse',
+            price=29.99,
+            category=self.category
+        )
+
+        self.full_store = Store.objects.create(name='Full Store', location='1 Main St')
+        self.partial_store = Store.objects.create(name='Partial Store', location='2 Main St')
+        self.empty_store = Store.objects.create(name='Empty Store', location='3 Main St')
+
+        Inventory.objects.create(store=self.full_store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.full_store, product=self.mouse, quantity=20)
+        Inventory.objects.create(store=self.partial_store, product=self.laptop, quantity=1)
+        Inventory.objects.create(store=self.partial_store, product=self.mouse, quantity=50)
+        Inventory.objects.create(store=self.empty_store, product=self.laptop, quantity=0)
+
+        self.basket = [
+            {'product_id': self.laptop.id, 'quantity_requested': 2},
+            {'product_id': self.mouse.id, 'quantity_requested': 10},
+        ]
+
+    def test_only_complete_stores_by_default(self):
+        """Test that only stores able to fill every line are returned"""
+        response = self.client.post(
+            '/api/stores/fulfillable/',
+            {'items': self.basket},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['store_id'], self.full_store.id)
+        self.assertTrue(results[0]['fully_fulfillable'])
+
+    def test_partial_stores_ranked_by_coverage(self):
+        """Test that partial coverage is reported and ranked after full coverage"""
+        response = self.client.post(
+            '/api/stores/fulfillable/',
+            {'items': self.basket, 'allow_partial': True},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            [row['store_id'] for row in results],
+            [self.full_store.id, self.partial_store.id]
+        )
+        self.assertEqual(results[1]['covered_items'], 1)
+        self.assertEqual(results[1]['missing_items'], 1)
+        # 1 laptop (capped by stock) + 10 mice (capped by request)
+        self.assertEqual(results[1]['covered_units'], 11)
+
+    def test_duplicate_lines_are_merged(self):
+        """Test that repeated products are summed before checking stock"""
+        basket = [
+            {'product_id': self.laptop.id, 'quantity_requested': 3},
+            {'product_id': self.laptop.id, 'quantity_requested': 3},
+        ]
+        response = self.client.post(
+            '/api/stores/fulfillable/',
+            {'items': basket},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_empty_basket_rejected(self):
+        """Test that an empty basket is a validation error"""
+        response = self.client.post(
+            '/api/stores/fulfillable/',
+            {'items': []},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
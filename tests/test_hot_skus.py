@@ -0,0 +1,199 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.orders.services import lock_inventory
+from apps.stores.hot_skus import (
+    InsufficientStock,
+    record_lock_wait,
+    rebalance_hot_skus,
+    shard_inventory,
+    take_from_slots
+)
+from apps.stores.models import Store, Inventory, InventorySlot
+from apps.stores.stats import compute_store_stats
+
+
+@override_settings(
+    HOT_SKU_SHARDING=True,
+    HOT_SKU_SLOTS=4,
+    HOT_SKU_WAIT_SAMPLE_MS=5,
+    HOT_SKU_PROMOTE_WAIT_MS=100,
+    HOT_SKU_DEMOTE_ORDERS=3
+)
+class HotSkuTestCase(TestCase):
+    """Test sharded stock counters for hot SKUs"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.phone = Product.objects.create(title='Phone', price=500, category=self.category)
+        self.inventory = Inventory.objects.create(store=self.store, product=self.phone, quantity=10)
+
+    def order(self, quantity):
+        return self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'items': [{'product_id': self.phone.id, 'quantity_requested': quantity}]
+        }, format='json')
+
+    def slot_quantities(self):
+        return list(
+            InventorySlot.objects.filter(store=self.store, product=self.phone)
+            .order_by('slot').values_list('quantity', flat=True)
+        )
+
+    def test_shard_splits_stock(self):
+        """Test that promotion spreads the stock over the slots"""
+        self.assertTrue(shard_inventory(self.store.id, self.phone.id))
+
+        self.inventory.refresh_from_db()
+        self.assertTrue(self.inventory.sharded)
+        self.assertEqual(self.slot_quantities(), [3, 3, 2, 2])
+
+    def test_orders_take_from_slots(self):
+        """Test that orders on a sharded SKU deduct from the slots"""
+        shard_inventory(self.store.id, self.phone.id)
+
+        self.assertEqual(self.order(3).json()['status'], 'CONFIRMED')
+        self.assertEqual(sum(self.slot_quantities()), 7)
+
+        # More than any single slot holds, so the slots are drained together
+        self.assertEqual(self.order(7).json()['status'], 'CONFIRMED')
+        self.assertEqual(sum(self.slot_quantities()), 0)
+
+        self.assertEqual(self.order(1).json()['status'], 'REJECTED')
+
+    def test_take_from_slots_insufficient(self):
+        """Test that a deduction larger than all slots raises"""
+        shard_inventory(self.store.id, self.phone.id)
+
+        with self.assertRaises(InsufficientStock):
+            take_from_slots(self.store.id, self.phone.id, 11)
+        self.assertEqual(sum(self.slot_quantities()), 10)
+
+    def test_lock_wait_promotes(self):
+        """Test that accumulated lock wait past the threshold shards the row"""
+        lookup = {self.phone.id: self.inventory}
+
+        record_lock_wait(self.store.id, lookup, 0.06)
+        self.inventory.refresh_from_db()
+        self.assertFalse(self.inventory.sharded)
+
+        record_lock_wait(self.store.id, lookup, 0.06)
+        self.inventory.refresh_from_db()
+        self.assertTrue(self.inventory.sharded)
+
+    def test_rebalance_syncs_and_demotes(self):
+        """Test that busy shards are evened out and quiet ones folded back"""
+        shard_inventory(self.store.id, self.phone.id)
+        for _ in range(3):
+            self.order(1)
+
+        rebalanced, demoted = rebalance_hot_skus()
+        self.assertEqual((rebalanced, demoted), (1, 0))
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity, 7)
+        self.assertEqual(self.slot_quantities(), [2, 2, 2, 1])
+
+        # No orders in the new window
+        cache.clear()
+        rebalanced, demoted = rebalance_hot_skus()
+        self.assertEqual((rebalanced, demoted), (0, 1))
+        self.inventory.refresh_from_db()
+        self.assertFalse(self.inventory.sharded)
+        self.assertEqual(self.inventory.quantity, 7)
+        self.assertEqual(self.slot_quantities(), [])
+
+    def test_stats_use_slot_totals(self):
+        """Test that store stats read sharded stock from the slots"""
+        shard_inventory(self.store.id, self.phone.id)
+        self.order(4)
+
+        self.assertEqual(compute_store_stats(self.store.id)['total_units'], 6)
+
+    def test_release_returns_stock_to_slots(self):
+        """Test that a released hold on a sharded SKU goes back into the slots"""
+        shard_inventory(self.store.id, self.phone.id)
+        reservation_id = self.client.post('/api/reservations/', {
+            'store_id': self.store.id,
+            'items': [{'product_id': self.phone.id, 'quantity_requested': 2}]
+        }, format='json').json()['id']
+        self.assertEqual(sum(self.slot_quantities()), 8)
+
+        self.client.post(f'/api/reservations/{reservation_id}/release/')
+
+        self.assertEqual(sum(self.slot_quantities()), 10)
+
+    def test_lock_wait_survives_cache_errors(self):
+        """Test that recording lock wait never raises"""
+        lookup = {self.phone.id: self.inventory}
+
+        with mock.patch('apps.stores.hot_skus.cache.incr', side_effect=ValueError):
+            record_lock_wait(self.store.id, lookup, 0.06)
+        self.assertEqual(cache.get(f'hot_sku:wait_ms:{self.store.id}:{self.phone.id}'), 60)
+
+        with mock.patch('apps.stores.hot_skus.cache.add', side_effect=ConnectionError):
+            record_lock_wait(self.store.id, lookup, 0.06)
+
+    def test_slots_sold_out_after_check(self):
+        """Test that a basket is replanned when a sharded line sells out mid-order"""
+        case = Product.objects.create(title='Case', price=20, category=self.category)
+        case_inventory = Inventory.objects.create(store=self.store, product=case, quantity=5)
+        shard_inventory(self.store.id, self.phone.id)
+
+        def lock_then_drain(store_id, product_ids):
+            # The slots aren't locked, so another order can empty them
+            inventory_lookup = lock_inventory(store_id, product_ids)
+            InventorySlot.objects.filter(store=self.store, product=self.phone).update(quantity=0)
+            return inventory_lookup
+
+        def order(partial):
+            with mock.patch('apps.orders.views.lock_inventory', side_effect=lock_then_drain):
+                response = self.client.post('/api/orders/', {
+                    'store_id': self.store.id,
+                    'items': [
+                        {'product_id': case.id, 'quantity_requested': 2},
+                        {'product_id': self.phone.id, 'quantity_requested': 1}
+                    ],
+                    'fulfillment': 'partial' if partial else 'all'
+                }, format='json')
+            self.assertEqual(response.status_code, 201)
+            return response.json()
+
+        self.assertEqual(order(partial=False)['status'], 'REJECTED')
+        case_inventory.refresh_from_db()
+        self.assertEqual(case_inventory.quantity, 5)
+
+        data = order(partial=True)
+        self.assertEqual(data['status'], 'PARTIAL')
+        self.assertEqual(
+            {item['product_id']: item['quantity_fulfilled'] for item in data['items']},
+            {case.id: 2, self.phone.id: 0}
+        )
+        case_inventory.refresh_from_db()
+        self.assertEqual(case_inventory.quantity, 3)
+
+    def test_reads_use_slot_total(self):
+        """Test that stock reads see a sharded SKU's slots before the rebalance syncs the row"""
+        shard_inventory(self.store.id, self.phone.id)
+        etag = self.client.get(f'/api/stores/{self.store.id}/inventory/')['ETag']
+        self.order(8)
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity, 10)
+
+        response = self.client.get(f'/api/stores/{self.store.id}/inventory/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['quantity'], 2)
+
+        response = self.client.get(f'/api/stores/{self.store.id}/low-stock/')
+        self.assertEqual([row['quantity'] for row in response.json()['results']], [2])
+
+        response = self.client.post('/api/stores/fulfillable/', {
+            'items': [{'product_id': self.phone.id, 'quantity_requested': 3}]
+        }, format='json')
+        self.assertEqual(response.json()['results'], [])
@@ -2,6 +2,7 @@ from django.test import TestCase
 from rest_framework.test import APIClient
 from apps.products.models import Category, Product
 from apps.stores.models import Store, Inventory
+from apps.stores.serializers import InventorySerializer
 
 
 class InventoryListingTestCase(TestCase):
@@ -114,4 +115,58 @@ class InventoryListingTestCase(TestCase):
         
         # Verify none of the results are from the other store
         for item in results:
-            self.assertNotEqual(item['product_title'], 'Other Product')
\ No newline at end of file
+            self.assertNotEqual(item['product_title'], 'Other Product')
+    
+    def test_inventory_listing_matches_serializer_output(self):
+        """Test that the fast path returns exactly what InventorySerializer would"""
+        response = self.client.get(f'/api/stores/{self.store.id}/inventory/')
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        
+        expected = InventorySerializer(
+            Inventory.objects.filter(store=self.store).select_related(
+                'product', 'product__category'
+            ).order_by('product__title'),
+            many=True
+        ).data
+        
+        self.assertEqual(results, [dict(item) for item in expected])
+        self.assertEqual(results[0]['price'], '79.99')
+    
+    def test_cursor_pagination_walks_all_pages(self):
+        """Test that keyset pagination returns every row once, in title order"""
+        titles = []
+        cursor = ''
+        
+        while cursor is not None:
+            response = self.client.get(
+                f'/api/stores/{self.store.id}/inventory/',
+                {'cursor': cursor, 'page_size': 2}
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            titles.extend(item['product_title'] for item in data['results'])
+            cursor = data['next_cursor']
+        
+        self.assertEqual(titles, ['Apple Mouse', 'Monitor Stand', 'Zebra Printer'])
+    
+    def test_cursor_follows_product_rename(self):
+        """Test that renaming a product re-sorts the store inventory"""
+        self.product1.title = 'Alpha Printer'
+        self.product1.save()
+        
+        response = self.client.get(f'/api/stores/{self.store.id}/inventory/', {'cursor': ''})
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0]['product_title'], 'Alpha Printer')
+    
+    def test_invalid_cursor_rejected(self):
+        """Test that a malformed cursor returns 400"""
+        response = self.client.get(
+            f'/api/stores/{self.store.id}/inventory/',
+            {'cursor': 'not-a-cursor'}
+        )
+        
+        self.assertEqual(response.status_code, 400)
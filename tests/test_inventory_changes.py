@@ -0,0 +1,140 @@
+import base64
+import json
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+from apps.stores.pagination import ChangeFeedToken
+
+
+@override_settings(INVENTORY_CHANGES_LAG_SECONDS=0)
+class InventoryChangeFeedTestCase(TestCase):
+    """Test the incremental inventory change feed"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+        self.inventory = []
+        for i in range(3):
+            product = Product.objects.create(
+                title=f'Product {i}',
+                price=10 + i,
+                category=self.category
+            )
+            self.inventory.append(
+                Inventory.objects.create(store=self.store, product=product, quantity=10)
+            )
+
+        self.url = f'/api/stores/{self.store.id}/inventory/changes/'
+
+    def sync(self, since=None, page_size=None):
+        params = {}
+        if since:
+            params['since'] = since
+        if page_size:
+            params['page_size'] = page_size
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_initial_sync_returns_all_rows(self):
+        """Test that omitting since returns the whole store inventory"""
+        data = self.sync()
+
+        self.assertEqual(len(data['changes']), 3)
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_only_changed_rows_after_token(self):
+        """Test that a token only yields rows modified after it"""
+        token = self.sync()['next_token']
+
+        changed = self.inventory[1]
+        changed.quantity = 3
+        changed.save()
+
+        data = self.sync(token)
+        self.assertEqual([row['id'] for row in data['changes']], [changed.id])
+        self.assertEqual(data['changes'][0]['quantity'], 3)
+
+        # Nothing new since the latest token
+        self.assertEqual(self.sync(data['next_token'])['changes'], [])
+
+    def test_paging_through_changes(self):
+        """Test that has_more/next_token walk every row exactly once"""
+        seen = []
+        data = self.sync(page_size=2)
+        seen.extend(row['id'] for row in data['changes'])
+        self.assertTrue(data['has_more'])
+
+        data = self.sync(data['next_token'], page_size=2)
+        seen.extend(row['id'] for row in data['changes'])
+        self.assertFalse(data['has_more'])
+
+        self.assertEqual(sorted(seen), sorted(inv.id for inv in self.inventory))
+
+    def test_deletions_reported(self):
+        """Test that deleted rows appear in the deleted list"""
+        token = self.sync()['next_token']
+
+        removed = self.inventory[0]
+        removed_id = removed.id
+        removed.delete()
+
+        data = self.sync(token)
+        self.assertEqual([row['id'] for row in data['deleted']], [removed_id])
+
+    def test_expired_token_gone(self):
+        """Test that tokens older than tombstone retention get 410"""
+        token = ChangeFeedToken.encode(timezone.now() - timedelta(days=365), 0)
+
+        response = self.client.get(self.url, {'since': token})
+
+        self.assertEqual(response.status_code, 410)
+
+    def test_catalog_changes_reported(self):
+        """Test that product renames, price and category changes bump their rows"""
+        token = self.sync()['next_token']
+
+        product = self.inventory[0].product
+        product.title = 'Renamed'
+        product.save()
+        data = self.sync(token)
+        self.assertEqual([row['product_title'] for row in data['changes']], ['Renamed'])
+
+        product.price = 99
+        product.save()
+        data = self.sync(data['next_token'])
+        self.assertEqual([row['id'] for row in data['changes']], [self.inventory[0].id])
+
+        other = Category.objects.create(name='Accessories')
+        product = self.inventory[1].product
+        product.category = other
+        product.save()
+        data = self.sync(data['next_token'])
+        self.assertEqual([row['id'] for row in data['changes']], [self.inventory[1].id])
+
+        other.name = 'Peripherals'
+        other.save()
+        data = self.sync(data['next_token'])
+        self.assertEqual([row['id'] for row in data['changes']], [self.inventory[1].id])
+
+        # Saving unchanged catalog rows reports nothing
+        product.save()
+        self.category.save()
+        self.assertEqual(self.sync(data['next_token'])['changes'], [])
+
+    def test_naive_token_rejected(self):
+        """Test that a token without a UTC offset gets 400"""
+        raw = json.dumps(['2026-01-01T00:00:00', 0]).encode()
+        token = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+        response = self.client.get(self.url, {'since': token})
+
+        self.assertEqual(response.status_code, 400)
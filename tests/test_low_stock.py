@@ -0,0 +1,62 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+@override_settings(LOW_STOCK_THRESHOLD=10)
+class LowStockTestCase(TestCase):
+    """Test low-stock listings and the cross-store report"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.products = [
+            Product.objects.create(title=f'Product {i}', price=10, category=self.category)
+            for i in range(3)
+        ]
+
+        # Uses the global threshold of 10
+        self.default_store = Store.objects.create(name='Default Store', location='1 Main St')
+        # Overrides it with 5
+        self.strict_store = Store.objects.create(
+            name='Strict Store',
+            location='2 Main St',
+            low_stock_threshold=5
+        )
+
+        for store in (self.default_store, self.strict_store):
+            for product, quantity in zip(self.products, (0, 7, 40)):
+                Inventory.objects.create(store=store, product=product, quantity=quantity)
+
+    def test_store_low_stock_uses_global_threshold(self):
+        """Test that items below the global threshold are listed, lowest first"""
+        response = self.client.get(f'/api/stores/{self.default_store.id}/low-stock/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['threshold'], 10)
+        self.assertEqual([row['quantity'] for row in data['results']], [0, 7])
+
+    def test_store_low_stock_uses_store_threshold(self):
+        """Test that a store's own threshold overrides the global one"""
+        response = self.client.get(f'/api/stores/{self.strict_store.id}/low-stock/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['threshold'], 5)
+        self.assertEqual([row['quantity'] for row in data['results']], [0])
+
+    def test_cross_store_report(self):
+        """Test per-store low-stock and out-of-stock counts"""
+        response = self.client.get('/api/stores/low-stock/')
+
+        self.assertEqual(response.status_code, 200)
+        stores = {row['store_id']: row for row in response.json()['stores']}
+
+        self.assertEqual(stores[self.default_store.id]['low_stock_items'], 2)
+        self.assertEqual(stores[self.strict_store.id]['low_stock_items'], 1)
+        self.assertEqual(stores[self.strict_store.id]['out_of_stock_items'], 1)
+        self.assertEqual(stores[self.strict_store.id]['threshold'], 5)
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import threading
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.monitoring.instrumentation import start_request, finish_request
+from apps.monitoring.metrics import registry
+from apps.stores.models import Store
+
+
+class MetricsTestCase(TestCase):
+    """Test the metrics middleware and /metrics endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.directory = tempfile.TemporaryDirectory()
+        self.override = override_settings(METRICS_DIR=self.directory.name, METRICS_TOKEN='')
+        self.override.enable()
+        registry.reset()
+
+        Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+    def tearDown(self):
+        registry.reset()
+        self.override.disable()
+        self.directory.cleanup()
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_request_metrics(self):
+        """Test that requests are labelled by basename and action"""
+        self.client.get('/api/stores/')
+        self.client.get('/api/stores/')
+
+        text = self.scrape()
+        self.assertIn('http_requests_total{view="stores.list",method="GET",status="200"} 2', text)
+        self.assertIn('http_request_duration_seconds_count{view="stores.list",method="GET"} 2', text)
+        self.assertIn('http_request_duration_seconds_bucket{view="stores.list",method="GET",le="+Inf"} 2', text)
+        self.assertIn('db_queries_total{view="stores.list"}', text)
+        self.assertIn('db_query_duration_seconds_total{view="stores.list"}', text)
+
+    def test_cache_usage(self):
+        """Test that cache hits and misses are counted for the current request"""
+        cache.delete('metrics-test')
+        usage = start_request()
+        try:
+            self.assertIsNone(cache.get('metrics-test'))
+            cache.set('metrics-test', 1)
+            self.assertEqual(cache.get('metrics-test'), 1)
+            self.assertEqual(cache.get('metrics-test-other', 'fallback'), 'fallback')
+            cache.get_many(['metrics-test', 'metrics-test-other'])
+        finally:
+            finish_request()
+
+        self.assertEqual(usage.cache_hits, 2)
+        self.assertEqual(usage.cache_misses, 3)
+
+    def test_workers_are_summed(self):
+        """Test that other workers' files are merged into the output"""
+        self.client.get('/api/stores/')
+        registry.flush(force=True)
+        with open(os.path.join(self.directory.name, f'{os.getpid()}.json')) as source:
+            snapshot = json.load(source)
+        # Pretend another worker served the same traffic
+        with open(os.path.join(self.directory.name, '999999.json'), 'w') as output:
+            json.dump(snapshot, output)
+
+        text = self.scrape()
+        self.assertIn('http_requests_total{view="stores.list",method="GET",status="200"} 2', text)
+
+    def test_token_required(self):
+        """Test that METRICS_TOKEN protects the endpoint"""
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+
+    def test_flush_failure_does_not_fail_requests(self):
+        """Test that an unwritable metrics directory is logged, not raised"""
+        blocker = os.path.join(self.directory.name, 'not-a-directory')
+        open(blocker, 'w').close()
+
+        with self.settings(METRICS_DIR=blocker), self.assertLogs('apps.monitoring.metrics', 'WARNING'):
+            response = self.client.get('/api/stores/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_concurrent_flushes(self):
+        """Test that threads flushing at once all finish with one intact file"""
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(20):
+                    registry.flush(force=True)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=flush) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.directory.name), [f'{os.getpid()}.json'])
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.orders.models import Order, OrderEvent
+from apps.orders.outbox import FileSink, HttpSink, relay_order_events
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+class FailingSink:
+    def publish(self, messages):
+        raise ConnectionError('sink unavailable')
+
+
+class OrderEventTestCase(TestCase):
+    """Test the order event outbox and its relay"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+
+    def order(self, quantity):
+        return self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'items': [{'product_id': self.laptop.id, 'quantity_requested': quantity}]
+        }, format='json')
+
+    def test_events_written_with_order(self):
+        """Test that created and status events are written for each order"""
+        confirmed = self.order(2).json()
+        rejected = self.order(50).json()
+
+        self.assertEqual(
+            list(OrderEvent.objects.filter(order_id=confirmed['id']).values_list('event_type', flat=True)),
+            ['order.created', 'order.confirmed']
+        )
+        self.assertEqual(
+            list(OrderEvent.objects.filter(order_id=rejected['id']).values_list('event_type', flat=True)),
+            ['order.created', 'order.rejected']
+        )
+
+        event = OrderEvent.objects.filter(order_id=confirmed['id']).first()
+        self.assertEqual(event.payload['store_id'], self.store.id)
+        self.assertEqual(event.payload['items'], [
+            {'product_id': self.laptop.id, 'quantity_requested': 2, 'quantity_fulfilled': 2}
+        ])
+        self.assertIsNone(event.published_at)
+
+    def test_relay_publishes_to_file(self):
+        """Test that the relay writes every pending event once and marks it published"""
+        self.order(1)
+        self.order(1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.ndjson')
+            published = relay_order_events(sink=FileSink(path), batch_size=3)
+            self.assertEqual(relay_order_events(sink=FileSink(path)), 0)
+
+            with open(path) as events_file:
+                messages = [json.loads(line) for line in events_file]
+
+        self.assertEqual(published, 4)
+        self.assertEqual(
+            [message['id'] for message in messages],
+            list(OrderEvent.objects.order_by('id').values_list('id', flat=True))
+        )
+        self.assertFalse(OrderEvent.objects.filter(published_at__isnull=True).exists())
+
+    def test_relay_posts_to_http(self):
+        """Test that HttpSink POSTs each batch as a JSON array"""
+        batches = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                batches.append(json.loads(self.rfile.read(length)))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            self.order(1)
+            url = f'http://127.0.0.1:{server.server_port}/events'
+            published = relay_order_events(sink=HttpSink(url, timeout=5))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(published, 2)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual([message['type'] for message in batches[0]], ['order.created', 'order.confirmed'])
+
+    @override_settings(ORDER_EVENT_MAX_ATTEMPTS=2)
+    def test_failed_publish_stays_pending(self):
+        """Test that failures are recorded and events give up after max attempts"""
+        self.order(1)
+
+        self.assertEqual(relay_order_events(sink=FailingSink()), 0)
+        event = OrderEvent.objects.first()
+        self.assertIsNone(event.published_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, 'sink unavailable')
+
+        relay_order_events(sink=FailingSink())
+        # Past the limit the events are left for inspection
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.ndjson')
+            self.assertEqual(relay_order_events(sink=FileSink(path)), 0)
+        self.assertEqual(OrderEvent.objects.filter(attempts=2, published_at__isnull=True).count(), 2)
+
+    def test_events_deleted_with_order(self):
+        """Test that an order's events go with it"""
+        self.order(50)
+        Order.objects.all().delete()
+
+        self.assertFalse(OrderEvent.objects.exists())
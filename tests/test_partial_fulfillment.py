@@ -0,0 +1,85 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.orders.models import Order
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+class PartialFulfillmentTestCase(TestCase):
+    """Test fulfillment=partial order placement"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=20, category=self.category)
+        self.cable = Product.objects.create(title='Cable', price=5, category=self.category)
+
+        Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.store, product=self.mouse, quantity=3)
+
+    def order(self, items, fulfillment='partial'):
+        return self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'fulfillment': fulfillment,
+            'items': [
+                {'product_id': product.id, 'quantity_requested': quantity}
+                for product, quantity in items
+            ]
+        }, format='json')
+
+    def quantity(self, product):
+        return Inventory.objects.get(store=self.store, product=product).quantity
+
+    def fulfilled(self, response):
+        return [
+            (item['product_id'], item['quantity_requested'], item['quantity_fulfilled'])
+            for item in response.json()['items']
+        ]
+
+    def test_partial_order(self):
+        """Test that the lines that can be filled are confirmed and deducted"""
+        response = self.order([(self.laptop, 2), (self.mouse, 5), (self.cable, 1)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'PARTIAL')
+        self.assertEqual(sorted(self.fulfilled(response)), sorted([
+            (self.laptop.id, 2, 2),
+            (self.mouse.id, 5, 3),
+            (self.cable.id, 1, 0),
+        ]))
+        self.assertEqual(self.quantity(self.laptop), 3)
+        self.assertEqual(self.quantity(self.mouse), 0)
+
+    def test_partial_order_fully_filled(self):
+        """Test that a partial-mode order that fits is simply CONFIRMED"""
+        response = self.order([(self.laptop, 2), (self.mouse, 1)])
+
+        self.assertEqual(response.json()['status'], 'CONFIRMED')
+        self.assertEqual(self.quantity(self.mouse), 2)
+
+    def test_partial_order_nothing_available(self):
+        """Test that a partial-mode order with no stock at all is REJECTED"""
+        response = self.order([(self.cable, 1)])
+
+        self.assertEqual(response.json()['status'], 'REJECTED')
+        self.assertEqual(self.fulfilled(response), [(self.cable.id, 1, 0)])
+
+    def test_repeated_lines_share_stock(self):
+        """Test that repeated lines for one product are filled from one balance"""
+        response = self.order([(self.mouse, 2), (self.mouse, 2)])
+
+        self.assertEqual(response.json()['status'], 'PARTIAL')
+        self.assertEqual(sum(item[2] for item in self.fulfilled(response)), 3)
+        self.assertEqual(self.quantity(self.mouse), 0)
+
+    def test_default_mode_still_all_or_nothing(self):
+        """Test that without the flag a short line rejects the whole order"""
+        response = self.order([(self.laptop, 2), (self.mouse, 5)], fulfillment='all')
+
+        self.assertEqual(response.json()['status'], 'REJECTED')
+        self.assertEqual(self.quantity(self.laptop), 5)
+        self.assertEqual(Order.objects.get().items.filter(quantity_fulfilled=0).count(), 2)
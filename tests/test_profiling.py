@@ -0,0 +1,84 @@
+import os
+import pstats
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+
+
+class ProfilingTestCase(TestCase):
+    """Test on-demand request profiling and the profiles command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.override = override_settings(
+            PROFILING_DIR=self.directory.name,
+            PROFILING_TOKEN='secret',
+            PROFILING_SAMPLE_RATE=0.0,
+            PROFILING_VIEWS=[],
+            PROFILING_MODE='cprofile'
+        )
+        self.override.enable()
+        self.client = APIClient()
+
+        category = Category.objects.create(name='Electronics')
+        Product.objects.create(title='Laptop Pro 15', price=1299, category=category)
+
+    def tearDown(self):
+        self.override.disable()
+        self.directory.cleanup()
+
+    def search(self, **headers):
+        return self.client.get('/api/search/products/', {'q': 'laptop'}, **headers)
+
+    def test_header_trigger(self):
+        """Test that a request with the token is profiled into a pstats file"""
+        response = self.search(HTTP_X_PROFILE='secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        name = response['X-Profile-Id']
+        self.assertIn('product-search', name)
+        stats = pstats.Stats(os.path.join(self.directory.name, name))
+        self.assertTrue(any(function == 'product_search' for _, _, function in stats.stats))
+
+    def test_wrong_or_missing_token(self):
+        """Test that requests without the right token are not profiled"""
+        self.assertNotIn('X-Profile-Id', self.search())
+        self.assertNotIn('X-Profile-Id', self.search(HTTP_X_PROFILE='guess'))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    @override_settings(PROFILING_MODE='sampling', PROFILING_SAMPLE_RATE=1.0, PROFILING_TOKEN='')
+    def test_sample_rate_collapsed_stacks(self):
+        """Test sampled profiling in collapsed-stack format"""
+        client = APIClient()
+        name = client.get('/api/search/products/', {'q': 'laptop'})['X-Profile-Id']
+
+        self.assertTrue(name.endswith('.collapsed'))
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, name)))
+
+    @override_settings(PROFILING_MAX_FILES=2)
+    def test_retention_cap(self):
+        """Test that only the newest PROFILING_MAX_FILES profiles are kept"""
+        names = [self.search(HTTP_X_PROFILE='secret')['X-Profile-Id'] for _ in range(4)]
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(names[-2:]))
+
+    def test_command(self):
+        """Test listing, showing and downloading profiles"""
+        name = self.search(HTTP_X_PROFILE='secret')['X-Profile-Id']
+
+        output = StringIO()
+        call_command('profiles', 'list', stdout=output)
+        self.assertIn(name, output.getvalue())
+
+        output = StringIO()
+        call_command('profiles', 'show', name, stdout=output)
+        self.assertIn('product_search', output.getvalue())
+
+        target = os.path.join(self.directory.name, 'copy.bin')
+        call_command('profiles', 'get', name, '--output', target, stderr=StringIO())
+        self.assertTrue(os.path.getsize(target) > 0)
@@ -0,0 +1,148 @@
+import unittest
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.orders import redis_stock
+from apps.orders.models import Order
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+REDIS_STOCK_TEST_URL = f'{settings.REDIS_URL}/15'
+
+
+def redis_reachable():
+    if not redis_stock.REDIS_AVAILABLE:
+        return False
+    try:
+        return redis_stock._client_for(REDIS_STOCK_TEST_URL).ping()
+    except Exception:
+        return False
+
+
+@unittest.skipUnless(redis_reachable(), 'needs a local redis-server')
+@override_settings(REDIS_STOCK_MODE=True, REDIS_STOCK_URL=REDIS_STOCK_TEST_URL)
+class RedisStockTestCase(TestCase):
+    """Test Redis-fronted order placement and write-behind"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.redis = redis_stock.get_client()
+        self.redis.flushdb()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=20, category=self.category)
+
+        self.laptop_inventory = Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.store, product=self.mouse, quantity=10)
+
+        redis_stock.load_store(self.store.id)
+
+    def tearDown(self):
+        self.redis.flushdb()
+
+    def order(self, laptops, mice=0):
+        items = [{'product_id': self.laptop.id, 'quantity_requested': laptops}]
+        if mice:
+            items.append({'product_id': self.mouse.id, 'quantity_requested': mice})
+        return self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'items': items
+        }, format='json')
+
+    def test_order_accepted_in_redis(self):
+        """Test that an order is accepted with a reference and deducted in Redis only"""
+        response = self.order(2, 1)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('reference', response.json())
+        self.assertEqual(self.redis.hget(redis_stock.stock_key(self.store.id), self.laptop.id), '3')
+        self.assertFalse(Order.objects.exists())
+
+        self.laptop_inventory.refresh_from_db()
+        self.assertEqual(self.laptop_inventory.quantity, 5)
+
+    def test_short_basket_rejected(self):
+        """Test that a short basket deducts nothing and is written as REJECTED"""
+        response = self.order(2, 11)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'REJECTED')
+        self.assertEqual(self.redis.hget(redis_stock.stock_key(self.store.id), self.laptop.id), '5')
+
+    def test_write_behind_flush(self):
+        """Test that flushing writes orders and deltas, and is safe to replay"""
+        references = [self.order(1).json()['reference'] for _ in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flushed = redis_stock.flush_pending_orders(batch_size=2)
+
+        self.assertEqual(flushed, 3)
+        self.assertEqual(Order.objects.filter(status='CONFIRMED').count(), 3)
+        self.laptop_inventory.refresh_from_db()
+        self.assertEqual(self.laptop_inventory.quantity, 2)
+
+        response = self.client.get(f'/api/orders/by-reference/{references[0]}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reference'], references[0])
+
+        # Replaying an already written entry changes nothing
+        self.redis.rpush(redis_stock.PENDING_KEY, (
+            f'{{"reference": "{references[0]}", "store_id": {self.store.id}, '
+            f'"items": [[{self.laptop.id}, 1]]}}'
+        ))
+        redis_stock.flush_pending_orders()
+        self.assertEqual(Order.objects.count(), 3)
+        self.laptop_inventory.refresh_from_db()
+        self.assertEqual(self.laptop_inventory.quantity, 2)
+
+    def test_partial_order_in_redis(self):
+        """Test that partial mode fills what Redis holds and writes a PARTIAL order"""
+        response = self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'fulfillment': 'partial',
+            'items': [
+                {'product_id': self.laptop.id, 'quantity_requested': 7},
+                {'product_id': self.mouse.id, 'quantity_requested': 1},
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'PARTIAL')
+        self.assertEqual([item['quantity_fulfilled'] for item in response.json()['items']], [5, 1])
+        self.assertEqual(redis_stock.verify_store(self.store.id), {})
+
+        redis_stock.flush_pending_orders()
+
+        order = Order.objects.get()
+        self.assertEqual(order.status, 'PARTIAL')
+        self.laptop_inventory.refresh_from_db()
+        self.assertEqual(self.laptop_inventory.quantity, 0)
+
+    def test_verify_accounts_for_queued_orders(self):
+        """Test that verify matches with orders queued and reports drift"""
+        self.order(2)
+        self.assertEqual(redis_stock.verify_store(self.store.id), {})
+
+        self.redis.hincrby(redis_stock.stock_key(self.store.id), self.mouse.id, -4)
+        self.assertEqual(redis_stock.verify_store(self.store.id, fix=True), {self.mouse.id: (10, 6)})
+        self.assertEqual(redis_stock.verify_store(self.store.id), {})
+
+    def test_reload_subtracts_queued_orders(self):
+        """Test that a forced reload keeps stock taken by unflushed orders"""
+        self.order(2)
+
+        redis_stock.load_store(self.store.id, force=True)
+
+        self.assertEqual(self.redis.hget(redis_stock.stock_key(self.store.id), self.laptop.id), '3')
+
+    def test_unloaded_store_uses_database(self):
+        """Test that stores not loaded into Redis keep the database path"""
+        self.redis.delete(redis_stock.stock_key(self.store.id))
+
+        response = self.order(2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'CONFIRMED')
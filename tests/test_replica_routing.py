@@ -0,0 +1,110 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from apps.core.cache import clear_local
+from apps.core.routers import replica_reads
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+REPLICA = 'replica'
+
+# A second, separately migrated database standing in for a replica, so a
+# test can tell which one served a read by what it finds
+if REPLICA not in connections.settings:
+    _primary = connections.settings['default']
+    connections.settings[REPLICA] = dict(_primary, TEST=dict(
+        _primary['TEST'],
+        NAME=None if _primary['ENGINE'].endswith('sqlite3') else f"test_{_primary['NAME']}_replica"
+    ))
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    REPLICA_VIEWS=['products.list'],
+    REPLICA_STICKY_SECONDS=5,
+    RESPONSE_CACHE_ENABLED=False
+)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """Test replica reads, primary writes and read-your-writes stickiness"""
+
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        """Set up test data: the primary and the replica hold different titles"""
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+        category = Category.objects.create(name='Electronics')
+        self.product = Product.objects.create(title='Primary Laptop', price=1000, category=category)
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        Inventory.objects.create(store=self.store, product=self.product, quantity=5)
+
+        replica_category = Category.objects.using(REPLICA).create(id=category.id, name='Electronics')
+        Product.objects.using(REPLICA).create(
+            id=self.product.id, title='Replica Laptop', price=1000, category=replica_category
+        )
+
+    def tearDown(self):
+        cache.clear()
+        clear_local()
+
+    def titles(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        return [product['title'] for product in response.json()['results']]
+
+    def test_router(self):
+        """Test that only allowed reads outside transactions use the replica"""
+        self.assertEqual(Product.objects.all().db, 'default')
+
+        with replica_reads():
+            self.assertEqual(Product.objects.all().db, REPLICA)
+            self.assertEqual(Product.objects.select_for_update().db, 'default')
+            with transaction.atomic():
+                self.assertEqual(Product.objects.all().db, 'default')
+
+    def test_listed_views_read_replica(self):
+        """Test that REPLICA_VIEWS read from the replica and others don't"""
+        self.assertEqual(self.titles(), ['Replica Laptop'])
+
+        with self.settings(REPLICA_VIEWS=['categories.list']):
+            self.assertEqual(self.titles(), ['Primary Laptop'])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_responses_computed_on_primary(self):
+        """Test that cached responses never hold replica rows"""
+        self.assertEqual(self.titles(), ['Primary Laptop'])
+
+    def test_write_sticks_to_primary(self):
+        """Test that a client reads its own writes until the window passes"""
+        response = self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'items': [{'product_id': self.product.id, 'quantity_requested': 1}]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+        self.assertEqual(self.titles(), ['Primary Laptop'])
+
+        # Another client is unaffected
+        self.assertEqual(APIClient().get('/api/products/?page=1').json()['results'][0]['title'], 'Replica Laptop')
+
+        self.client.cookies[settings.REPLICA_STICKY_COOKIE] = f'{time.time() - 1:.3f}'
+        self.assertEqual(self.titles(), ['Replica Laptop'])
+
+    def test_failed_write_not_sticky(self):
+        """Test that rejected writes don't pin the client to the primary"""
+        response = self.client.post('/api/orders/', {'store_id': self.store.id, 'items': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test that everything uses the primary without replicas"""
+        with replica_reads():
+            self.assertEqual(Product.objects.all().db, 'default')
+        self.assertEqual(self.titles(), ['Primary Laptop'])
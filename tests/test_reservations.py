@@ -0,0 +1,125 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.orders.models import Order, Reservation
+from apps.orders.reservations import release_expired_reservations
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+
+class ReservationTestCase(TestCase):
+    """Test cart reservations and the expiry sweeper"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=20, category=self.category)
+
+        Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.store, product=self.mouse, quantity=10)
+
+    def reserve(self, laptops=2, mice=3, **extra):
+        return self.client.post('/api/reservations/', {
+            'store_id': self.store.id,
+            'items': [
+                {'product_id': self.laptop.id, 'quantity_requested': laptops},
+                {'product_id': self.mouse.id, 'quantity_requested': mice},
+            ],
+            **extra
+        }, format='json')
+
+    def quantity(self, product):
+        return Inventory.objects.get(store=self.store, product=product).quantity
+
+    def test_reservation_holds_stock(self):
+        """Test that placing a hold deducts the held quantities"""
+        response = self.reserve()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'ACTIVE')
+        self.assertEqual(self.quantity(self.laptop), 3)
+        self.assertEqual(self.quantity(self.mouse), 7)
+
+    def test_reservation_insufficient_stock(self):
+        """Test that a short basket is rejected without holding anything"""
+        response = self.reserve(laptops=6)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['unavailable_products'], [self.laptop.id])
+        self.assertEqual(self.quantity(self.laptop), 5)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_confirm_creates_order(self):
+        """Test that confirming a hold creates an order without touching stock again"""
+        reservation_id = self.reserve().json()['id']
+
+        response = self.client.post(f'/api/reservations/{reservation_id}/confirm/')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'CONFIRMED')
+        self.assertEqual(len(response.json()['items']), 2)
+        self.assertEqual(self.quantity(self.laptop), 3)
+
+        reservation = Reservation.objects.get(id=reservation_id)
+        self.assertEqual(reservation.status, 'CONVERTED')
+        self.assertEqual(reservation.order_id, response.json()['id'])
+
+        # A converted hold can't be confirmed twice
+        response = self.client.post(f'/api/reservations/{reservation_id}/confirm/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_release_restocks(self):
+        """Test that releasing a hold returns its stock"""
+        reservation_id = self.reserve().json()['id']
+
+        response = self.client.post(f'/api/reservations/{reservation_id}/release/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'RELEASED')
+        self.assertEqual(self.quantity(self.laptop), 5)
+        self.assertEqual(self.quantity(self.mouse), 10)
+
+    def test_unknown_reservation(self):
+        """Test that missing or malformed reservation IDs get 404"""
+        for url in ('/api/reservations/999999/confirm/', '/api/reservations/abc/release/'):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json()['error'], 'Reservation not found.')
+
+    def test_confirm_expired_reservation(self):
+        """Test that an expired hold can't be confirmed and its stock is returned"""
+        reservation_id = self.reserve().json()['id']
+        Reservation.objects.filter(id=reservation_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.post(f'/api/reservations/{reservation_id}/confirm/')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Reservation.objects.get(id=reservation_id).status, 'EXPIRED')
+        self.assertEqual(self.quantity(self.laptop), 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_sweeper_releases_expired(self):
+        """Test that the sweeper returns stock for expired holds only"""
+        expired_ids = [self.reserve(laptops=1, mice=1).json()['id'] for _ in range(3)]
+        active_id = self.reserve(laptops=1, mice=1).json()['id']
+        Reservation.objects.filter(id__in=expired_ids).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        # Small batches exercise the loop
+        released = release_expired_reservations(batch_size=2)
+
+        self.assertEqual(released, 3)
+        self.assertEqual(self.quantity(self.laptop), 4)
+        self.assertEqual(self.quantity(self.mouse), 9)
+        self.assertEqual(Reservation.objects.get(id=active_id).status, 'ACTIVE')
+        self.assertEqual(
+            Reservation.objects.filter(id__in=expired_ids, status='EXPIRED').count(), 3
+        )
@@ -0,0 +1,186 @@
+import threading
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.core import cache as response_cache
+from apps.core.cache import Entry, LocalCache, get_or_compute, clear_local
+from apps.products.models import Category, Product
+from apps.stores.models import Store
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTestCase(TestCase):
+    """Test the two-tier response cache on the catalog endpoints"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+    def tearDown(self):
+        cache.clear()
+        clear_local()
+
+    def test_warm_requests_skip_queries(self):
+        """Test that repeated reads are served without touching the database"""
+        first = self.client.get('/api/products/').json()
+        self.client.get(f'/api/products/{self.laptop.id}/')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/products/').json(), first)
+            response = self.client.get(f'/api/products/{self.laptop.id}/')
+        self.assertEqual(response.json()['title'], 'Laptop')
+
+    def test_shared_tier_survives_local_loss(self):
+        """Test that another process (empty local tier) reads the shared copy"""
+        self.client.get('/api/categories/')
+        response_cache.local_cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.json()['results'][0]['name'], 'Electronics')
+
+    def test_query_string_is_part_of_the_key(self):
+        """Test that filtered lists are cached separately"""
+        other = Category.objects.create(name='Books')
+        Product.objects.create(title='Novel', price=10, category=other)
+
+        self.client.get('/api/products/')
+        response = self.client.get('/api/products/', {'category': other.id})
+        self.assertEqual([row['title'] for row in response.json()['results']], ['Novel'])
+
+    def test_product_save_invalidates(self):
+        """Test that saving a product drops cached product responses"""
+        self.client.get(f'/api/products/{self.laptop.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.laptop.title = 'Laptop Pro'
+            self.laptop.save()
+
+        response = self.client.get(f'/api/products/{self.laptop.id}/')
+        self.assertEqual(response.json()['title'], 'Laptop Pro')
+
+    def test_category_save_invalidates_products(self):
+        """Test that renaming a category drops product responses carrying the name"""
+        self.client.get('/api/products/')
+
+        self.category.name = 'Computers'
+        self.category.save()
+
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.json()['results'][0]['category_name'], 'Computers')
+
+    def test_store_delete_invalidates(self):
+        """Test that deleting a store drops the cached store list"""
+        self.assertEqual(self.client.get('/api/stores/').json()['count'], 1)
+
+        self.store.delete()
+
+        self.assertEqual(self.client.get('/api/stores/').json()['count'], 0)
+
+    def test_errors_not_cached(self):
+        """Test that a 404 is passed through and not stored"""
+        missing = self.laptop.id + 1000
+        self.assertEqual(self.client.get(f'/api/products/{missing}/').status_code, 404)
+
+        Product.objects.create(id=missing, title='Tablet', price=500, category=self.category)
+        self.assertEqual(self.client.get(f'/api/products/{missing}/').status_code, 200)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled(self):
+        """Test that every request queries when the cache is off"""
+        self.client.get('/api/categories/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/categories/')
+
+
+@override_settings(RESPONSE_CACHE_BETA=1.0, RESPONSE_CACHE_LOCK_SECONDS=1)
+class StampedeTestCase(TestCase):
+    """Test single-flight recomputes and early refresh"""
+
+    def setUp(self):
+        cache.clear()
+        clear_local()
+
+    def tearDown(self):
+        cache.clear()
+        clear_local()
+
+    def test_single_flight(self):
+        """Test that concurrent misses compute the value once"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute('slow', compute, 60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_served_while_locked(self):
+        """Test that an expired value is served while another reader recomputes"""
+        get_or_compute('key', lambda: 'old', 60)
+        key = response_cache.VALUE_KEY.format(
+            '.'.join(str(generation) for generation in response_cache.current_generations([])),
+            'key'
+        )
+        expired = Entry('old', time.time() - 1, 0.01)
+        cache.set(key, expired)
+        response_cache.local_cache.set(key, expired)
+        cache.add(response_cache.LOCK_KEY.format(key), 1)
+
+        self.assertEqual(get_or_compute('key', lambda: 'new', 60), 'old')
+
+        cache.delete(response_cache.LOCK_KEY.format(key))
+        self.assertEqual(get_or_compute('key', lambda: 'new', 60), 'new')
+
+    def test_generation_bump(self):
+        """Test that bumping a generation retires its keys only"""
+        get_or_compute('a', lambda: 1, 60, ['products'])
+        get_or_compute('b', lambda: 1, 60, ['stores'])
+
+        response_cache.bump_generation('products')
+
+        self.assertEqual(get_or_compute('a', lambda: 2, 60, ['products']), 2)
+        self.assertEqual(get_or_compute('b', lambda: 2, 60, ['stores']), 1)
+
+    def test_early_refresh(self):
+        """Test that refresh odds grow with compute time and nearness to expiry"""
+        now = time.time()
+        # -ln(1 - 0.9) ~ 2.3
+        with mock.patch('apps.core.cache.random.random', return_value=0.9):
+            self.assertTrue(Entry('v', now + 2, 1.0).needs_refresh(now, 1.0))
+            self.assertFalse(Entry('v', now + 60, 1.0).needs_refresh(now, 1.0))
+            self.assertFalse(Entry('v', now + 2, 0.01).needs_refresh(now, 1.0))
+            self.assertFalse(Entry('v', now + 2, 1.0).needs_refresh(now, 0.0))
+        self.assertTrue(Entry('v', now - 1, 0.0).needs_refresh(now, 0.0))
+
+    def test_local_tier_is_bounded(self):
+        """Test that the least recently used entry is evicted"""
+        local = LocalCache(2)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+        local.set('c', 3)
+
+        self.assertEqual(len(local), 2)
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(local.get('a'), 1)
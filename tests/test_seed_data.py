@@ -0,0 +1,80 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Category, Product
+from apps.products.seeding import seed_catalog
+from apps.stores.models import Store, Inventory
+
+
+class SeedDataTestCase(TestCase):
+    """Test the scalable seed_data generator"""
+
+    def snapshot(self):
+        return (
+            list(Category.objects.order_by('id').values_list('name', flat=True)),
+            list(Product.objects.order_by('id').values_list('title', 'description', 'price', 'category__name')),
+            list(Store.objects.order_by('id').values_list('name', 'location')),
+            sorted(Inventory.objects.values_list('store__name', 'product__title', 'quantity', 'product_title')),
+            sorted(
+                (order.store.name, order.status, order.created_at.date(), tuple(sorted(
+                    (item.product.title, item.quantity_requested, item.quantity_fulfilled)
+                    for item in order.items.all()
+                )))
+                for order in Order.objects.select_related('store').prefetch_related('items__product')
+            ),
+        )
+
+    def test_command_scale(self):
+        """Test that the command honours the requested scale"""
+        output = StringIO()
+        call_command(
+            'seed_data', '--categories', '20', '--products', '120', '--stores', '4',
+            '--density', '0.5', '--orders', '30', '--workers', '1', '--batch-size', '50',
+            stdout=output
+        )
+
+        self.assertEqual(Category.objects.count(), 20)
+        self.assertEqual(Product.objects.count(), 120)
+        self.assertEqual(Store.objects.count(), 4)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertTrue(240 * 0.8 <= Inventory.objects.count() <= 240 * 1.2)
+        self.assertIn('rows/sec', output.getvalue())
+
+    def test_deterministic_across_workers(self):
+        """Test that a seed gives the same data with or without worker processes"""
+        options = dict(products=60, stores=3, density=0.3, orders=25, seed=5, batch_size=20)
+        seed_catalog(workers=1, **options)
+        first = self.snapshot()
+        seed_catalog(workers=2, **options)
+        self.assertEqual(self.snapshot(), first)
+
+        seed_catalog(workers=1, **dict(options, seed=6))
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_orders_match_status(self):
+        """Test that historical order lines agree with their status"""
+        seed_catalog(products=40, stores=2, density=0.5, orders=60, seed=3)
+
+        for order in Order.objects.prefetch_related('items'):
+            requested = sum(item.quantity_requested for item in order.items.all())
+            fulfilled = sum(item.quantity_fulfilled for item in order.items.all())
+            if order.status == 'CONFIRMED':
+                self.assertEqual(fulfilled, requested)
+            elif order.status == 'REJECTED':
+                self.assertEqual(fulfilled, 0)
+            else:
+                self.assertTrue(0 < fulfilled < requested)
+
+    def test_store_stats_rebuilt(self):
+        """Test that store totals cover the raw-inserted inventory"""
+        seed_catalog(products=30, stores=2, density=0.5, seed=1)
+
+        store = Store.objects.first()
+        response = self.client.get(f'/api/stores/{store.id}/stats/')
+        self.assertEqual(
+            response.json()['total_units'],
+            Inventory.objects.filter(store=store).aggregate(total=Sum('quantity'))['total']
+        )
+        self.assertFalse(OrderItem.objects.exists())
@@ -0,0 +1,210 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from apps.core.cache import clear_local
+from apps.core.sharding import MergedQuerySet, shard_for_store, use_shard
+from apps.orders.models import Order, OrderItem, Reservation
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory
+
+SHARDS = ['shard_a', 'shard_b']
+
+# Two separately migrated databases standing in for store shards
+for _alias in SHARDS:
+    if _alias not in connections.settings:
+        _primary = connections.settings['default']
+        connections.settings[_alias] = dict(_primary, TEST=dict(
+            _primary['TEST'],
+            NAME=None if _primary['ENGINE'].endswith('sqlite3') else f"test_{_primary['NAME']}_{_alias}"
+        ))
+
+
+@override_settings(DATABASE_SHARDS=SHARDS)
+class StoreShardingTestCase(TransactionTestCase):
+    """Test store-sharded inventory and orders with a replicated catalog"""
+
+    databases = {'default', *SHARDS}
+
+    def setUp(self):
+        """Set up test data: one store on each shard"""
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.laptop = Product.objects.create(title='Laptop', price=1000, category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=20, category=self.category)
+
+        # Consecutive IDs land on different shards
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+        self.other_store = Store.objects.create(name='Gadget Store', location='789 Gadget Rd')
+        self.shard = shard_for_store(self.store.id)
+        self.other_shard = shard_for_store(self.other_store.id)
+
+        with use_shard(self.shard):
+            Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        # Saving an instance routes by its store without a shard block
+        Inventory(store=self.other_store, product=self.laptop, quantity=5).save()
+        Inventory(store=self.other_store, product=self.mouse, quantity=50).save()
+
+    def tearDown(self):
+        cache.clear()
+        clear_local()
+
+    def place_order(self, store, quantity=1):
+        response = self.client.post('/api/orders/', {
+            'store_id': store.id,
+            'items': [{'product_id': self.laptop.id, 'quantity_requested': quantity}]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_router(self):
+        """Test that store data follows its store and the context"""
+        self.assertNotEqual(self.shard, self.other_shard)
+        self.assertEqual(Inventory.objects.filter(store=self.store).count(), 0)
+
+        with use_shard(self.shard):
+            self.assertEqual(Inventory.objects.all().db, self.shard)
+            self.assertEqual(Product.objects.all().db, self.shard)
+        self.assertEqual(Product.objects.all().db, 'default')
+
+    def test_inventory_on_store_shard(self):
+        """Test that inventory rows are written only to their store's shard"""
+        self.assertEqual(Inventory.objects.using(self.shard).count(), 1)
+        self.assertEqual(Inventory.objects.using(self.other_shard).count(), 2)
+        self.assertEqual(Inventory.objects.using('default').count(), 0)
+
+    def test_catalog_replicated(self):
+        """Test that catalog writes reach every shard"""
+        for alias in SHARDS:
+            self.assertEqual(Store.objects.using(alias).count(), 2)
+            self.assertEqual(Product.objects.using(alias).get(pk=self.laptop.pk).title, 'Laptop')
+
+        self.laptop.title = 'Laptop Pro'
+        self.laptop.save()
+        self.mouse.delete()
+
+        for alias in SHARDS:
+            self.assertEqual(Product.objects.using(alias).get(pk=self.laptop.pk).title, 'Laptop Pro')
+            self.assertFalse(Product.objects.using(alias).filter(pk=self.mouse.pk).exists())
+        # Renames reach the inventory on every shard too
+        self.assertEqual(
+            Inventory.objects.using(self.other_shard).get(product=self.laptop).product_title, 'Laptop Pro'
+        )
+
+    def test_order_created_on_store_shard(self):
+        """Test that an order and its stock deduction stay on the store's shard"""
+        order = self.place_order(self.store, quantity=2)
+        self.assertEqual(order['status'], 'CONFIRMED')
+
+        self.assertTrue(Order.objects.using(self.shard).filter(id=order['id'], store=self.store).exists())
+        self.assertFalse(Order.objects.using(self.other_shard).filter(store=self.store).exists())
+        self.assertEqual(OrderItem.objects.using(self.shard).filter(order_id=order['id']).count(), 1)
+        self.assertEqual(
+            Inventory.objects.using(self.shard).get(store=self.store, product=self.laptop).quantity, 3
+        )
+        self.assertEqual(
+            Inventory.objects.using(self.other_shard).get(store=self.other_store, product=self.laptop).quantity, 5
+        )
+
+    def test_order_list_merges_shards(self):
+        """Test that listing fans out to every shard, newest first"""
+        first = self.place_order(self.store)
+        second = self.place_order(self.other_store)
+        third = self.place_order(self.store)
+
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(
+            [order['created_at'] for order in response.json()['results']],
+            [third['created_at'], second['created_at'], first['created_at']]
+        )
+
+        merged = MergedQuerySet(Order.objects.all())
+        self.assertEqual(len(merged), 3)
+        self.assertEqual([order.store_id for order in merged[1:3]], [self.other_store.id, self.store.id])
+
+    def test_order_retrieve_finds_shard(self):
+        """Test that detail lookups search every shard"""
+        with use_shard(self.other_shard):
+            order = Order.objects.create(id=9001, store=self.other_store, status='CONFIRMED')
+
+        response = self.client.get(f'/api/orders/{order.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['store'], self.other_store.id)
+        self.assertEqual(self.client.get('/api/orders/9002/').status_code, 404)
+
+    def test_store_endpoints_use_store_shard(self):
+        """Test that per-store endpoints read the store's shard"""
+        response = self.client.get(f'/api/stores/{self.other_store.id}/inventory/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+
+        self.place_order(self.store)
+        response = self.client.get(f'/api/stores/{self.store.id}/orders/')
+        self.assertEqual(response.json()['count'], 1)
+
+        response = self.client.get(f'/api/stores/{self.store.id}/stats/')
+        self.assertEqual(response.json()['total_units'], 4)
+
+        response = self.client.get(f'/api/stores/{self.other_store.id}/inventory/export/')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+
+    def test_fulfillable_fans_out(self):
+        """Test that store ranking merges every shard's candidates"""
+        response = self.client.post('/api/stores/fulfillable/', {
+            'items': [
+                {'product_id': self.laptop.id, 'quantity_requested': 1},
+                {'product_id': self.mouse.id, 'quantity_requested': 1}
+            ],
+            'allow_partial': True
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['store_id'] for row in response.json()['results']],
+            [self.other_store.id, self.store.id]
+        )
+
+    def test_reservation_confirmed_on_store_shard(self):
+        """Test that holds are placed and confirmed on the store's shard"""
+        response = self.client.post('/api/reservations/', {
+            'store_id': self.other_store.id,
+            'items': [{'product_id': self.mouse.id, 'quantity_requested': 3}]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        reservation_id = response.json()['id']
+        self.assertTrue(Reservation.objects.using(self.other_shard).filter(id=reservation_id).exists())
+
+        response = self.client.post(f'/api/reservations/{reservation_id}/confirm/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Order.objects.using(self.other_shard).filter(id=response.json()['id']).exists())
+        self.assertEqual(
+            Inventory.objects.using(self.other_shard).get(store=self.other_store, product=self.mouse).quantity, 47
+        )
+
+    def test_sync_shards(self):
+        """Test that sync_shards repairs a shard's copy of the catalog"""
+        Product.objects.using(self.shard).filter(pk=self.mouse.pk).update(title='Stale')
+        Category.objects.using(self.shard).create(name='Orphan')
+
+        output = StringIO()
+        call_command('sync_shards', skip_migrate=True, stdout=output)
+
+        self.assertEqual(Product.objects.using(self.shard).get(pk=self.mouse.pk).title, 'Mouse')
+        self.assertFalse(Category.objects.using(self.shard).filter(name='Orphan').exists())
+        self.assertIn('2 shards in sync', output.getvalue())
+
+    @override_settings(DATABASE_SHARDS=[])
+    def test_no_shards(self):
+        """Test that everything uses the default database without shards"""
+        store = Store.objects.create(name='Corner Shop', location='1 Main St')
+        Inventory.objects.create(store=store, product=self.laptop, quantity=5)
+
+        self.place_order(store)
+        self.assertEqual(Order.objects.using('default').filter(store=store).count(), 1)
+        self.assertEqual(Store.objects.using(self.shard).filter(pk=store.pk).count(), 0)
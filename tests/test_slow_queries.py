@@ -0,0 +1,82 @@
+import json
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.monitoring import slow_queries
+from apps.products.models import Category, Product
+
+
+@override_settings(SLOW_QUERY_CAPTURE=True, SLOW_QUERY_VIEWS=['product-search'], SLOW_QUERY_BUDGET_MS=0)
+class SlowQueryTestCase(TestCase):
+    """Test slow query capture, the admin endpoint and the dump command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        slow_queries.clear()
+
+        category = Category.objects.create(name='Electronics')
+        Product.objects.create(title='Laptop Pro 15', price=1299, category=category)
+
+    def tearDown(self):
+        slow_queries.clear()
+
+    def test_capture_with_plan(self):
+        """Test that a request over budget is stored with its statements and plans"""
+        self.client.get('/api/search/products/', {'q': 'laptop'})
+        # Not a watched view
+        self.client.get('/api/stores/')
+
+        entries = slow_queries.entries()
+        self.assertEqual(len(entries), 1)
+        entry = entries[0]
+        self.assertEqual(entry['view'], 'product-search')
+        self.assertEqual(entry['path'], '/api/search/products/?q=laptop')
+        self.assertGreater(entry['query_count'], 0)
+
+        query = entry['queries'][0]
+        self.assertIn('SELECT', query['sql'])
+        self.assertIsInstance(query['params'], list)
+        self.assertTrue(query['plan'])
+
+    @override_settings(SLOW_QUERY_BUDGET_MS=60000)
+    def test_fast_request_not_captured(self):
+        """Test that requests within budget are not stored"""
+        self.client.get('/api/search/products/', {'q': 'laptop'})
+        self.assertEqual(slow_queries.entries(), [])
+
+    @override_settings(SLOW_QUERY_BUFFER_SIZE=3)
+    def test_ring_buffer(self):
+        """Test that the buffer keeps only the newest entries"""
+        for number in range(5):
+            slow_queries.record({'view': f'view-{number}'})
+
+        self.assertEqual(
+            [entry['view'] for entry in slow_queries.entries()],
+            ['view-4', 'view-3', 'view-2']
+        )
+
+    def test_admin_endpoint(self):
+        """Test that only staff can read the buffer"""
+        self.client.get('/api/search/products/', {'q': 'laptop'})
+
+        response = self.client.get('/api/monitoring/slow-queries/')
+        self.assertIn(response.status_code, (401, 403))
+
+        admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/monitoring/slow-queries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_dump_command(self):
+        """Test that the command prints the entries and can clear them"""
+        self.client.get('/api/search/products/', {'q': 'laptop'})
+
+        output = StringIO()
+        call_command('slow_queries', '--clear', stdout=output, stderr=StringIO())
+
+        self.assertEqual(json.loads(output.getvalue())[0]['view'], 'product-search')
+        self.assertEqual(slow_queries.entries(), [])
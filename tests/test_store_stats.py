@@ -0,0 +1,88 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.products.models import Category, Product
+from apps.stores.models import Store, Inventory, StoreStats
+from apps.stores.stats import compute_store_stats, refresh_store_stats
+
+
+class StoreStatsTestCase(TestCase):
+    """Test incrementally maintained store statistics"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name='Electronics')
+        self.store = Store.objects.create(name='Tech Store', location='456 Tech Ave')
+
+        self.laptop = Product.objects.create(title='Laptop', price=Decimal('1000.00'), category=self.category)
+        self.mouse = Product.objects.create(title='Mouse', price=Decimal('20.00'), category=self.category)
+
+        # Build the stats row before inventory exists so signals keep it current
+        refresh_store_stats(self.store.id)
+
+        self.laptop_inventory = Inventory.objects.create(store=self.store, product=self.laptop, quantity=5)
+        Inventory.objects.create(store=self.store, product=self.mouse, quantity=50)
+
+    def assertStatsMatchInventory(self):
+        stats = StoreStats.objects.get(store=self.store)
+        actual = compute_store_stats(self.store.id)
+        self.assertEqual(stats.total_skus, actual['total_skus'])
+        self.assertEqual(stats.total_units, actual['total_units'])
+        self.assertEqual(stats.stock_value, actual['stock_value'])
+        return stats
+
+    def test_stats_endpoint(self):
+        """Test that the endpoint returns the running totals"""
+        response = self.client.get(f'/api/stores/{self.store.id}/stats/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total_skus'], 2)
+        self.assertEqual(data['total_units'], 55)
+        self.assertEqual(data['stock_value'], '6000.00')
+
+    def test_stats_endpoint_unknown_store(self):
+        """Test that missing or malformed store IDs get 404"""
+        self.assertEqual(self.client.get('/api/stores/999999/stats/').status_code, 404)
+        self.assertEqual(self.client.get('/api/stores/abc/stats/').status_code, 404)
+
+    def test_order_adjusts_stats(self):
+        """Test that a confirmed order deducts units and value"""
+        response = self.client.post('/api/orders/', {
+            'store_id': self.store.id,
+            'items': [{'product_id': self.laptop.id, 'quantity_requested': 2}]
+        }, format='json')
+
+        self.assertEqual(response.json()['status'], 'CONFIRMED')
+        stats = self.assertStatsMatchInventory()
+        self.assertEqual(stats.total_units, 53)
+
+    def test_price_change_adjusts_value(self):
+        """Test that repricing a product shifts stock value"""
+        self.mouse.price = Decimal('25.00')
+        self.mouse.save()
+
+        stats = self.assertStatsMatchInventory()
+        self.assertEqual(stats.stock_value, Decimal('6250.00'))
+
+    def test_inventory_edit_and_delete_adjust_stats(self):
+        """Test that full saves and deletes of inventory rows keep stats exact"""
+        self.laptop_inventory.quantity = 1
+        self.laptop_inventory.save()
+        self.assertStatsMatchInventory()
+
+        self.laptop_inventory.delete()
+        stats = self.assertStatsMatchInventory()
+        self.assertEqual(stats.total_skus, 1)
+
+    def test_refresh_corrects_drift(self):
+        """Test that reconciliation fixes rows changed behind its back"""
+        Inventory.objects.filter(store=self.store).update(quantity=0)
+
+        _, drifted = refresh_store_stats(self.store.id)
+
+        self.assertTrue(drifted)
+        stats = self.assertStatsMatchInventory()
+        self.assertEqual(stats.total_units, 0)